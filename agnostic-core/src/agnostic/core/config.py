@@ -13,6 +13,42 @@ class Options(BaseSettings):
     db_host: str | None = 'localhost'
     db_port: int | None = 5432
     db_database: str | None = 'agnostic'
+    # Batches of at least this many rows are loaded with COPY instead of INSERT ... VALUES
+    db_copy_threshold: int | None = 1000
+
+    # Paged lists asked for an estimated count take it from the query plan above this many rows, None disables
+    # estimates
+    count_estimate_threshold: int | None = 10000
+
+    # Chunks of finished logs are folded together until they reach this many characters
+    log_chunk_size: int | None = 1024 * 1024
+    # Seconds between log compaction runs, 0 disables compaction
+    log_compaction_interval: int | None = 60
+
+    # Where attachment content is kept: "local" directory addressed by sha256 or "database"
+    attachment_storage: str | None = 'local'
+    attachment_path: str | None = 'attachments'
+    # Upload size limits in bytes for a single attachment and all attachments of a test run, None disables a limit
+    attachment_max_size: int | None = 256 * 1024 * 1024
+    attachment_max_run_size: int | None = None
+
+    # Seconds between rollups of closed tests-over-time buckets, 0 disables the task and all buckets
+    # are then counted from test runs. Test runs finished in a rolled up bucket show up after the next rollup.
+    rollup_interval: int | None = 300
+
+    # Seconds between runs of the task creating monthly partitions of progress, requests and metrics over time
+    # ahead of time, 0 disables the task. Rows of months without a partition end up in the default partition.
+    partition_interval: int | None = 60 * 60
+    partition_months_ahead: int | None = 2
+
+    # Seconds between writes of the latest heartbeat of test runs, heartbeats received meanwhile are kept in memory.
+    # 0 writes every heartbeat as it is received.
+    heartbeat_flush_interval: int | None = 10
+
+    # Seconds between purges of test runs expired by the retention policy of their project, 0 disables purging.
+    # Rows of purged test runs are deleted this many at a time per table, every batch in its own transaction.
+    retention_interval: int | None = 60 * 60
+    retention_batch_size: int | None = 10000
 
     web_host: str | None = '0.0.0.0'
     web_port: int | None = 8000
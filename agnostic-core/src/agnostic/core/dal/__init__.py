@@ -1,13 +1,18 @@
 from ..session import async_session
 from .attachments import Attachments
-from .exceptions import DALException, DuplicateError, ForeignKeyError, NotFoundError
+from .events import Events
+from .exceptions import DALException, DuplicateError, ForeignKeyError, NotFoundError, InvalidArgumentsError, \
+    UnavailableError
 from .logs import Logs
 from .metrics import Metrics
 from .metrics_ot import MetricsOverTime
+from .partitions import Partitions
 from .progress import Progress
 from .projects import Projects
 from .reporting import Reporting
 from .requests import Requests
+from .retention import Retention
+from .rollups import Rollups
 from .test_runs import TestRuns
 from .tests import Tests
 
@@ -57,6 +62,11 @@ async def get_attachments():
         yield Attachments(session)
 
 
+async def get_events():
+    async with async_session() as session:
+        yield Events(session)
+
+
 async def get_reporting():
     async with async_session() as session:
         yield Reporting(session)
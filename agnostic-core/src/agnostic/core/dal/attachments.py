@@ -1,13 +1,15 @@
 import datetime
 from uuid import UUID, uuid4
 
+from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.sql.expression import update
 
 from agnostic.core import models, schemas
-from .exceptions import DuplicateError, ForeignKeyError, NotFoundError, InvalidArgumentsError
+from agnostic.core.storage import storage
+from .exceptions import DuplicateError, ForeignKeyError, NotFoundError, InvalidArgumentsError, UnavailableError
 
 
 class Attachments:
@@ -43,9 +45,46 @@ class Attachments:
 
         return [schemas.Attachment.model_validate(attachment) for attachment in attachments]
 
+    async def get_total_size(self, test_run_id: UUID) -> int:
+        return (
+            await self.session.execute(
+                select(func.coalesce(func.sum(models.Attachment.size), 0))
+                .where(models.Attachment.test_run_id == test_run_id)
+            )
+        ).scalar()
+
+    async def is_referenced(self, sha256: str) -> bool:
+        return (
+            await self.session.execute(
+                select(models.Attachment.id)
+                .where(models.Attachment.sha256 == sha256)
+                .limit(1)
+            )
+        ).scalar() is not None
+
+    async def lock_content(self, sha256: str):
+        """Holds off attachments of the same content being created or removed until the transaction ends"""
+        await self.session.execute(select(func.pg_advisory_xact_lock(func.hashtext(f'attachments {sha256}'))))
+
+    async def delete_content(self, sha256: str) -> bool:
+        """Removes stored content unless an attachment references it, returns whether it was removed"""
+        await self.lock_content(sha256)
+        try:
+            if storage.path(sha256) and not await self.is_referenced(sha256):
+                await storage.delete(sha256)
+                return True
+            return False
+        finally:
+            await self.session.commit()
+
     async def create(self, attachment: schemas.AttachmentCreate) -> UUID:
         attachment.id = attachment.id or uuid4()
         attachment.timestamp = attachment.timestamp or datetime.datetime.utcnow()
+        if attachment.sha256 and attachment.content is None:
+            # Shared content stored before the lock may have been removed as unreferenced meanwhile
+            await self.lock_content(attachment.sha256)
+            if not storage.path(attachment.sha256):
+                raise UnavailableError(f'Attachment {attachment.id} content was removed while it was uploaded')
         attachment = models.Attachment(**attachment.model_dump())
         self.session.add(attachment)
 
@@ -0,0 +1,125 @@
+import datetime
+import json
+from typing import Any, Callable
+from uuid import UUID, uuid4
+
+from sqlalchemy import Column, DateTime, MetaData, Row, Table, select
+from sqlalchemy.dialects.postgresql import insert, DOUBLE_PRECISION, JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import CreateTable, DropTable
+
+from agnostic.core import config, models, schemas
+
+# PostgreSQL protocol limits a single statement to 32767 bind parameters
+MAX_PARAMETERS = 32767
+
+
+def get_copy_converter(column: Column) -> Callable[[Any], Any] | None:
+    # COPY goes straight to asyncpg, so values have to be in the form its codecs expect
+    if isinstance(column.type, JSONB):
+        return lambda value: json.dumps(value) if value is not None else None
+    if isinstance(column.type, DOUBLE_PRECISION):
+        return lambda value: float(value) if value is not None else None
+    if isinstance(column.type, DateTime):
+        return lambda value: (
+            value.astimezone(datetime.timezone.utc).replace(tzinfo=None) if value and value.tzinfo else value
+        )
+    return None
+
+
+async def copy_many(session: AsyncSession, model: type[models.Base], rows: list[dict[str, Any]]) -> set[UUID]:
+    """Loads rows with COPY into a temporary table and moves them to the model table skipping existing ids
+
+    All rows must have the same keys. Returns ids of inserted rows,
+    the transaction is left open for the caller to commit.
+    """
+    if not rows:
+        return set()
+
+    columns = [model.__table__.c[key] for key in rows[0]]
+    temp = Table(
+        f'copy_{model.__tablename__}_{uuid4().hex}',
+        MetaData(),
+        *(Column(column.name, column.type) for column in columns),
+        prefixes=['TEMPORARY'],
+        postgresql_on_commit='DROP'
+    )
+    connection = await session.connection()
+    await connection.execute(CreateTable(temp))
+
+    converters = [(column.key, get_copy_converter(column)) for column in columns]
+    raw_connection = (await connection.get_raw_connection()).driver_connection
+    await raw_connection.copy_records_to_table(
+        temp.name,
+        columns=[column.name for column in columns],
+        records=[
+            tuple(convert(row[key]) if convert else row[key] for key, convert in converters)
+            for row in rows
+        ]
+    )
+
+    result = await connection.execute(
+        insert(model)
+        .from_select([column.name for column in columns], select(*temp.c))
+        .on_conflict_do_nothing()
+        .returning(model.id)
+    )
+    inserted = set(result.scalars().all())
+    await connection.execute(DropTable(temp))
+
+    return inserted
+
+
+async def insert_one(session: AsyncSession, model: type[models.Base], row: dict[str, Any]) -> Row | None:
+    """Inserts a row unless one with its id exists, returns the inserted row or None
+
+    A client retrying a request it got no response to sends the same id again, which is skipped without
+    failing the transaction. The transaction is left open for the caller to commit.
+    """
+    return (
+        await session.execute(
+            insert(model)
+            .values(**row)
+            .on_conflict_do_nothing()
+            .returning(*model.__table__.c)
+        )
+    ).first()
+
+
+async def insert_many(session: AsyncSession, model: type[models.Base],
+                      rows: list[dict[str, Any]]) -> list[schemas.BatchItemStatus]:
+    """Inserts rows skipping the ones with existing ids
+
+    Small batches are written with multi-row INSERT ... VALUES, the ones of at least `db_copy_threshold`
+    rows are loaded with COPY. All rows must have the same keys. Statuses are returned in the order
+    of rows, the transaction is left open for the caller to commit.
+    """
+    statuses = [schemas.BatchItemStatus.DUPLICATE] * len(rows)
+    if not rows:
+        return statuses
+
+    seen, unique = set(), []
+    for index, row in enumerate(rows):
+        if row['id'] not in seen:
+            seen.add(row['id'])
+            unique.append((index, row))
+
+    if config.options.db_copy_threshold and len(unique) >= config.options.db_copy_threshold:
+        inserted = await copy_many(session, model, [row for _, row in unique])
+    else:
+        inserted = set()
+        size = max(MAX_PARAMETERS // len(rows[0]), 1)
+        for offset in range(0, len(unique), size):
+            result = await session.execute(
+                insert(model)
+                .values([row for _, row in unique[offset:offset + size]])
+                .on_conflict_do_nothing()
+                .returning(model.id)
+            )
+            inserted.update(result.scalars().all())
+
+    for index, row in unique:
+        if row['id'] in inserted:
+            statuses[index] = schemas.BatchItemStatus.CREATED
+
+    return statuses
@@ -0,0 +1,32 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agnostic.core import schemas
+from .metrics import Metrics
+from .metrics_ot import MetricsOverTime
+from .progress import Progress
+from .requests import Requests
+from .tests import Tests
+
+
+class Events:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        # Tests go first so the rest of the events in a batch can refer to them
+        self.writers = {
+            schemas.EventType.TEST: Tests(session).upsert_many,
+            schemas.EventType.PROGRESS: Progress(session).create_many,
+            schemas.EventType.METRIC: Metrics(session).create_many,
+            schemas.EventType.METRIC_OT: MetricsOverTime(session).create_many,
+            schemas.EventType.REQUEST: Requests(session).create_many,
+        }
+
+    async def write(
+            self,
+            events: dict[schemas.EventType, list]
+    ) -> dict[schemas.EventType, list[schemas.BatchItemStatus]]:
+        statuses = {}
+        for event_type, write in self.writers.items():
+            if events.get(event_type):
+                statuses[event_type] = await write(events[event_type], commit=False)
+        await self.session.commit()
+        return statuses
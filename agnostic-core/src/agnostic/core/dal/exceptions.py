@@ -18,3 +18,7 @@ class ForeignKeyError(DALException):
 
 class InvalidArgumentsError(DALException):
     ...
+
+
+class UnavailableError(DALException):
+    ...
@@ -1,58 +1,242 @@
 import datetime
+import json
+from typing import AsyncIterator
 from uuid import UUID, uuid4
 
-from sqlalchemy import func
+from sqlalchemy import func, literal
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.sql.expression import update
+from sqlalchemy.sql.expression import delete, insert, update
 from sqlalchemy.sql.functions import concat
 
 from agnostic.core import models, schemas
+from agnostic.core.notifications import LOGS, MAX_PAYLOAD_SIZE, lock_feed, notify
 from .exceptions import DuplicateError, ForeignKeyError, NotFoundError, InvalidArgumentsError
 
 
+def log_body():
+    # Log body is the one the log was created with followed by appended chunks
+    chunks = (
+        select(func.string_agg(models.LogChunk.text, aggregate_order_by(literal(''), models.LogChunk.seq)))
+        .where(models.LogChunk.log_id == models.Log.id)
+        .scalar_subquery()
+    )
+    return concat(models.Log.body, chunks)
+
+
+def log_columns(body: bool = True):
+    columns = [column for column in models.Log.__table__.c if column.name != 'body']
+    if body:
+        columns.append(log_body().label('body'))
+    return columns
+
+
 class Logs:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get(self, id: UUID) -> schemas.Log:
+    async def get(self, id: UUID, body: bool = True) -> schemas.Log:
         log = (
             await self.session.execute(
-                select(models.Log)
+                select(*log_columns(body))
                 .where(models.Log.id == id)
             )
-        ).scalar()
+        ).one_or_none()
 
         if not log:
             raise NotFoundError(f'Log {id} does not exist')
 
         return schemas.Log.model_validate(log)
 
-    async def get_body(self, id: UUID, offset: int | None = None, limit: int | None = None) -> str:
-        args = [offset or 0]
-        if limit:
-            args.append(limit)
+    async def get_body(self, id: UUID, offset: int | None = None, limit: int | None = None,
+                       seq: int | None = None, page_size: int = 100) -> str:
+        # Same semantics as substring(body, offset, limit) over the whole body up to chunk `seq` if it is given
+        offset = offset or 0
+        begin = max(offset, 1) - 1
+        end = max(offset - 1 + limit, begin) if limit else None
+        length = [end - begin] if end is not None else []
 
-        body = (
+        log = (
             await self.session.execute(
                 select(
-                    func.substring(models.Log.body, *args)
+                    func.substring(func.coalesce(models.Log.body, ''), begin + 1, *length),
+                    func.char_length(func.coalesce(models.Log.body, ''))
                 )
                 .where(models.Log.id == id)
             )
+        ).one_or_none()
+
+        if not log:
+            raise NotFoundError(f'Log {id} does not exist')
+
+        head, head_length = log
+        if end is not None and end <= head_length:
+            return head
+
+        first = await self.locate_chunk(id, models.LogChunk.length, head_length, begin, seq)
+        if not first:
+            return head
+
+        parts, (first_seq, position) = [head], first
+        async for _, text in self.iter_chunks(id, first_seq, seq, page_size):
+            if end is not None and position >= end:
+                break
+            parts.append(text[max(begin - position, 0):end - position if end is not None else None])
+            position += len(text)
+
+        return ''.join(parts)
+
+    async def locate_chunk(self, id: UUID, measure, head: int, position: int,
+                           seq: int | None = None) -> tuple[int, int] | None:
+        """Sequence number and starting position of the chunk `position` falls into, None past the end
+
+        Positions are measured by `measure`, i.e. length in characters or size in bytes, after the `head` of the body
+        the log was created with. Running totals are only summed up to the chunk found.
+        """
+        chunk_position = (func.sum(measure).over(order_by=models.LogChunk.seq) - measure + head).label('position')
+        chunks = (
+            select(models.LogChunk.seq, measure.label('measure'), chunk_position)
+            .where(models.LogChunk.log_id == id)
+        )
+        if seq is not None:
+            chunks = chunks.where(models.LogChunk.seq <= seq)
+        chunks = chunks.subquery()
+        chunk = (
+            await self.session.execute(
+                select(chunks.c.seq, chunks.c.position)
+                .where(chunks.c.position + chunks.c.measure > position)
+                .order_by(chunks.c.seq)
+                .limit(1)
+            )
+        ).one_or_none()
+        return tuple(chunk) if chunk else None
+
+    async def iter_chunks(self, id: UUID, first: int, last: int | None = None,
+                          page_size: int = 100) -> AsyncIterator[tuple[int, str]]:
+        """Chunks from chunk `first` up to chunk `last` as (seq, text) pairs, read `page_size` at a time"""
+        condition = models.LogChunk.seq >= first
+        while True:
+            query = (
+                select(models.LogChunk.seq, models.LogChunk.text)
+                .where(models.LogChunk.log_id == id, condition)
+                .order_by(models.LogChunk.seq)
+                .limit(page_size)
+            )
+            if last is not None:
+                query = query.where(models.LogChunk.seq <= last)
+            page = (await self.session.execute(query)).all()
+            for seq, text in page:
+                yield seq, text
+            if len(page) < page_size:
+                return
+            condition = models.LogChunk.seq > seq
+
+    async def get_last_seq(self, id: UUID) -> int:
+        """Sequence number of the last appended chunk, 0 if nothing was appended"""
+        seq = (
+            await self.session.execute(
+                select(func.coalesce(func.max(models.LogChunk.seq), 0))
+                .select_from(models.Log)
+                .outerjoin(models.LogChunk, models.LogChunk.log_id == models.Log.id)
+                .where(models.Log.id == id)
+                .group_by(models.Log.id)
+            )
         ).scalar()
 
-        if not body:
+        if seq is None:
             raise NotFoundError(f'Log {id} does not exist')
 
-        return body
+        return seq
+
+    async def get_chunks(self, id: UUID, seq: int, limit: int = 100) -> list[tuple[int, str]]:
+        """Chunks appended after chunk `seq` as (seq, text) pairs"""
+        return [
+            tuple(chunk) for chunk in await self.session.execute(
+                select(models.LogChunk.seq, models.LogChunk.text)
+                .where(models.LogChunk.log_id == id, models.LogChunk.seq > seq)
+                .order_by(models.LogChunk.seq)
+                .limit(limit)
+            )
+        ]
+
+    async def get_size(self, id: UUID) -> int:
+        """Size of the UTF-8 encoded body in bytes"""
+        chunks = (
+            select(func.sum(models.LogChunk.size))
+            .where(models.LogChunk.log_id == models.Log.id)
+            .scalar_subquery()
+        )
+        size = (
+            await self.session.execute(
+                select(func.coalesce(func.octet_length(models.Log.body), 0) + func.coalesce(chunks, 0))
+                .where(models.Log.id == id)
+            )
+        ).scalar()
+
+        if size is None:
+            raise NotFoundError(f'Log {id} does not exist')
+
+        return size
+
+    async def iter_body(self, id: UUID, start: int = 0, end: int | None = None,
+                        window: int = 1024 * 1024, page_size: int = 16) -> AsyncIterator[bytes]:
+        """Streams bytes [start, end) of the UTF-8 encoded body in pieces of at most `window` bytes
+
+        Neither is read whole, the body the log was created with is read `window` characters at a time and appended
+        chunks are read `page_size` at a time.
+        """
+        sizes = (
+            await self.session.execute(
+                select(
+                    func.coalesce(func.octet_length(models.Log.body), 0),
+                    func.coalesce(func.char_length(models.Log.body), 0)
+                )
+                .where(models.Log.id == id)
+            )
+        ).one_or_none()
+        head_size, head_length = sizes or (0, 0)
+
+        # Bytes of ASCII bodies are characters, other bodies are read from the beginning to find where bytes start
+        position = index = start if head_size == head_length else 0
+        head_end = head_size if end is None else min(head_size, end)
+        while start < head_end and position < head_end:
+            text = (
+                await self.session.execute(
+                    select(func.substring(models.Log.body, index + 1, window))
+                    .where(models.Log.id == id)
+                )
+            ).scalar()
+            if not text:
+                break
+            data = text.encode('utf-8')
+            piece = data[max(start - position, 0):head_end - position]
+            for i in range(0, len(piece), window):
+                yield piece[i:i + window]
+            index += len(text)
+            position += len(data)
+
+        if end is not None and end <= head_size:
+            return
+
+        first = await self.locate_chunk(id, models.LogChunk.size, head_size, start)
+        if not first:
+            return
+
+        first_seq, position = first
+        async for _, text in self.iter_chunks(id, first_seq, page_size=page_size):
+            if end is not None and position >= end:
+                return
+            data = text.encode('utf-8')
+            yield data[max(start - position, 0):None if end is None else end - position]
+            position += len(data)
 
     async def get_all(self, test_run_id: UUID | None = None, test_id: UUID | None = None) -> [schemas.Log]:
         if not test_run_id and not test_id:
             raise InvalidArgumentsError('Test Run and/or Test id have to be provided')
 
-        query = select(models.Log)
+        query = select(*log_columns())
 
         if test_run_id:
             query = query.where(models.Log.test_run_id == test_run_id)
@@ -60,7 +244,7 @@ class Logs:
         if test_id:
             query = query.where(models.Log.test_id == test_id)
 
-        logs = (await self.session.execute(query)).scalars().all()
+        logs = (await self.session.execute(query)).all()
 
         return [schemas.Log.model_validate(log) for log in logs]
 
@@ -81,12 +265,13 @@ class Logs:
         return log.id
 
     async def update(self, log: schemas.Log, exclude_unset: bool = False) -> UUID:
+        values = log.model_dump(exclude_unset=exclude_unset)
         try:
             result = (
                 await self.session.execute(
                     update(models.Log)
                     .where(models.Log.id == log.id)
-                    .values(**log.model_dump(exclude_unset=exclude_unset))
+                    .values(**values)
                 )
             )
         except IntegrityError:
@@ -95,20 +280,96 @@ class Logs:
         if result.rowcount < 1:
             raise NotFoundError(f'Log {log.id} does not exist')
 
+        if 'body' in values:
+            # The body is replaced, appended chunks are not a part of it anymore
+            await self.session.execute(
+                delete(models.LogChunk)
+                .where(models.LogChunk.log_id == log.id)
+            )
+
         await self.session.commit()
 
         return log.id
 
     async def append_body(self, id: UUID, body: str) -> id:
-        result = await self.session.execute(
-            update(models.Log)
-            .where(models.Log.id == id)
-            .values(body=concat(models.Log.body, body))
-        )
-
-        if result.rowcount < 1:
+        size = len(body.encode('utf-8'))
+        await lock_feed(self.session, LOGS, [id])
+        try:
+            seq = (
+                await self.session.execute(
+                    insert(models.LogChunk)
+                    .values(log_id=id, text=body, length=len(body), size=size)
+                    .returning(models.LogChunk.seq)
+                )
+            ).scalar()
+            # Followers get small appends right away and read larger ones from the database
+            payload = {'seq': seq, 'text': body}
+            # Escaping makes the payload larger than the text itself, non-ASCII text several times so
+            if len(json.dumps(payload).encode('utf-8')) > MAX_PAYLOAD_SIZE:
+                payload = {'seq': seq}
+            await notify(self.session, LOGS, id, payload)
+            await self.session.commit()
+        except IntegrityError:
             raise NotFoundError(f'Log {id} does not exist')
 
-        await self.session.commit()
-
         return id
+
+    async def compact(self, chunk_size: int, limit: int = 100) -> int:
+        """Folds small chunks of finished logs into chunks of at least `chunk_size` characters
+
+        A log is finished when it has a finish time or its test run is finished. Returns number of compacted logs.
+        """
+        small = func.count().filter(models.LogChunk.length < chunk_size)
+        log_ids = (
+            await self.session.execute(
+                select(models.LogChunk.log_id)
+                .join(models.Log, models.Log.id == models.LogChunk.log_id)
+                .join(models.TestRun, models.TestRun.id == models.Log.test_run_id)
+                .where(models.Log.finish.is_not(None) | models.TestRun.finish.is_not(None))
+                .group_by(models.LogChunk.log_id)
+                .having(small > 1)
+                .limit(limit)
+            )
+        ).scalars().all()
+
+        for log_id in log_ids:
+            # Lock chunks so concurrent compactions of the same log wait for each other
+            chunks = (
+                await self.session.execute(
+                    select(models.LogChunk.id, models.LogChunk.length, models.LogChunk.size)
+                    .where(models.LogChunk.log_id == log_id)
+                    .order_by(models.LogChunk.seq)
+                    .with_for_update()
+                )
+            ).all()
+
+            groups, group = [], []
+            for chunk in chunks:
+                group.append(chunk)
+                if sum(c.length for c in group) >= chunk_size:
+                    groups.append(group)
+                    group = []
+            groups.append(group)
+
+            for group in groups:
+                if len(group) < 2:
+                    continue
+                ids = [c.id for c in group]
+                merged = (
+                    select(func.string_agg(models.LogChunk.text, aggregate_order_by(literal(''), models.LogChunk.seq)))
+                    .where(models.LogChunk.id.in_(ids))
+                    .scalar_subquery()
+                )
+                # Merged text takes the place of the last chunk, so reads up to and after any seq miss nothing of it
+                await self.session.execute(
+                    update(models.LogChunk)
+                    .where(models.LogChunk.id == ids[-1])
+                    .values(text=merged, length=sum(c.length for c in group), size=sum(c.size for c in group))
+                )
+                await self.session.execute(
+                    delete(models.LogChunk)
+                    .where(models.LogChunk.id.in_(ids[:-1]))
+                )
+            await self.session.commit()
+
+        return len(log_ids)
@@ -7,6 +7,7 @@ from sqlalchemy.future import select
 from sqlalchemy.sql.expression import update
 
 from agnostic.core import models, schemas
+from .bulk import insert_one, insert_many
 from .exceptions import DuplicateError, ForeignKeyError, NotFoundError, InvalidArgumentsError
 
 
@@ -46,19 +47,36 @@ class MetricsOverTime:
     async def create(self, metric: schemas.MetricOverTimeCreate) -> UUID:
         metric.id = metric.id or uuid4()
         metric.timestamp = metric.timestamp or datetime.datetime.utcnow()
-        metric = models.MetricOverTime(**metric.model_dump())
-        self.session.add(metric)
 
         try:
+            created = await insert_one(self.session, models.MetricOverTime, metric.model_dump())
             await self.session.commit()
-        except IntegrityError as e:
-            if 'foreign key constraint' in e.orig.args[0]:
-                raise ForeignKeyError(f'Test Run {metric.test_run_id} or Test {metric.test_id} does not exist')
-            else:
-                raise DuplicateError(f'Metric {metric.id} already exists')
+        except IntegrityError:
+            raise ForeignKeyError(f'Test Run {metric.test_run_id} or Test {metric.test_id} does not exist')
+
+        if not created:
+            raise DuplicateError(f'Metric {metric.id} already exists')
 
         return metric.id
 
+    async def create_many(self, metrics: list[schemas.MetricOverTimeCreate],
+                          commit: bool = True) -> list[schemas.BatchItemStatus]:
+        rows = []
+        for metric in metrics:
+            metric.id = metric.id or uuid4()
+            metric.timestamp = metric.timestamp or datetime.datetime.utcnow()
+            rows.append(metric.model_dump())
+
+        try:
+            statuses = await insert_many(self.session, models.MetricOverTime, rows)
+            if commit:
+                await self.session.commit()
+        except IntegrityError:
+            test_runs = ', '.join(sorted({str(row['test_run_id']) for row in rows}))
+            raise ForeignKeyError(f'Test Run {test_runs} does not exist')
+
+        return statuses
+
     async def update(self, metric: schemas.MetricOverTime, exclude_unset: bool = False) -> UUID:
         try:
             result = (
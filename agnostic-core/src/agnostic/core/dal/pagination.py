@@ -0,0 +1,144 @@
+import base64
+import binascii
+import datetime
+import json
+import math
+from typing import Any, NamedTuple
+
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import to_jsonable_python
+from sqlalchemy import Row, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.future import select
+from sqlalchemy.sql.elements import ClauseElement, ColumnElement
+from sqlalchemy.sql.expression import Executable, and_, or_, false, func, tuple_
+
+from agnostic.core import config
+from .exceptions import InvalidArgumentsError
+
+# Row attribute holding the value, expression it is sorted by and whether the order is descending
+SortKey = tuple[str, ColumnElement, bool]
+
+
+class Explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` of a statement, returns the plan without running it"""
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain)
+def compile_explain(element: Explain, compiler, **kw) -> str:
+    return f'EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}'
+
+
+class PageCount(NamedTuple):
+    count: int
+    pages: int
+    estimated: bool = False
+
+
+def nullable(expression: ColumnElement) -> bool:
+    return getattr(expression, 'nullable', True) is not False
+
+
+def encode_cursor(order_by: str, order: str, values: list[Any]) -> str:
+    data = json.dumps([order_by, order, *values], default=to_jsonable_python, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, order_by: str, order: str, keys: list[SortKey]) -> list[Any]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise InvalidArgumentsError('Invalid cursor')
+
+    if not isinstance(data, list) or len(data) != len(keys) + 2:
+        raise InvalidArgumentsError('Invalid cursor')
+    if data[:2] != [order_by, order]:
+        raise InvalidArgumentsError(f'Cursor was issued for another order than "{order_by} {order}"')
+
+    values = []
+    for (name, expression, _), value in zip(keys, data[2:]):
+        try:
+            value = None if value is None else TypeAdapter(expression.type.python_type).validate_python(value)
+        except (NotImplementedError, ValidationError):
+            raise InvalidArgumentsError(f'Invalid cursor value for "{name}"')
+        if isinstance(value, datetime.datetime) and value.tzinfo and not getattr(expression.type, 'timezone', True):
+            # Timestamps are stored in UTC, but mapped as naive ones
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        values.append(value)
+    return values
+
+
+def keyset_filter(keys: list[SortKey], values: list[Any]) -> ColumnElement:
+    """Rows sorted after the one with given sort key values
+
+    NULLs are sorted last in ascending and first in descending order, as PostgreSQL does by default.
+    """
+    if len({descending for _, _, descending in keys}) == 1 and not any(nullable(key[1]) for key in keys):
+        # A row comparison is able to use an index on the sort keys
+        row, after = tuple_(*[expression for _, expression, _ in keys]), tuple_(*values)
+        return row < after if keys[0][2] else row > after
+
+    clauses = []
+    for i, ((_, expression, descending), value) in enumerate(zip(keys, values)):
+        if descending:
+            after = expression.is_not(None) if value is None else expression < value
+        elif value is None:
+            continue
+        else:
+            after = or_(expression > value, expression.is_(None)) if nullable(expression) else expression > value
+        equal = [key[1].is_not_distinct_from(previous) for key, previous in zip(keys[:i], values[:i])]
+        clauses.append(and_(*equal, after))
+    return or_(*clauses) if clauses else false()
+
+
+async def fetch_page(session: AsyncSession,
+                     query: Select,
+                     keys: list[SortKey],
+                     order_by: str,
+                     order: str,
+                     page: int,
+                     page_size: int,
+                     cursor: str | None = None) -> tuple[list[Row], str | None]:
+    """Fetches a page by offset or, when a cursor is given, the page following the cursor
+
+    A cursor to the next page is returned as long as there are rows after the fetched ones.
+    """
+    query = query.order_by(*[expression.desc() if descending else expression.asc()
+                              for _, expression, descending in keys])
+    if cursor is not None:
+        query = query.where(keyset_filter(keys, decode_cursor(cursor, order_by, order, keys)))
+    else:
+        query = query.offset((page - 1) * page_size)
+
+    rows = (await session.execute(query.limit(page_size + 1))).all()
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(order_by, order, [getattr(rows[-1], name) for name, _, _ in keys])
+
+
+async def estimate_rows(session: AsyncSession, query: Select) -> int:
+    """Number of rows the planner expects the query to return, only as good as the table statistics"""
+    plan = (await session.execute(Explain(query))).scalar_one()
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+async def count_pages(session: AsyncSession, query: Select, page_size: int, estimate: bool = False) -> PageCount:
+    """Counts rows of a paged query
+
+    With `estimate` the count is taken from the query plan when the planner expects more than
+    `count_estimate_threshold` rows, smaller results are always counted exactly.
+    """
+    threshold = config.options.count_estimate_threshold
+    if estimate and threshold is not None:
+        rows = await estimate_rows(session, query)
+        if rows > threshold:
+            return PageCount(rows, math.ceil(rows / page_size), True)
+
+    rows = (await session.execute(select(func.count()).select_from(query.subquery()))).scalar_one()
+    return PageCount(rows, math.ceil(rows / page_size))
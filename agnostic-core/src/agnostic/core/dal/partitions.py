@@ -0,0 +1,79 @@
+import datetime
+import re
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql.expression import func
+
+from agnostic.core import models
+
+PARTITIONED = (models.Progress, models.Request, models.MetricOverTime)
+
+
+def next_month(month: datetime.datetime) -> datetime.datetime:
+    return (month + datetime.timedelta(days=32)).replace(day=1)
+
+
+class Partitions:
+    """Maintains monthly partitions of the tables partitioned by `timestamp`
+
+    Every table has a partition per month named `<table>_<yyyy>_<mm>`, a `<table>_legacy` one with rows
+    from before the table was partitioned and a `<table>_default` one with rows no other partition accepts.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_months(self, table: str) -> list[datetime.datetime]:
+        partitions = (
+            await self.session.execute(
+                text('SELECT relname FROM pg_inherits JOIN pg_class ON pg_class.oid = inhrelid '
+                     'WHERE inhparent = cast(:table AS regclass)'),
+                {'table': table}
+            )
+        ).scalars().all()
+        months = []
+        for partition in partitions:
+            if match := re.fullmatch(rf'{table}_(\d{{4}})_(\d{{2}})', partition):
+                months.append(datetime.datetime(int(match[1]), int(match[2]), 1))
+        return sorted(months)
+
+    async def create(self, table: str, month: datetime.datetime):
+        """Creates the partition of a month, moving rows of that month out of the default partition"""
+        name = f'{table}_{month:%Y_%m}'
+        start, end = (value.replace(tzinfo=datetime.timezone.utc) for value in (month, next_month(month)))
+        await self.session.execute(text(f'CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)'))
+        await self.session.execute(
+            text(f'WITH moved AS (DELETE FROM {table}_default WHERE timestamp >= :start AND timestamp < :end '
+                 f'RETURNING *) INSERT INTO {name} SELECT * FROM moved'),
+            {'start': start, 'end': end}
+        )
+        await self.session.execute(
+            text(f"ALTER TABLE {table} ATTACH PARTITION {name} "
+                 f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')")
+        )
+
+    async def create_ahead(self, months: int) -> list[str]:
+        """Creates partitions following the latest one up to `months` after the current one, returns their names"""
+        last = datetime.datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        for _ in range(months):
+            last = next_month(last)
+
+        created = []
+        for model in PARTITIONED:
+            table = model.__tablename__
+            # Concurrent web service instances would both try to create the same partitions
+            await self.session.execute(select(func.pg_advisory_xact_lock(func.hashtext(f'partitions {table}'))))
+
+            # Tables without monthly partitions are not partitioned yet, the migration creates the first ones.
+            # Partitions are kept contiguous, so months without any rows get one as well.
+            existing = await self.get_months(table)
+            month = next_month(existing[-1]) if existing else None
+            while month and month <= last:
+                await self.create(table, month)
+                created.append(f'{table}_{month:%Y_%m}')
+                month = next_month(month)
+            await self.session.commit()
+
+        return created
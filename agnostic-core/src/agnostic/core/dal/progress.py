@@ -1,12 +1,16 @@
 import datetime
+import json
 from uuid import UUID, uuid4
 
+from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.sql.expression import update
 
 from agnostic.core import models, schemas
+from agnostic.core.notifications import MAX_PAYLOAD_SIZE, TEST_RUNS, lock_feed, notify
+from .bulk import insert_one, insert_many
 from .exceptions import DuplicateError, ForeignKeyError, NotFoundError, InvalidArgumentsError
 
 
@@ -43,22 +47,70 @@ class Progress:
 
         return [schemas.Progress.model_validate(progress) for progress in progresses]
 
+    async def get_after(self, test_run_id: UUID, seq: int, limit: int = 100) -> list[schemas.ProgressRecord]:
+        progresses = (
+            await self.session.execute(
+                select(models.Progress)
+                .where(models.Progress.test_run_id == test_run_id, models.Progress.seq > seq)
+                .order_by(models.Progress.seq)
+                .limit(limit)
+            )
+        ).scalars().all()
+
+        return [schemas.ProgressRecord.model_validate(progress) for progress in progresses]
+
+    async def get_last_seq(self, test_run_id: UUID) -> int:
+        return (
+            await self.session.execute(
+                select(func.coalesce(func.max(models.Progress.seq), 0))
+                .where(models.Progress.test_run_id == test_run_id)
+            )
+        ).scalar()
+
     async def create(self, progress: schemas.ProgressCreate) -> UUID:
         progress.id = progress.id or uuid4()
         progress.timestamp = progress.timestamp or datetime.datetime.utcnow()
-        progress = models.Progress(**progress.model_dump())
-        self.session.add(progress)
 
+        await lock_feed(self.session, TEST_RUNS, [progress.test_run_id])
         try:
-            await self.session.commit()
-        except IntegrityError as e:
-            if 'foreign key constraint' in e.orig.args[0]:
-                raise ForeignKeyError(f'Test Run {progress.test_run_id} or Test {progress.test_id} does not exist')
-            else:
-                raise DuplicateError(f'Progress record {progress.id} already exists')
+            created = await insert_one(self.session, models.Progress, progress.model_dump())
+        except IntegrityError:
+            raise ForeignKeyError(f'Test Run {progress.test_run_id} or Test {progress.test_id} does not exist')
+
+        if not created:
+            raise DuplicateError(f'Progress record {progress.id} already exists')
+
+        record = schemas.ProgressRecord.model_validate(created).model_dump(mode='json')
+        if len(json.dumps(record).encode('utf-8')) > MAX_PAYLOAD_SIZE:
+            record = {'seq': created.seq}
+        await notify(self.session, TEST_RUNS, progress.test_run_id, {'type': 'progress', **record})
+        await self.session.commit()
 
         return progress.id
 
+    async def create_many(self, progresses: list[schemas.ProgressCreate],
+                          commit: bool = True) -> list[schemas.BatchItemStatus]:
+        rows = []
+        for progress in progresses:
+            progress.id = progress.id or uuid4()
+            progress.timestamp = progress.timestamp or datetime.datetime.utcnow()
+            rows.append(progress.model_dump())
+
+        await lock_feed(self.session, TEST_RUNS, [row['test_run_id'] for row in rows])
+        try:
+            statuses = await insert_many(self.session, models.Progress, rows)
+            # Feed subscribers read batches from the database after their cursor
+            created = [row for row, status in zip(rows, statuses) if status == schemas.BatchItemStatus.CREATED]
+            for test_run_id in {row['test_run_id'] for row in created}:
+                await notify(self.session, TEST_RUNS, test_run_id, {'type': 'progress'})
+            if commit:
+                await self.session.commit()
+        except IntegrityError:
+            test_runs = ', '.join(sorted({str(row['test_run_id']) for row in rows}))
+            raise ForeignKeyError(f'Test Run {test_runs} does not exist')
+
+        return statuses
+
     async def update(self, progress: schemas.Progress, exclude_unset: bool = False) -> UUID:
         try:
             result = (
@@ -1,12 +1,12 @@
 import datetime
+import math
 from uuid import UUID
 
 from sqlalchemy.dialects.postgresql import JSONPATH
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import aliased
-from sqlalchemy.sql.elements import BinaryExpression
-from sqlalchemy.sql.expression import func, cast, text, and_, case as case_, or_
+from sqlalchemy.sql.elements import BinaryExpression, ColumnElement
+from sqlalchemy.sql.expression import func, cast, text, and_, case as case_, literal, literal_column, or_, union_all
 from sqlalchemy.types import Float
 
 import agnostic.core.schemas.reporting.logs
@@ -18,24 +18,33 @@ import agnostic.core.schemas.reporting.test_runs
 import agnostic.core.schemas.reporting.tests
 import agnostic.core.schemas.reporting.widgets
 from agnostic.core import models, schemas
+from agnostic.core.heartbeats import as_utc, heartbeats
+from .logs import log_body
+from .pagination import PageCount, SortKey, count_pages, fetch_page
+from .rollups import RESULTS, bucket_end, latest_bucket, tests_executed
 
 NOT_SET = '<not set>'
 
 
-def get_interval_filter(interval: str | None = None) -> tuple[str, list[BinaryExpression]]:
+def get_interval_start(interval: str | None = None) -> tuple[str, datetime.datetime | None]:
     match interval.lower() if interval else None:
         case 'week':
-            return 'day', [models.TestRun.start >= datetime.datetime.utcnow() - datetime.timedelta(days=7)]
+            return 'day', datetime.datetime.utcnow() - datetime.timedelta(days=7)
         case 'month':
-            return 'day', [models.TestRun.start >= datetime.datetime.utcnow() - datetime.timedelta(days=30)]
+            return 'day', datetime.datetime.utcnow() - datetime.timedelta(days=30)
         case 'quarter':
-            return 'week', [models.TestRun.start >= datetime.datetime.utcnow() - datetime.timedelta(days=90)]
+            return 'week', datetime.datetime.utcnow() - datetime.timedelta(days=90)
         case 'year':
-            return 'month', [models.TestRun.start >= datetime.datetime.utcnow() - datetime.timedelta(days=365)]
+            return 'month', datetime.datetime.utcnow() - datetime.timedelta(days=365)
         case 'all':
-            return 'month', []
+            return 'month', None
         case _:
-            return 'month', []
+            return 'month', None
+
+
+def get_interval_filter(interval: str | None = None) -> tuple[str, list[BinaryExpression]]:
+    trunc_to, since = get_interval_start(interval)
+    return trunc_to, [models.TestRun.start >= since] if since else []
 
 
 def get_variant_filter(variant: list[str] | None = None) -> list[BinaryExpression]:
@@ -47,17 +56,18 @@ def get_variant_filter(variant: list[str] | None = None) -> list[BinaryExpressio
     return filters
 
 
-def get_branch_filter(field: str, branches: list[str] | None = None) -> list[BinaryExpression]:
+def get_branch_filter(field: str, branches: list[str] | None = None,
+                      model: type[models.Base] = models.TestRun) -> list[BinaryExpression]:
     if branches:
         branch_filters = []
         in_branches = []
         for branch in branches:
             if branch == NOT_SET:
-                branch_filters.append(getattr(models.TestRun, field).is_(None))
+                branch_filters.append(getattr(model, field).is_(None))
             else:
                 in_branches.append(branch)
         if in_branches:
-            branch_filters.append(getattr(models.TestRun, field).in_(in_branches))
+            branch_filters.append(getattr(model, field).in_(in_branches))
 
         return branch_filters
     return []
@@ -74,7 +84,13 @@ def get_test_run_filter(project_id: UUID,
     if not test_run_id:
         trunc_to, filters = get_interval_filter(interval)
         tr_filters.extend(filters)
-        tr_filters.append(or_(*get_variant_filter(variant)))
+        if variant_filters := get_variant_filter(variant):
+            # A semi-join, joining variants would yield a row per variant of every test run
+            tr_filters.append(
+                select(models.TestRunVariant.id)
+                .where(models.TestRunVariant.test_run_id == models.TestRun.id, or_(*variant_filters))
+                .exists()
+            )
         tr_filters.append(or_(*get_branch_filter('sut_branch', sut_branch)))
         tr_filters.append(or_(*get_branch_filter('test_branch', test_branch)))
     else:
@@ -83,6 +99,32 @@ def get_test_run_filter(project_id: UUID,
     return tr_filters, trunc_to
 
 
+def get_rollup_filter(project_id: UUID,
+                      trunc_to: str,
+                      sut_branch: list[str] | None = None,
+                      test_branch: list[str] | None = None,
+                      variant: list[str] | None = None) -> list[BinaryExpression]:
+    filters = [models.TestRunRollup.project_id == project_id, models.TestRunRollup.interval == trunc_to]
+    variant_filters = []
+    for var in variant or []:
+        name, value = var.split(' -eq ')
+        variant_filters.append(models.TestRunRollup.variant.contains({name: value}))
+    filters.append(or_(*variant_filters))
+    filters.append(or_(*get_branch_filter('sut_branch', sut_branch, models.TestRunRollup)))
+    filters.append(or_(*get_branch_filter('test_branch', test_branch, models.TestRunRollup)))
+    return filters
+
+
+def get_sort_keys(columns: dict[str, ColumnElement], order_by: str, order: str,
+                  id: ColumnElement, then_by: str | None = None) -> list[SortKey]:
+    """Sort keys of a paged list, ties are ordered by `then_by` ascending and then by id"""
+    keys = [(order_by, columns[order_by], order == 'desc')]
+    if then_by and order_by != then_by:
+        keys.append((then_by, columns[then_by], False))
+    keys.append(('id', id, order == 'desc'))
+    return keys
+
+
 def get_test_filter(test_run_id: UUID, result: list[str] | None, search: list[str] | None) -> list[BinaryExpression]:
     test_filter = [models.Test.test_run_id == test_run_id,]
 
@@ -95,12 +137,28 @@ def get_test_filter(test_run_id: UUID, result: list[str] | None, search: list[st
     if search:
         search_filter = []
         for term in search:
-            search_filter.append(func.concat(models.Test.path, '/', models.Test.name).like(f'%{term}%'))
+            search_filter.append(models.Test.full_name.like(f'%{term}%'))
         test_filter.append(or_(*search_filter))
 
     return test_filter
 
 
+def get_partition_window(model: type[models.TimePartitioned], *test_run_filters: ColumnElement) -> ColumnElement:
+    """Limits rows of a table partitioned by month to the time since the matching test runs started
+
+    PostgreSQL then skips partitions of earlier months. Records are reported while a test run is running,
+    timestamps before its start only come from reporter clocks behind the one of the test run, a day of slack
+    covers those. Nothing bounds them from above, reporters may keep stamping records after a test run finished.
+    """
+    slack = literal_column("interval '1 day'")
+    start = select(
+        func.min(models.TestRun.start) - slack
+    ).where(
+        *test_run_filters
+    ).scalar_subquery()
+    return model.timestamp >= start
+
+
 class Reporting:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -152,84 +210,69 @@ class Reporting:
                             test_branch: list[str] | None = None,
                             variant: list[str] | None = None,
                             interval: str | None = None,
-                            test_run_id: UUID | None = None) -> agnostic.core.schemas.reporting.test_runs.PagedTestRuns:
+                            test_run_id: UUID | None = None,
+                            cursor: str | None = None,
+                            count: bool = True,
+                            estimate_count: bool = False) -> agnostic.core.schemas.reporting.test_runs.PagedTestRuns:
 
         tr_filters, _ = get_test_run_filter(project_id, sut_branch, test_branch, variant, interval, test_run_id)
 
-        pages = (
-            await self.session.execute(
-                select(
-                    func.count(func.distinct(models.TestRun.id)).label('count'),
-                    func.ceil(cast(func.count(func.distinct(models.TestRun.id)), Float) / page_size).label('pages')
-                ).join(
-                    models.TestRunVariant, models.TestRunVariant.test_run_id == models.TestRun.id, isouter=True
-                ).where(
-                    and_(*tr_filters)
-                )
-            )
-        ).first()
+        pages = await count_pages(
+            self.session, select(models.TestRun.id).where(and_(*tr_filters)), page_size, estimate_count
+        ) if count else None
 
-        t_count = select(
-            models.Test.test_run_id,
-            func.count(models.Test.id).label('tests_executed'),
-            func.count(models.Test.id).filter(models.Test.result == 'failed').label('tests_failed'),
-        ).group_by(
-            models.Test.test_run_id
-        ).subquery()
-
-        trv = aliased(models.TestRunVariant)
+        variants = select(
+            func.jsonb_object_agg(models.TestRunVariant.name, models.TestRunVariant.value)
+        ).where(
+            models.TestRunVariant.test_run_id == models.TestRun.id
+        ).scalar_subquery()
+
+        columns = {name: getattr(models.TestRun, name) for name in
+                   ('start', 'finish', 'sut_branch', 'sut_version', 'test_branch', 'test_version')}
+        test_runs, next_cursor = await fetch_page(
+            self.session,
+            select(
+                models.TestRun.id,
+                models.TestRun.sut_branch,
+                models.TestRun.sut_version,
+                models.TestRun.test_branch,
+                models.TestRun.test_version,
+                models.TestRun.start,
+                models.TestRun.finish,
+                models.TestRun.heartbeat,
+                models.TestRun.properties,
+                (models.TestRun.finish - models.TestRun.start).label('execution_time'),
+                variants.label('variant'),
+                tests_executed().label('tests_executed'),
+                models.TestRun.tests_failed,
+                models.TestRun.tests_passed,
+                models.TestRun.tests_skipped,
+                models.TestRun.tests_xpassed,
+                models.TestRun.tests_xfailed,
+                models.TestRun.tests_unknown,
+                models.TestRun.tests_duration
+            ).where(
+                and_(*tr_filters)
+            ),
+            get_sort_keys(columns, order_by, order, models.TestRun.id),
+            order_by, order, page, page_size, cursor
+        )
 
-        test_runs = (
-            await self.session.execute(
-                select(
-                    models.TestRun.id,
-                    models.TestRun.sut_branch,
-                    models.TestRun.sut_version,
-                    models.TestRun.test_branch,
-                    models.TestRun.test_version,
-                    models.TestRun.start,
-                    models.TestRun.finish,
-                    models.TestRun.heartbeat,
-                    models.TestRun.properties,
-                    (models.TestRun.finish - models.TestRun.start).label('execution_time'),
-                    func.jsonb_object_agg(
-                        trv.name, trv.value
-                    ).filter(trv.name.is_not(None)).label('variant'),
-                    case_(
-                        (func.max(t_count.c.tests_executed).is_(None), 0), else_=func.max(t_count.c.tests_executed)
-                    ).label('tests_executed'),
-                    case_(
-                            (func.max(t_count.c.tests_failed).is_(None), 0), else_=func.max(t_count.c.tests_failed)
-                        ).label('tests_failed')
-                ).join(
-                    t_count, t_count.c.test_run_id == models.TestRun.id, isouter=True
-                ).join(
-                    models.TestRunVariant, models.TestRun.id == models.TestRunVariant.test_run_id, isouter=True
-                ).join(
-                    trv, models.TestRun.id == trv.test_run_id, isouter=True
-                ).where(
-                    and_(*tr_filters)
-                ).group_by(
-                    models.TestRun.id
-                ).order_by(
-                    text(f'{order_by} {order}')
-                ).limit(
-                    page_size
-                ).offset(
-                    (page - 1) * page_size
-                )
-            )
-        ).all()
+        def get_heartbeat(test_run) -> datetime.datetime | None:
+            # Heartbeats received by this process may not be written yet
+            return max(filter(None, (as_utc(test_run.heartbeat), heartbeats.get(test_run.id))), default=None)
 
         def is_terminated(test_run, alive_interval=60) -> bool:
+            heartbeat = get_heartbeat(test_run)
             return (not test_run.finish
-                    and test_run.heartbeat
-                    and ((datetime.datetime.utcnow() - test_run.heartbeat).total_seconds() > alive_interval)) \
-                   or (not test_run.finish and not test_run.heartbeat)
+                    and heartbeat
+                    and ((datetime.datetime.utcnow() - heartbeat).total_seconds() > alive_interval)) \
+                   or (not test_run.finish and not heartbeat)
 
         def make_test_run_statistics(test_run) -> agnostic.core.schemas.reporting.test_runs.TestRunsStatistics:
             terminated = is_terminated(test_run)
             tr = agnostic.core.schemas.reporting.test_runs.TestRunsStatistics.model_validate(test_run)
+            tr.heartbeat = get_heartbeat(test_run)
             status = agnostic.core.schemas.reporting.test_runs.TestRunStatus(
                 running=test_run.finish is None and not terminated,
                 failed=test_run.tests_failed > 0,
@@ -240,10 +283,12 @@ class Reporting:
 
         return agnostic.core.schemas.reporting.test_runs.PagedTestRuns(
             data=[make_test_run_statistics(test_run) for test_run in test_runs],
-            count=pages.count,
-            pages=pages.pages,
+            count=pages.count if pages else None,
+            pages=pages.pages if pages else None,
+            count_estimated=pages.estimated if pages else None,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            next_cursor=next_cursor
         )
 
     async def get_tests_over_time(self, project_id: UUID,
@@ -252,37 +297,53 @@ class Reporting:
                                   variant: list[str] | None = None,
                                   interval: str | None = None) -> agnostic.core.schemas.reporting.widgets.TestsOverTime:
         tr_filters, trunc_to = get_test_run_filter(project_id, sut_branch, test_branch, variant, interval)
+        _, since = get_interval_start(interval)
 
-        by_date = select(
-            # TODO: func.max is redundant here, but sqlalchemy wants it
-            func.max(func.date_trunc(trunc_to, models.TestRun.start)).label('date'),
-            func.count(func.distinct(models.Test.id)).label('total'),
-            func.count(
-                func.distinct(models.Test.id)
-            ).filter(models.Test.result == schemas.TestResult.PASSED).label('passed'),
-            func.count(
-                func.distinct(models.Test.id)
-            ).filter(models.Test.result == schemas.TestResult.FAILED).label('failed'),
-            func.count(
-                func.distinct(models.Test.id)
-            ).filter(models.Test.result == schemas.TestResult.XPASSED).label('xpassed'),
-            func.count(
-                func.distinct(models.Test.id)
-            ).filter(models.Test.result == schemas.TestResult.XFAILED).label('xfailed'),
-            func.count(
-                func.distinct(models.Test.id)
-            ).filter(models.Test.result == schemas.TestResult.SKIPPED).label('skipped'),
-        ).join(
-            models.Test, models.Test.test_run_id == models.TestRun.id
-        ).join(
-            models.TestRunVariant, models.TestRunVariant.test_run_id == models.TestRun.id, isouter=True
+        # Rolled up buckets come from the rollups, later ones and the first one, which the interval
+        # covers only partially, are counted from the test runs
+        latest = latest_bucket(trunc_to)
+        first = bucket_end(trunc_to, func.date_trunc(trunc_to, since)) if since else None
+
+        rollups = select(
+            models.TestRunRollup.bucket.label('date'),
+            models.TestRunRollup.total,
+            *[getattr(models.TestRunRollup, result) for result in RESULTS]
         ).where(
-            and_(*tr_filters)
+            *get_rollup_filter(project_id, trunc_to, sut_branch, test_branch, variant),
+            *([models.TestRunRollup.bucket >= first] if since else [])
+        )
+
+        test_runs = select(
+            models.TestRun.start,
+            tests_executed().label('total'),
+            *[getattr(models.TestRun, f'tests_{result}').label(result) for result in RESULTS]
+        ).where(
+            and_(*tr_filters, tests_executed() > 0),
+            or_(
+                latest.is_(None),
+                models.TestRun.start >= bucket_end(trunc_to, latest),
+                *([models.TestRun.start < first] if since else [])
+            )
+        ).subquery()
+
+        buckets = union_all(
+            rollups,
+            select(
+                func.date_trunc(trunc_to, test_runs.c.start).label('date'),
+                test_runs.c.total,
+                *[getattr(test_runs.c, result) for result in RESULTS]
+            )
+        ).subquery()
+
+        by_date = select(
+            buckets.c.date,
+            *[func.sum(getattr(buckets.c, name)).label(name) for name in ('total', *RESULTS)]
         ).group_by(
-            func.date_trunc(trunc_to, models.TestRun.start)
+            buckets.c.date
+        ).having(
+            func.sum(buckets.c.total) > 0
         ).order_by(
-            # TODO: func.max is redundant here, but sqlalchemy wants it
-            func.max(func.date_trunc(trunc_to, models.TestRun.start))
+            buckets.c.date
         )
 
         by_date = (
@@ -378,23 +439,21 @@ class Reporting:
         stat = select(
             models.Test.path,
             models.Test.name,
-            func.count(func.distinct(models.Test.id)).label('total'),
+            func.count(models.Test.id).label('total'),
             func.count(
-                func.distinct(models.Test.id)
+                models.Test.id
             ).filter(
                 models.Test.result == schemas.TestResult.FAILED
             ).label('failed')
         ).join(
-            models.TestRun, models.Test.test_run_id == models.TestRun.id, isouter=True
-        ).join(
-            models.TestRunVariant, models.TestRun.id == models.TestRunVariant.test_run_id, isouter=True
+            models.TestRun, models.Test.test_run_id == models.TestRun.id
         ).where(
             and_(*tr_filters)
         ).group_by(
             models.Test.path, models.Test.name
         ).having(
             func.count(
-                func.distinct(models.Test.id)
+                models.Test.id
             ).filter(
                 models.Test.result == schemas.TestResult.FAILED
             ) > 0
@@ -432,12 +491,8 @@ class Reporting:
 
         trs = select(
             models.TestRun.id
-        ).join(
-            models.TestRunVariant, models.TestRun.id == models.TestRunVariant.test_run_id, isouter=True
         ).where(
             and_(*tr_filters)
-        ).group_by(
-            models.TestRun.id
         )
 
         metrics_sql = []
@@ -485,7 +540,8 @@ class Reporting:
                 select(
                     *metrics_ot_sql
                 ).where(
-                    models.MetricOverTime.test_run_id.in_(trs)
+                    models.MetricOverTime.test_run_id.in_(trs),
+                    get_partition_window(models.MetricOverTime, *tr_filters)
                 )
             )
         ).first()
@@ -550,51 +606,58 @@ class Reporting:
                         order: str,
                         order_by: str,
                         page: int,
-                        page_size: int) -> agnostic.core.schemas.reporting.tests.PagedTests:
+                        page_size: int,
+                        cursor: str | None = None,
+                        count: bool = True,
+                        estimate_count: bool = False) -> agnostic.core.schemas.reporting.tests.PagedTests:
 
         test_filters = and_(*get_test_filter(test_run_id, result, search))
 
-        pages = (
-            await self.session.execute(
-                select(
-                    func.count(func.distinct(models.Test.id)).label('count'),
-                    func.ceil(cast(func.count(models.Test.id), Float) / page_size).label('pages')
-                ).where(
-                    test_filters
+        pages = None
+        if count and not search and set(result or []) <= {*RESULTS, 'unknown'}:
+            # Result counters of the test run are exact, so the tests do not have to be counted
+            counters = [getattr(models.TestRun, f'tests_{name}') for name in (*RESULTS, 'unknown')
+                        if name in (result or [])]
+            total = (
+                await self.session.execute(
+                    select(sum(counters, literal(0))).where(models.TestRun.id == test_run_id)
                 )
+            ).scalar() or 0
+            pages = PageCount(total, math.ceil(total / page_size))
+        elif count:
+            pages = await count_pages(
+                self.session, select(models.Test.id).where(test_filters), page_size, estimate_count
             )
-        ).first()
 
-        order_sql = [text(f'{order_by} {order}')]
-        if order_by != 'name':
-            order_sql.append(models.Test.name)
-
-        tests = (
-            await self.session.execute(
-                select(
-                    models.Test.id,
-                    case_((models.Test.result.is_not(None), models.Test.result), else_='unknown').label('result'),
-                    models.Test.name,
-                    models.Test.path,
-                    (models.Test.finish - models.Test.start).label('execution_time')
-                ).where(
-                    test_filters
-                ).order_by(
-                    *order_sql
-                ).limit(
-                    page_size
-                ).offset(
-                    (page - 1) * page_size
-                )
-            )
-        ).all()
+        columns = {
+            'result': case_((models.Test.result.is_not(None), models.Test.result), else_='unknown'),
+            'name': models.Test.name,
+            'path': models.Test.path,
+            'execution_time': models.Test.finish - models.Test.start
+        }
+        tests, next_cursor = await fetch_page(
+            self.session,
+            select(
+                models.Test.id,
+                columns['result'].label('result'),
+                models.Test.name,
+                models.Test.path,
+                columns['execution_time'].label('execution_time')
+            ).where(
+                test_filters
+            ),
+            get_sort_keys(columns, order_by, order, models.Test.id, 'name'),
+            order_by, order, page, page_size, cursor
+        )
 
         return agnostic.core.schemas.reporting.tests.PagedTests(
             data=[agnostic.core.schemas.reporting.tests.TestsStatistics.model_validate(test) for test in tests],
-            count=pages.count,
-            pages=pages.pages,
+            count=pages.count if pages else None,
+            pages=pages.pages if pages else None,
+            count_estimated=pages.estimated if pages else None,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            next_cursor=next_cursor
         )
 
     async def get_test_run_metrics_list(self,
@@ -603,40 +666,29 @@ class Reporting:
                                         order: str,
                                         order_by: str,
                                         page: int,
-                                        page_size: int) -> agnostic.core.schemas.reporting.metrics.PagedTestRunMetricsList:
-        pages = (
-            await self.session.execute(
-                select(
-                    func.count(func.distinct(models.Metric.id)).label('count'),
-                    func.ceil(cast(func.count(models.Metric.id), Float) / page_size).label('pages')
-                ).where(
-                    models.Metric.test_run_id == test_run_id
-                )
-            )
-        ).first()
-
-        order_sql = [text(f'{order_by} {order}')]
-        if order_by != 'name':
-            order_sql.append(models.Metric.name)
-
-        metrics = (
-            await self.session.execute(
-                select(
-                    models.Metric.id,
-                    models.Metric.name,
-                    models.Metric.value,
-                    models.Metric.description
-                ).where(
-                    models.Metric.test_run_id == test_run_id
-                ).order_by(
-                    *order_sql
-                ).limit(
-                    page_size
-                ).offset(
-                    (page - 1) * page_size
-                )
-            )
-        ).all()
+                                        page_size: int,
+                                        cursor: str | None = None,
+                                        count: bool = True,
+                                        estimate_count: bool = False) -> agnostic.core.schemas.reporting.metrics.PagedTestRunMetricsList:
+        pages = await count_pages(
+            self.session, select(models.Metric.id).where(models.Metric.test_run_id == test_run_id), page_size,
+            estimate_count
+        ) if count else None
+
+        columns = {name: getattr(models.Metric, name) for name in ('name', 'value', 'description')}
+        metrics, next_cursor = await fetch_page(
+            self.session,
+            select(
+                models.Metric.id,
+                models.Metric.name,
+                models.Metric.value,
+                models.Metric.description
+            ).where(
+                models.Metric.test_run_id == test_run_id
+            ),
+            get_sort_keys(columns, order_by, order, models.Metric.id, 'name'),
+            order_by, order, page, page_size, cursor
+        )
 
         data = []
         for metric in metrics:
@@ -648,10 +700,12 @@ class Reporting:
 
         return agnostic.core.schemas.reporting.metrics.PagedTestRunMetricsList(
             data=data,
-            count=pages.count,
-            pages=pages.pages,
+            count=pages.count if pages else None,
+            pages=pages.pages if pages else None,
+            count_estimated=pages.estimated if pages else None,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            next_cursor=next_cursor
         )
 
     async def get_test_run_progress(self,
@@ -662,56 +716,53 @@ class Reporting:
                                     order: str,
                                     order_by: str,
                                     page: int,
-                                    page_size: int) -> agnostic.core.schemas.reporting.progress.PagedTestRunProgressRecords:
+                                    page_size: int,
+                                    cursor: str | None = None,
+                                    count: bool = True,
+                                    estimate_count: bool = False) -> agnostic.core.schemas.reporting.progress.PagedTestRunProgressRecords:
         if (result and len(result) < 6) or not result or search:
             filters = and_(*get_test_filter(test_run_id, result, search))
         else:
             filters = models.Progress.test_run_id == test_run_id
-        pages = (
-            await self.session.execute(
-                select(
-                    func.count(func.distinct(models.Progress.id)).label('count'),
-                    func.ceil(cast(func.count(models.Progress.id), Float) / page_size).label('pages')
-                ).join(
-                    models.Test, models.Test.id == models.Progress.test_id, isouter=True
-                ).where(
-                    filters
-                )
-            )
-        ).first()
-
-        order_sql = [text(f'{order_by} {order}')]
-        if order_by != 'timestamp':
-            order_sql.append(models.Progress.timestamp)
-
-        progress = (
-            await self.session.execute(
-                select(
-                    models.Progress.id,
-                    models.Progress.timestamp,
-                    models.Progress.level,
-                    models.Progress.message,
-                    models.Progress.details
-                ).join(
-                    models.Test, models.Test.id == models.Progress.test_id, isouter=True
-                ).where(
-                    filters
-                ).order_by(
-                    *order_sql
-                ).limit(
-                    page_size
-                ).offset(
-                    (page - 1) * page_size
-                )
-            )
-        ).all()
+        filters = and_(filters, get_partition_window(models.Progress, models.TestRun.id == test_run_id))
+        pages = await count_pages(
+            self.session,
+            select(
+                models.Progress.id
+            ).join(
+                models.Test, models.Test.id == models.Progress.test_id, isouter=True
+            ).where(
+                filters
+            ),
+            page_size, estimate_count
+        ) if count else None
+
+        columns = {name: getattr(models.Progress, name) for name in ('timestamp', 'level', 'message', 'details')}
+        progress, next_cursor = await fetch_page(
+            self.session,
+            select(
+                models.Progress.id,
+                models.Progress.timestamp,
+                models.Progress.level,
+                models.Progress.message,
+                models.Progress.details
+            ).join(
+                models.Test, models.Test.id == models.Progress.test_id, isouter=True
+            ).where(
+                filters
+            ),
+            get_sort_keys(columns, order_by, order, models.Progress.id, 'timestamp'),
+            order_by, order, page, page_size, cursor
+        )
 
         return agnostic.core.schemas.reporting.progress.PagedTestRunProgressRecords(
             data=[agnostic.core.schemas.reporting.progress.TestRunProgressRecord.model_validate(record) for record in progress],
-            count=pages.count,
-            pages=pages.pages,
+            count=pages.count if pages else None,
+            pages=pages.pages if pages else None,
+            count_estimated=pages.estimated if pages else None,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            next_cursor=next_cursor
         )
 
     async def get_test_run_logs(self,
@@ -720,47 +771,39 @@ class Reporting:
                                 order: str,
                                 order_by: str,
                                 page: int,
-                                page_size: int) -> agnostic.core.schemas.reporting.logs.PagedTestRunLog:
-        pages = (
-            await self.session.execute(
-                select(
-                    func.count(func.distinct(models.Log.id)).label('count'),
-                    func.ceil(cast(func.count(models.Log.id), Float) / page_size).label('pages')
-                ).where(
-                    models.Log.test_run_id == test_run_id, models.Log.test_id.is_(None)
-                )
-            )
-        ).first()
-
-        order_sql = [text(f'{order_by} {order}')]
-        if order_by != 'name':
-            order_sql.append(models.Log.name)
-
-        logs = (
-            await self.session.execute(
-                select(
-                    models.Log.id,
-                    models.Log.name,
-                    models.Log.start,
-                    models.Log.finish
-                ).where(
-                    models.Log.test_run_id == test_run_id, models.Log.test_id.is_(None)
-                ).order_by(
-                    *order_sql
-                ).limit(
-                    page_size
-                ).offset(
-                    (page - 1) * page_size
-                )
-            )
-        ).all()
+                                page_size: int,
+                                cursor: str | None = None,
+                                count: bool = True,
+                                estimate_count: bool = False) -> agnostic.core.schemas.reporting.logs.PagedTestRunLog:
+        pages = await count_pages(
+            self.session,
+            select(models.Log.id).where(models.Log.test_run_id == test_run_id, models.Log.test_id.is_(None)),
+            page_size, estimate_count
+        ) if count else None
+
+        columns = {name: getattr(models.Log, name) for name in ('name', 'start', 'finish')}
+        logs, next_cursor = await fetch_page(
+            self.session,
+            select(
+                models.Log.id,
+                models.Log.name,
+                models.Log.start,
+                models.Log.finish
+            ).where(
+                models.Log.test_run_id == test_run_id, models.Log.test_id.is_(None)
+            ),
+            get_sort_keys(columns, order_by, order, models.Log.id, 'name'),
+            order_by, order, page, page_size, cursor
+        )
 
         return agnostic.core.schemas.reporting.logs.PagedTestRunLog(
             data=[agnostic.core.schemas.reporting.logs.TestRunLog.model_validate(log) for log in logs],
-            count=pages.count,
-            pages=pages.pages,
+            count=pages.count if pages else None,
+            pages=pages.pages if pages else None,
+            count_estimated=pages.estimated if pages else None,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            next_cursor=next_cursor
         )
 
     async def get_test_run_over_time_metric(self,
@@ -777,6 +820,7 @@ class Reporting:
             filters = and_(models.MetricOverTime.name == name, *get_test_filter(test_run_id, result, search))
         else:
             filters = and_(models.MetricOverTime.name == name, models.MetricOverTime.test_run_id == test_run_id)
+        filters = and_(filters, get_partition_window(models.MetricOverTime, models.TestRun.id == test_run_id))
 
         series = select(
             models.MetricOverTime.timestamp.label('date'),
@@ -829,7 +873,7 @@ class Reporting:
             models.Log.name,
             models.Log.start,
             models.Log.finish,
-            models.Log.body
+            log_body().label('body')
         ).where(
             models.Log.test_id == test_id
         ).order_by(
@@ -856,7 +900,11 @@ class Reporting:
             models.Request.timestamp,
             models.Request.contents
         ).where(
-            models.Request.test_id == test_id
+            models.Request.test_id == test_id,
+            get_partition_window(
+                models.Request,
+                models.TestRun.id == select(models.Test.test_run_id).where(models.Test.id == test_id).scalar_subquery()
+            )
         ).order_by(
             models.Request.timestamp
         ).subquery()
@@ -988,7 +1036,8 @@ class Reporting:
                 select(
                     *metrics_ot_sql
                 ).where(
-                    models.MetricOverTime.test_id.in_(tests)
+                    models.MetricOverTime.test_id.in_(tests),
+                    get_partition_window(models.MetricOverTime, models.TestRun.id == test_run_id)
                 )
             )
         ).first()
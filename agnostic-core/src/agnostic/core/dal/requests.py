@@ -8,6 +8,7 @@ from sqlalchemy.future import select
 from sqlalchemy.sql.expression import update
 
 from agnostic.core import models, schemas
+from .bulk import insert_one, insert_many
 from .exceptions import DuplicateError, ForeignKeyError, NotFoundError
 
 
@@ -39,19 +40,38 @@ class Requests:
     async def create(self, request: schemas.RequestCreate) -> UUID:
         request.id = request.id or uuid4()
         request.timestamp = request.timestamp or datetime.datetime.utcnow()
-        request = models.Request(**request.model_dump(), request_type=request.contents.request_type)
-        self.session.add(request)
 
         try:
+            created = await insert_one(
+                self.session, models.Request, {**request.model_dump(), 'request_type': request.contents.request_type}
+            )
             await self.session.commit()
-        except IntegrityError as e:
-            if 'foreign key constraint' in e.orig.args[0]:
-                raise ForeignKeyError(f'Test Run {request.test_run_id} or Test {request.test_id} does not exist')
-            else:
-                raise DuplicateError(f'Request {request.id} already exists')
+        except IntegrityError:
+            raise ForeignKeyError(f'Test Run {request.test_run_id} or Test {request.test_id} does not exist')
+
+        if not created:
+            raise DuplicateError(f'Request {request.id} already exists')
 
         return request.id
 
+    async def create_many(self, requests: list[schemas.RequestCreate],
+                          commit: bool = True) -> list[schemas.BatchItemStatus]:
+        rows = []
+        for request in requests:
+            request.id = request.id or uuid4()
+            request.timestamp = request.timestamp or datetime.datetime.utcnow()
+            rows.append(dict(request.model_dump(), request_type=request.contents.request_type))
+
+        try:
+            statuses = await insert_many(self.session, models.Request, rows)
+            if commit:
+                await self.session.commit()
+        except IntegrityError:
+            test_runs = ', '.join(sorted({str(row['test_run_id']) for row in rows}))
+            raise ForeignKeyError(f'Test Run {test_runs} does not exist')
+
+        return statuses
+
     async def update(self, request: schemas.Request, exclude_unset: bool = False) -> UUID:
         try:
             result = (
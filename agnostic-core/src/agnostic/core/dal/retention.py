@@ -0,0 +1,189 @@
+import datetime
+from collections import Counter
+from typing import NamedTuple
+from uuid import UUID
+
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql.expression import Delete, func, or_, delete, literal, literal_column
+
+from agnostic.core import models, schemas
+from .attachments import Attachments
+from .rollups import INTERVALS, Rollups
+
+# Tables referencing test runs, deleted before the test runs themselves. Log chunks reference logs.
+CHILDREN = (models.LogChunk, models.Log, models.Progress, models.Request, models.MetricOverTime, models.Metric,
+            models.Attachment, models.Test, models.TestRunVariant)
+
+# Test runs purged together, their child rows are still deleted in batches
+RUNS_PER_CHUNK = 100
+
+
+class Purged(NamedTuple):
+    test_runs: int
+    # Deleted rows and their size in bytes per table, size of deleted attachment files under "attachment files"
+    rows: dict[str, int]
+    bytes: dict[str, int]
+
+
+def get_run_size():
+    """Bytes of attachments and logs of a test run"""
+    attachments = select(
+        func.coalesce(func.sum(models.Attachment.size), 0)
+    ).where(
+        models.Attachment.test_run_id == models.TestRun.id
+    ).scalar_subquery()
+    # Bodies logs were created with and their appended chunks, summed apart so bodies are not counted per chunk
+    logs = select(
+        func.coalesce(func.sum(func.octet_length(models.Log.body)), 0)
+    ).where(
+        models.Log.test_run_id == models.TestRun.id
+    ).scalar_subquery()
+    chunks = select(
+        func.coalesce(func.sum(models.LogChunk.size), 0)
+    ).join_from(
+        models.Log, models.LogChunk, models.LogChunk.log_id == models.Log.id
+    ).where(
+        models.Log.test_run_id == models.TestRun.id
+    ).scalar_subquery()
+    return attachments + logs + chunks
+
+
+class Retention:
+    """Purges test runs of projects with a retention policy in their config
+
+    Child rows are deleted in batches committed one by one instead of by a single cascading delete,
+    which would lock the tables for as long as it takes to delete all of them.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_policies(self) -> dict[UUID, schemas.RetentionPolicy]:
+        projects = (
+            await self.session.execute(
+                select(models.Project.id, models.Project.config)
+                .where(models.Project.config['retention'].is_not(None))
+            )
+        ).all()
+        policies = {}
+        for project_id, config in projects:
+            if policy := schemas.ProjectConfig.model_validate(config).retention:
+                policies[project_id] = policy
+        return policies
+
+    async def get_expired(self, project_id: UUID, policy: schemas.RetentionPolicy) -> list[UUID]:
+        """Test runs of the project exceeding any limit of the policy, runs kept forever are never expired"""
+        columns = [models.TestRun.id, models.TestRun.start, models.TestRun.keep_forever]
+        if policy.runs_per_branch:
+            columns.append(
+                func.row_number().over(
+                    partition_by=(models.TestRun.sut_branch, models.TestRun.keep_forever),
+                    order_by=(models.TestRun.start.desc(), models.TestRun.id.desc())
+                ).label('branch_rank')
+            )
+        if policy.max_size:
+            # Runs kept forever take up their share of the storage, newer runs are kept before older ones
+            columns.append(
+                func.sum(get_run_size()).over(
+                    order_by=(models.TestRun.keep_forever.desc(), models.TestRun.start.desc(),
+                              models.TestRun.id.desc())
+                ).label('total_size')
+            )
+        runs = select(*columns).where(models.TestRun.project_id == project_id).subquery()
+
+        limits = []
+        if policy.days:
+            limits.append(runs.c.start < func.now() - datetime.timedelta(days=policy.days))
+        if policy.runs_per_branch:
+            limits.append(runs.c.branch_rank > policy.runs_per_branch)
+        if policy.max_size:
+            limits.append(runs.c.total_size > policy.max_size)
+        if not limits:
+            return []
+
+        return list(
+            (
+                await self.session.execute(
+                    select(runs.c.id).where(runs.c.keep_forever.is_(False), or_(*limits)).order_by(runs.c.start)
+                )
+            ).scalars().all()
+        )
+
+    async def delete(self, model, statement: Delete) -> tuple[int, int]:
+        """Runs a delete of the model's rows, returns the number of rows and bytes deleted"""
+        deleted = statement.returning(
+            func.pg_column_size(literal_column(model.__tablename__)).label('size')
+        ).cte('deleted')
+        return tuple(
+            (
+                await self.session.execute(
+                    select(func.count(), func.coalesce(func.sum(deleted.c.size), literal(0, BigInteger)))
+                )
+            ).one()
+        )
+
+    async def delete_rows(self, model, test_runs, batch_size: int) -> tuple[int, int]:
+        """Deletes rows of a child table in batches, committing every one, returns the number of rows and bytes"""
+        if model is models.LogChunk:
+            condition = model.log_id.in_(select(models.Log.id).where(models.Log.test_run_id.in_(test_runs)))
+        else:
+            condition = model.test_run_id.in_(test_runs)
+
+        rows = size = 0
+        while True:
+            batch = select(model.id).where(condition).limit(batch_size).scalar_subquery()
+            count, total = await self.delete(model, delete(model).where(model.id.in_(batch)))
+            await self.session.commit()
+            rows, size = rows + count, size + total
+            if count < batch_size:
+                return rows, size
+
+    async def purge_test_runs(self, ids: list[UUID], batch_size: int) -> Purged:
+        # Runs marked to be kept forever while being purged keep whatever is left of them
+        filters = (models.TestRun.id.in_(ids), models.TestRun.keep_forever.is_(False))
+        test_runs = select(models.TestRun.id).where(*filters)
+        rows, size = Counter(), Counter()
+
+        contents = (
+            await self.session.execute(
+                select(models.Attachment.sha256, func.max(models.Attachment.size))
+                .where(models.Attachment.test_run_id.in_(test_runs), models.Attachment.sha256.is_not(None))
+                .group_by(models.Attachment.sha256)
+            )
+        ).all()
+
+        for model in CHILDREN:
+            table = model.__tablename__
+            rows[table], size[table] = await self.delete_rows(model, test_runs, batch_size)
+
+        # Rolled up buckets of tests over time are recomputed without the purged runs
+        rollups = Rollups(self.session)
+        buckets = {interval: await rollups.get_rolled_up_buckets(interval, *filters) for interval in INTERVALS}
+        count, total = await self.delete(models.TestRun, delete(models.TestRun).where(*filters))
+        for interval, interval_buckets in buckets.items():
+            await rollups.refresh(interval, interval_buckets)
+        await self.session.commit()
+        rows['test_runs'], size['test_runs'] = count, total
+
+        # Content is shared between attachments, only content nothing references anymore is removed
+        attachments = Attachments(self.session)
+        for sha256, content_size in contents:
+            if await attachments.delete_content(sha256):
+                rows['attachment files'] += 1
+                size['attachment files'] += content_size
+
+        return Purged(count, dict(rows), dict(size))
+
+    async def purge(self, batch_size: int) -> Purged:
+        """Purges expired test runs of all projects with a retention policy"""
+        test_runs, rows, size = 0, Counter(), Counter()
+        for project_id, policy in (await self.get_policies()).items():
+            expired = await self.get_expired(project_id, policy)
+            for i in range(0, len(expired), RUNS_PER_CHUNK):
+                purged = await self.purge_test_runs(expired[i:i + RUNS_PER_CHUNK], batch_size)
+                test_runs += purged.test_runs
+                rows.update(purged.rows)
+                size.update(purged.bytes)
+        return Purged(test_runs, dict(rows), dict(size))
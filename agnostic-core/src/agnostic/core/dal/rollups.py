@@ -0,0 +1,185 @@
+import datetime
+from uuid import UUID
+
+from sqlalchemy import DateTime, Text
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql.expression import func, cast, and_, or_, delete, literal, literal_column, tuple_, values, column
+
+from agnostic.core import models
+
+INTERVALS = ('day', 'week', 'month')
+RESULTS = ('passed', 'failed', 'skipped', 'xpassed', 'xfailed')
+
+
+def tests_executed():
+    return (models.TestRun.tests_passed + models.TestRun.tests_failed + models.TestRun.tests_skipped
+            + models.TestRun.tests_xpassed + models.TestRun.tests_xfailed + models.TestRun.tests_unknown)
+
+
+def bucket_end(interval: str, bucket):
+    return bucket + literal_column(f"interval '1 {interval}'")
+
+
+def latest_bucket(interval: str):
+    """Latest rolled up bucket of the interval, buckets after it are read from `test_runs`"""
+    return select(
+        func.max(models.TestRunRollup.bucket)
+    ).where(
+        models.TestRunRollup.interval == interval
+    ).scalar_subquery()
+
+
+class Rollups:
+    """Maintains `test_run_rollups`
+
+    Closed buckets are rolled up by `refresh_closed` in order, so every bucket up to the latest rolled up
+    one is in the rollups and every later one is read from `test_runs`. A rolled up bucket is recomputed
+    when one of its test runs is purged, and by the next `refresh_closed` when one finishes.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def refresh(self, interval: str, buckets: list[tuple[UUID, datetime.datetime]]):
+        if not buckets:
+            return
+
+        # Concurrent refreshes of a project would both delete and then both insert its rows
+        for project_id in sorted({project_id for project_id, _ in buckets}):
+            await self.session.execute(
+                select(func.pg_advisory_xact_lock(func.hashtext(f'test_run_rollups {project_id} {interval}')))
+            )
+
+        await self.session.execute(
+            delete(models.TestRunRollup)
+            .where(
+                models.TestRunRollup.interval == interval,
+                tuple_(models.TestRunRollup.project_id, models.TestRunRollup.bucket).in_(buckets)
+            )
+        )
+
+        keys = values(
+            column('project_id', PG_UUID(as_uuid=True)), column('bucket', DateTime(timezone=True)), name='keys'
+        ).data(buckets)
+        variant = select(
+            func.coalesce(
+                func.jsonb_object_agg(models.TestRunVariant.name, models.TestRunVariant.value), cast({}, JSONB)
+            )
+        ).where(
+            models.TestRunVariant.test_run_id == models.TestRun.id
+        ).scalar_subquery()
+        test_runs = select(
+            keys.c.project_id,
+            keys.c.bucket,
+            models.TestRun.sut_branch,
+            models.TestRun.test_branch,
+            variant.label('variant'),
+            tests_executed().label('total'),
+            *[getattr(models.TestRun, f'tests_{result}').label(result) for result in RESULTS]
+        ).join_from(
+            keys, models.TestRun, and_(
+                models.TestRun.project_id == keys.c.project_id,
+                models.TestRun.start >= keys.c.bucket,
+                models.TestRun.start < bucket_end(interval, keys.c.bucket)
+            )
+        ).subquery()
+
+        columns = ('project_id', 'interval', 'bucket', 'sut_branch', 'test_branch', 'variant_hash', 'variant',
+                   'test_runs', 'total', *RESULTS)
+        await self.session.execute(
+            insert(models.TestRunRollup).from_select(
+                columns,
+                select(
+                    test_runs.c.project_id,
+                    literal(interval),
+                    test_runs.c.bucket,
+                    test_runs.c.sut_branch,
+                    test_runs.c.test_branch,
+                    func.md5(cast(test_runs.c.variant, Text)),
+                    test_runs.c.variant,
+                    func.count(),
+                    func.sum(test_runs.c.total),
+                    *[func.sum(getattr(test_runs.c, result)) for result in RESULTS]
+                ).group_by(
+                    test_runs.c.project_id,
+                    test_runs.c.bucket,
+                    test_runs.c.sut_branch,
+                    test_runs.c.test_branch,
+                    test_runs.c.variant
+                ),
+                # Ids are generated by the database, the Python side default would give every row the same one
+                include_defaults=False
+            )
+        )
+
+    async def get_closed_buckets(self, interval: str, *filters) -> list[tuple[UUID, datetime.datetime]]:
+        """Closed buckets of test runs matching the filters"""
+        buckets = (
+            await self.session.execute(
+                select(models.TestRun.project_id, func.date_trunc(interval, models.TestRun.start))
+                .where(
+                    models.TestRun.start < func.date_trunc(interval, func.now()),
+                    *filters
+                )
+                .distinct()
+            )
+        ).all()
+        return [tuple(bucket) for bucket in buckets]
+
+    async def get_rolled_up_buckets(self, interval: str, *filters) -> list[tuple[UUID, datetime.datetime]]:
+        """Rolled up buckets of test runs matching the filters
+
+        Later buckets are not rolled up yet, rows written for them would be taken for the latest rolled up bucket.
+        """
+        bucket = func.date_trunc(interval, models.TestRun.start)
+        buckets = (
+            await self.session.execute(
+                select(models.TestRun.project_id, bucket)
+                .where(bucket <= latest_bucket(interval), *filters)
+                .distinct()
+            )
+        ).all()
+        return [tuple(bucket) for bucket in buckets]
+
+    async def mark_stale(self, id: UUID):
+        """Marks rolled up buckets the test run belongs to for `refresh_closed` to recompute, does not commit"""
+        for interval in INTERVALS:
+            bucket = func.date_trunc(interval, models.TestRun.start)
+            await self.session.execute(
+                insert(models.StaleTestRunRollup).from_select(
+                    ('project_id', 'interval', 'bucket'),
+                    select(models.TestRun.project_id, literal(interval), bucket)
+                    .where(models.TestRun.id == id, bucket <= latest_bucket(interval)),
+                    include_defaults=False
+                ).on_conflict_do_nothing()
+            )
+
+    async def pop_stale(self, interval: str) -> list[tuple[UUID, datetime.datetime]]:
+        """Buckets marked stale, the marks are removed, buckets marked meanwhile are left for the next refresh"""
+        buckets = (
+            await self.session.execute(
+                delete(models.StaleTestRunRollup)
+                .where(models.StaleTestRunRollup.interval == interval)
+                .returning(models.StaleTestRunRollup.project_id, models.StaleTestRunRollup.bucket)
+            )
+        ).all()
+        return [tuple(bucket) for bucket in buckets]
+
+    async def refresh_closed(self, alive: datetime.timedelta | None = None):
+        """Rolls up buckets closed since the latest rolled up one, which is recomputed as well
+
+        Buckets marked stale are recomputed, and so are rolled up buckets of unfinished test runs with a heartbeat
+        within `alive`, results of a test run which stopped without finishing would be missing from them otherwise.
+        """
+        for interval in INTERVALS:
+            latest = latest_bucket(interval)
+            buckets = await self.get_closed_buckets(interval, or_(latest.is_(None), models.TestRun.start >= latest))
+            buckets += await self.pop_stale(interval)
+            if alive:
+                buckets += await self.get_rolled_up_buckets(
+                    interval, models.TestRun.finish.is_(None), models.TestRun.heartbeat >= func.now() - alive
+                )
+            await self.refresh(interval, sorted(set(buckets)))
+            await self.session.commit()
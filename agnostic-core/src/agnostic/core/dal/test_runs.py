@@ -2,14 +2,16 @@ import copy
 import datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.dialects.postgresql import JSONB, insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.sql.expression import update, delete
+from sqlalchemy.sql.expression import update, delete, case, cast, func
 
 from agnostic.core import models, schemas
+from agnostic.core.notifications import TEST_RUNS, notify
 from .exceptions import DuplicateError, ForeignKeyError, NotFoundError
+from .rollups import Rollups
 
 
 class TestRuns:
@@ -109,10 +111,10 @@ class TestRuns:
         test_run = models.TestRun(**test_run.model_dump(exclude={'variant'}))
         self.session.add(test_run)
 
-        if variant is not None:
-            await self.__update_variant(test_run.id, variant)
-
         try:
+            # Writing the variant flushes the test run, which fails when it already exists
+            if variant is not None:
+                await self.__update_variant(test_run.id, variant)
             await self.session.commit()
         except IntegrityError as e:
             if 'foreign key constraint' in e.orig.args[0]:
@@ -140,6 +142,31 @@ class TestRuns:
         if test_run.variant is not None:
             await self.__update_variant(test_run.id, test_run.variant)
 
+        if test_run.heartbeat:
+            await notify(self.session, TEST_RUNS, test_run.id, {'type': 'heartbeat', 'heartbeat': test_run.heartbeat})
+
+        if test_run.finish:
+            await Rollups(self.session).mark_stale(test_run.id)
+
         await self.session.commit()
 
         return test_run.id
+
+    async def set_properties(self, id: UUID, properties: dict) -> UUID:
+        """Merges properties into those of the test run with a single statement, keys set concurrently are kept"""
+        current = case(
+            (func.jsonb_typeof(models.TestRun.properties) == 'object', models.TestRun.properties),
+            else_=cast({}, JSONB)
+        )
+        result = await self.session.execute(
+            update(models.TestRun)
+            .where(models.TestRun.id == id)
+            .values(properties=current.op('||')(cast(properties, JSONB)))
+        )
+
+        if result.rowcount < 1:
+            raise NotFoundError(f'Test Run {id} does not exist')
+
+        await self.session.commit()
+
+        return id
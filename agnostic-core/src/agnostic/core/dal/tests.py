@@ -4,10 +4,15 @@ from uuid import UUID, uuid4
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.sql.expression import update
+from sqlalchemy.sql.expression import tuple_, update
 
 from agnostic.core import models, schemas
-from .exceptions import DuplicateError, ForeignKeyError, NotFoundError
+from agnostic.core.notifications import TEST_RUNS, notify
+from .bulk import insert_many
+from .exceptions import DuplicateError, ForeignKeyError, InvalidArgumentsError, NotFoundError
+
+
+FINISH_STATUSES = (schemas.BatchItemStatus.CREATED, schemas.BatchItemStatus.UPDATED)
 
 
 class Tests:
@@ -52,6 +57,59 @@ class Tests:
 
         return test.id
 
+    async def upsert_many(self, tests: list[schemas.Test],
+                          commit: bool = True) -> list[schemas.BatchItemStatus]:
+        # Several items might describe the same test, e.g. its start and finish, merge them first
+        merged = {}
+        for test in tests:
+            merged.setdefault(test.id, {}).update(test.model_dump(exclude_unset=True))
+
+        # Tests of other test runs are not updated, their ids are duplicates
+        existing = set((
+            await self.session.execute(
+                select(models.Test.id)
+                .where(tuple_(models.Test.id, models.Test.test_run_id).in_(
+                    [(test_id, values.get('test_run_id')) for test_id, values in merged.items()]
+                ))
+            )
+        ).scalars().all())
+
+        rows, updates, statuses = [], [], {}
+        for test_id, values in merged.items():
+            if test_id in existing:
+                updates.append(values)
+                statuses[test_id] = schemas.BatchItemStatus.UPDATED
+            elif values.get('path') and values.get('name'):
+                values.setdefault('start', datetime.datetime.utcnow())
+                rows.append(schemas.Test(**values).model_dump())
+            else:
+                statuses[test_id] = schemas.BatchItemStatus.NOT_FOUND
+
+        try:
+            statuses.update(zip((row['id'] for row in rows), await insert_many(self.session, models.Test, rows)))
+            if updates:
+                await self.session.execute(update(models.Test), updates)
+            for values in merged.values():
+                if values.get('finish') and statuses.get(values['id']) in FINISH_STATUSES:
+                    await self.notify_finish(values)
+            if commit:
+                await self.session.commit()
+        except IntegrityError as e:
+            # Existing ids are skipped by the insert, so only missing test runs and invalid values are left
+            test_runs = ', '.join(sorted({str(test.test_run_id) for test in tests}))
+            if 'foreign key constraint' in e.orig.args[0]:
+                raise ForeignKeyError(f'Test Run {test_runs} does not exist')
+            else:
+                raise InvalidArgumentsError(f'Tests of Test Run {test_runs} have invalid values')
+
+        return [statuses[test.id] for test in tests]
+
+    async def notify_finish(self, values: dict):
+        await notify(
+            self.session, TEST_RUNS, values['test_run_id'],
+            {'type': 'test', **{key: values[key] for key in ('id', 'result', 'finish') if key in values}}
+        )
+
     async def update(self, test: schemas.Test, exclude_unset: bool = False) -> UUID:
         try:
             result = (
@@ -67,6 +125,9 @@ class Tests:
         if result.rowcount < 1:
             raise NotFoundError(f'Test {test.id} does not exist')
 
+        if test.finish and test.test_run_id:
+            await self.notify_finish(test.model_dump(exclude_unset=exclude_unset))
+
         await self.session.commit()
 
         return test.id
@@ -0,0 +1,91 @@
+import datetime
+import time
+from uuid import UUID
+
+from sqlalchemy import DateTime
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import func, update, values, column
+
+from agnostic.core import models
+from agnostic.core.notifications import TEST_RUNS, notify
+
+# Test runs without a heartbeat for this many seconds are forgotten, their next heartbeat is written through again
+EXPIRY = 10 * 60
+
+
+def as_utc(value: datetime.datetime | None) -> datetime.datetime | None:
+    """Naive UTC timestamp, heartbeats are sent as naive UTC ones but may be read back as aware ones"""
+    if value is not None and value.tzinfo:
+        return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class Heartbeats:
+    """Absorbs heartbeats of test runs of the process, only the latest one per test run is written on `flush`
+
+    Only test runs with a heartbeat already written are cached, so the first heartbeat of a test run
+    still tells whether it exists.
+    """
+
+    def __init__(self):
+        self.latest: dict[UUID, datetime.datetime] = {}
+        self.pending: dict[UUID, datetime.datetime] = {}
+        self.seen: dict[UUID, float] = {}
+
+    def get(self, id: UUID) -> datetime.datetime | None:
+        return self.latest.get(id)
+
+    def written(self, id: UUID, heartbeat: datetime.datetime):
+        """Caches a heartbeat written to the database"""
+        heartbeat = as_utc(heartbeat)
+        self.latest[id] = max(self.latest.get(id, heartbeat), heartbeat)
+        self.seen[id] = time.monotonic()
+
+    def beat(self, id: UUID, heartbeat: datetime.datetime) -> bool:
+        """Caches a heartbeat to be written by the next flush, False if the test run is not cached yet"""
+        if id not in self.latest:
+            return False
+        self.written(id, heartbeat)
+        self.pending[id] = self.latest[id]
+        return True
+
+    def finish(self, id: UUID) -> datetime.datetime | None:
+        """Forgets a test run, returns its heartbeat not written yet"""
+        self.latest.pop(id, None)
+        self.seen.pop(id, None)
+        return self.pending.pop(id, None)
+
+    async def flush(self, session: AsyncSession) -> int:
+        """Writes pending heartbeats with a single statement, returns the number of test runs updated"""
+        now = time.monotonic()
+        for id in [id for id, seen in self.seen.items() if now - seen > EXPIRY and id not in self.pending]:
+            self.finish(id)
+
+        pending, self.pending = self.pending, {}
+        if not pending:
+            return 0
+
+        try:
+            beats = values(
+                column('id', PG_UUID(as_uuid=True)), column('heartbeat', DateTime), name='beats'
+            ).data(list(pending.items()))
+            await session.execute(
+                update(models.TestRun)
+                .where(models.TestRun.id == beats.c.id)
+                .values(heartbeat=func.greatest(models.TestRun.heartbeat, beats.c.heartbeat))
+            )
+            for id, heartbeat in pending.items():
+                await notify(session, TEST_RUNS, id, {'type': 'heartbeat', 'heartbeat': heartbeat})
+            await session.commit()
+        except BaseException:
+            # Heartbeats received meanwhile are newer, the failed ones are only kept for test runs without one
+            for id, heartbeat in pending.items():
+                if id in self.latest:
+                    self.pending.setdefault(id, heartbeat)
+            raise
+
+        return len(pending)
+
+
+heartbeats = Heartbeats()
@@ -0,0 +1,46 @@
+"""Add log chunks
+
+Revision ID: 5d0e7a3c91b2
+Revises: 441b148571a0
+Create Date: 2026-10-18 10:24:12.183402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '5d0e7a3c91b2'
+down_revision = '441b148571a0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(sa.schema.CreateSequence(sa.Sequence('log_chunks_seq_seq')))
+    op.create_table('log_chunks',
+    sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('log_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('seq', sa.BigInteger(), server_default=sa.text("nextval('log_chunks_seq_seq')"), nullable=False),
+    sa.Column('timestamp', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('length', sa.Integer(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['log_id'], ['logs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id')
+    )
+    op.execute('ALTER SEQUENCE log_chunks_seq_seq OWNED BY log_chunks.seq')
+    op.create_index('ix_log_chunks_log_id_seq', 'log_chunks', ['log_id', 'seq'], unique=True)
+
+
+def downgrade():
+    # Fold chunks back into log bodies before dropping them
+    op.execute(
+        "UPDATE logs SET body = concat(logs.body, c.text) "
+        "FROM (SELECT log_id, string_agg(text, '' ORDER BY seq) AS text FROM log_chunks GROUP BY log_id) c "
+        "WHERE logs.id = c.log_id"
+    )
+    op.drop_index('ix_log_chunks_log_id_seq', table_name='log_chunks')
+    op.drop_table('log_chunks')
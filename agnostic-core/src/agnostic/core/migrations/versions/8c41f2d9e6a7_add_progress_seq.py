@@ -0,0 +1,31 @@
+"""Add progress seq
+
+Revision ID: 8c41f2d9e6a7
+Revises: 5d0e7a3c91b2
+Create Date: 2026-10-18 10:41:37.512208
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c41f2d9e6a7'
+down_revision = '5d0e7a3c91b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(sa.schema.CreateSequence(sa.Sequence('progress_seq_seq')))
+    # Existing records are left without a sequence number, numbering them would rewrite the whole table.
+    # Feeds follow running test runs, which have their records numbered from now on.
+    op.add_column('progress', sa.Column('seq', sa.BigInteger(), nullable=True))
+    op.alter_column('progress', 'seq', server_default=sa.text("nextval('progress_seq_seq')"))
+    op.execute('ALTER SEQUENCE progress_seq_seq OWNED BY progress.seq')
+    op.create_index('ix_progress_test_run_id_seq', 'progress', ['test_run_id', 'seq'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_progress_test_run_id_seq', table_name='progress')
+    op.drop_column('progress', 'seq')
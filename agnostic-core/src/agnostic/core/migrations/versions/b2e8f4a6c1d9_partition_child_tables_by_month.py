@@ -0,0 +1,116 @@
+"""Partition child tables by month
+
+Revision ID: b2e8f4a6c1d9
+Revises: f1c5a8e3b6d2
+Create Date: 2026-10-18 15:02:11.734520
+
+"""
+import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2e8f4a6c1d9'
+down_revision = 'f1c5a8e3b6d2'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'progress': {
+        'ix_progress_test_run_id_seq': ['test_run_id', 'seq'],
+        'ix_progress_test_run_id_test_id': ['test_run_id', 'test_id'],
+        'ix_progress_test_id_timestamp': ['test_id', 'timestamp'],
+    },
+    'requests': {
+        'ix_requests_test_run_id_test_id': ['test_run_id', 'test_id'],
+        'ix_requests_test_id_timestamp': ['test_id', 'timestamp'],
+    },
+    'metrics_over_time': {
+        'ix_metrics_over_time_test_run_id_test_id': ['test_run_id', 'test_id'],
+        'ix_metrics_over_time_test_id_timestamp': ['test_id', 'timestamp'],
+    },
+}
+
+# Monthly partitions created ahead, later ones are created by the partitioning background task of the web service
+MONTHS_AHEAD = 2
+
+
+def next_month(month: datetime.datetime) -> datetime.datetime:
+    return (month + datetime.timedelta(days=32)).replace(day=1)
+
+
+def upgrade():
+    connection = op.get_bind()
+    months = {}
+    for table in INDEXES:
+        latest = connection.execute(
+            sa.text(f"SELECT max(timestamp) AT TIME ZONE 'UTC' FROM {table}")
+        ).scalar() or datetime.datetime.min
+        months[table] = next_month(max(datetime.datetime.utcnow(), latest).replace(day=1, hour=0, minute=0, second=0,
+                                                                                   microsecond=0))
+
+    # Attaching a table as a partition scans it under an exclusive lock unless a validated CHECK constraint already
+    # proves the bound. Validating one scans it without blocking writes, if the constraint is added in a transaction
+    # of its own.
+    with op.get_context().autocommit_block():
+        for table, month in months.items():
+            op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_legacy_bound '
+                       f"CHECK (timestamp < '{month}+00') NOT VALID")
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {table}_legacy_bound')
+
+    for table, indexes in INDEXES.items():
+        legacy = f'{table}_legacy'
+        month = months[table]
+
+        # Existing rows are not copied, the table becomes the partition of everything before the first month
+        op.rename_table(table, legacy)
+        op.execute(f'ALTER TABLE {legacy} DROP CONSTRAINT {table}_pkey')
+        op.execute(f'ALTER TABLE {legacy} RENAME CONSTRAINT {table}_test_run_id_fkey TO {legacy}_test_run_id_fkey')
+        for index in indexes:
+            op.execute(f'ALTER INDEX {index} RENAME TO {index}_legacy')
+
+        op.execute(f'CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (timestamp)')
+        # Unique constraints of a partitioned table have to include the partition key
+        op.create_primary_key(f'{table}_pkey', table, ['id', 'timestamp'])
+        op.create_foreign_key(f'{table}_test_run_id_fkey', table, 'test_runs', ['test_run_id'], ['id'],
+                              ondelete='CASCADE')
+        for index, columns in indexes.items():
+            op.create_index(index, table, columns, unique=False)
+
+        # Matching indexes and the foreign key of the legacy table are attached instead of being built again,
+        # only the new primary key index is
+        op.execute(f"ALTER TABLE {table} ATTACH PARTITION {legacy} FOR VALUES FROM (MINVALUE) TO ('{month}+00')")
+        op.execute(f'ALTER TABLE {legacy} DROP CONSTRAINT {table}_legacy_bound')
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+        for _ in range(MONTHS_AHEAD + 1):
+            op.execute(f"CREATE TABLE {table}_{month:%Y_%m} PARTITION OF {table} "
+                       f"FOR VALUES FROM ('{month}+00') TO ('{next_month(month)}+00')")
+            month = next_month(month)
+
+    op.execute('ALTER SEQUENCE progress_seq_seq OWNED BY progress.seq')
+
+
+def downgrade():
+    for table, indexes in INDEXES.items():
+        partitioned = f'{table}_partitioned'
+
+        op.rename_table(table, partitioned)
+        op.execute(f'ALTER TABLE {partitioned} RENAME CONSTRAINT {table}_pkey TO {partitioned}_pkey')
+        op.execute(f'ALTER TABLE {partitioned} RENAME CONSTRAINT {table}_test_run_id_fkey '
+                   f'TO {partitioned}_test_run_id_fkey')
+        for index in indexes:
+            op.execute(f'ALTER INDEX {index} RENAME TO {index}_partitioned')
+
+        op.execute(f'CREATE TABLE {table} (LIKE {partitioned} INCLUDING DEFAULTS)')
+        op.execute(f'INSERT INTO {table} SELECT * FROM {partitioned}')
+        if table == 'progress':
+            op.execute('ALTER SEQUENCE progress_seq_seq OWNED BY progress.seq')
+        op.execute(f'DROP TABLE {partitioned}')
+
+        op.create_primary_key(f'{table}_pkey', table, ['id'])
+        op.create_foreign_key(f'{table}_test_run_id_fkey', table, 'test_runs', ['test_run_id'], ['id'],
+                              ondelete='CASCADE')
+        for index, columns in indexes.items():
+            op.create_index(index, table, columns, unique=False)
@@ -0,0 +1,31 @@
+"""Add attachment sha256
+
+Revision ID: b7e3a95c20d4
+Revises: 8c41f2d9e6a7
+Create Date: 2026-10-18 10:58:03.218744
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3a95c20d4'
+down_revision = '8c41f2d9e6a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('attachments', sa.Column('sha256', sa.String(length=64), nullable=True))
+    op.execute("UPDATE attachments SET sha256 = encode(sha256(content), 'hex')")
+    op.alter_column('attachments', 'content', existing_type=sa.LargeBinary(), nullable=True)
+    op.create_index(op.f('ix_attachments_sha256'), 'attachments', ['sha256'], unique=False)
+
+
+def downgrade():
+    # Attachments kept in the attachment storage can not be restored here
+    op.execute('DELETE FROM attachments WHERE content IS NULL')
+    op.drop_index(op.f('ix_attachments_sha256'), table_name='attachments')
+    op.alter_column('attachments', 'content', existing_type=sa.LargeBinary(), nullable=False)
+    op.drop_column('attachments', 'sha256')
@@ -0,0 +1,50 @@
+"""Add (test_run_id, test_id) and (test_id, timestamp) indexes to test child tables
+
+Revision ID: c3f8d1a7b5e2
+Revises: b7e3a95c20d4
+Create Date: 2026-10-18 11:20:41.907351
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8d1a7b5e2'
+down_revision = 'b7e3a95c20d4'
+branch_labels = None
+depends_on = None
+
+# Table and the column its records are ordered by within a test
+TABLES = {
+    'attachments': 'timestamp',
+    'logs': 'start',
+    'metrics': 'timestamp',
+    'metrics_over_time': 'timestamp',
+    'progress': 'timestamp',
+    'requests': 'timestamp',
+}
+
+
+def upgrade():
+    # Tables can be large, build indexes without blocking writes
+    with op.get_context().autocommit_block():
+        for table, column in TABLES.items():
+            op.create_index(f'ix_{table}_test_run_id_test_id', table, ['test_run_id', 'test_id'],
+                            unique=False, postgresql_concurrently=True, if_not_exists=True)
+            op.create_index(f'ix_{table}_test_id_{column}', table, ['test_id', column],
+                            unique=False, postgresql_concurrently=True, if_not_exists=True)
+            # Covered by the (test_run_id, test_id) index
+            op.drop_index(f'ix_{table}_test_run_id', table_name=table,
+                          postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table, column in TABLES.items():
+            op.create_index(f'ix_{table}_test_run_id', table, ['test_run_id'],
+                            unique=False, postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index(f'ix_{table}_test_id_{column}', table_name=table,
+                          postgresql_concurrently=True, if_exists=True)
+            op.drop_index(f'ix_{table}_test_run_id_test_id', table_name=table,
+                          postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,37 @@
+"""Add stale test run rollups
+
+Revision ID: c6d1e9f3a7b4
+Revises: b2e8f4a6c1d9
+Create Date: 2026-10-18 16:05:37.214806
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6d1e9f3a7b4'
+down_revision = 'b2e8f4a6c1d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Marked when a test run finishes, recomputed and cleared by the rollup background task of the web service
+    op.create_table('stale_test_run_rollups',
+    sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('project_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('interval', sa.String(length=8), nullable=False),
+    sa.Column('bucket', postgresql.TIMESTAMP(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id')
+    )
+    op.create_index('ix_stale_test_run_rollups_project_id_interval_bucket', 'stale_test_run_rollups',
+                    ['project_id', 'interval', 'bucket'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_stale_test_run_rollups_project_id_interval_bucket', table_name='stale_test_run_rollups')
+    op.drop_table('stale_test_run_rollups')
@@ -0,0 +1,47 @@
+"""Add tests.full_name with trigram index
+
+Revision ID: d9a2c6e4f1b8
+Revises: c3f8d1a7b5e2
+Create Date: 2026-10-18 11:52:16.330418
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a2c6e4f1b8'
+down_revision = 'c3f8d1a7b5e2'
+branch_labels = None
+depends_on = None
+
+log = logging.getLogger(__name__)
+
+
+def upgrade():
+    op.add_column('tests', sa.Column('full_name', sa.Text(), sa.Computed("path || '/' || name", persisted=True)))
+
+    connection = op.get_bind()
+    available = connection.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar()
+    if not available:
+        log.warning('pg_trgm extension is not available, test search will not be indexed')
+        return
+
+    try:
+        with connection.begin_nested():
+            op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except sa.exc.DBAPIError as e:
+        log.warning(f'pg_trgm extension can not be created, test search will not be indexed: {e.orig}')
+        return
+
+    op.create_index('ix_tests_full_name_trgm', 'tests', ['full_name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'full_name': 'gin_trgm_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_tests_full_name_trgm', table_name='tests', if_exists=True)
+    op.drop_column('tests', 'full_name')
@@ -0,0 +1,97 @@
+"""Add per test run result counters
+
+Revision ID: e4b7c2d8a9f3
+Revises: d9a2c6e4f1b8
+Create Date: 2026-10-18 12:41:03.518274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b7c2d8a9f3'
+down_revision = 'd9a2c6e4f1b8'
+branch_labels = None
+depends_on = None
+
+COUNTERS = ('passed', 'failed', 'skipped', 'xpassed', 'xfailed')
+
+# Rows changed by a statement, inserted rows are added to the counters and deleted ones are subtracted
+CHANGES = {
+    'insert': 'SELECT 1 AS sign, * FROM new_tests',
+    'update': 'SELECT 1 AS sign, * FROM new_tests UNION ALL SELECT -1 AS sign, * FROM old_tests',
+    'delete': 'SELECT -1 AS sign, * FROM old_tests',
+}
+
+TRANSITIONS = {
+    'insert': 'NEW TABLE AS new_tests',
+    'update': 'OLD TABLE AS old_tests NEW TABLE AS new_tests',
+    'delete': 'OLD TABLE AS old_tests',
+}
+
+
+def deltas(source: str) -> str:
+    sums = {f'tests_{result}': f"sum(sign) FILTER (WHERE result = '{result}')" for result in COUNTERS}
+    sums['tests_unknown'] = 'sum(sign) FILTER (WHERE result IS NULL)'
+    sums['tests_duration'] = 'sum(sign * (finish - start))'
+    columns = ',\n'.join(f'{total} AS {column}' for column, total in sums.items())
+    # Test runs whose counters all stay the same, e.g. when only the log of a test changes, are left untouched
+    zero = {column: "'0'::interval" if column == 'tests_duration' else '0' for column in sums}
+    changed = '\nOR '.join(f'{total} <> {zero[column]}' for column, total in sums.items())
+    return f'''
+        SELECT test_run_id,
+            {columns}
+        FROM ({source}) AS changes
+        GROUP BY test_run_id
+        HAVING {changed}
+    '''
+
+
+def upgrade():
+    for counter in (*COUNTERS, 'unknown'):
+        op.add_column('test_runs', sa.Column(f'tests_{counter}', sa.Integer(), server_default=sa.text('0'),
+                                             nullable=False))
+    op.add_column('test_runs', sa.Column('tests_duration', sa.Interval(), server_default=sa.text("'0'::interval"),
+                                         nullable=False))
+
+    assignments = ',\n'.join(
+        f'tests_{counter} = test_runs.tests_{counter} + coalesce(deltas.tests_{counter}, 0)'
+        for counter in (*COUNTERS, 'unknown')
+    )
+    for operation, source in CHANGES.items():
+        op.execute(f'''
+            CREATE FUNCTION count_tests_on_{operation}() RETURNS trigger AS $$
+            BEGIN
+                UPDATE test_runs SET
+                    {assignments},
+                    tests_duration = test_runs.tests_duration + coalesce(deltas.tests_duration, '0'::interval)
+                FROM ({deltas(source)}) AS deltas
+                WHERE test_runs.id = deltas.test_run_id;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        ''')
+        op.execute(f'''
+            CREATE TRIGGER count_tests_on_{operation}
+            AFTER {operation.upper()} ON tests
+            REFERENCING {TRANSITIONS[operation]}
+            FOR EACH STATEMENT EXECUTE FUNCTION count_tests_on_{operation}()
+        ''')
+
+    # CREATE TRIGGER blocks writes to tests until commit, so no change is missed or counted twice by the backfill
+    op.execute(f'''
+        UPDATE test_runs SET
+            {', '.join(f'tests_{counter} = coalesce(deltas.tests_{counter}, 0)' for counter in (*COUNTERS, 'unknown'))},
+            tests_duration = coalesce(deltas.tests_duration, '0'::interval)
+        FROM ({deltas('SELECT 1 AS sign, * FROM tests')}) AS deltas
+        WHERE test_runs.id = deltas.test_run_id
+    ''')
+
+
+def downgrade():
+    for operation in CHANGES:
+        op.execute(f'DROP TRIGGER IF EXISTS count_tests_on_{operation} ON tests')
+        op.execute(f'DROP FUNCTION IF EXISTS count_tests_on_{operation}()')
+    for counter in (*COUNTERS, 'unknown', 'duration'):
+        op.drop_column('test_runs', f'tests_{counter}')
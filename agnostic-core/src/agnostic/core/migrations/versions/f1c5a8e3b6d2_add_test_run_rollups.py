@@ -0,0 +1,48 @@
+"""Add test run rollups
+
+Revision ID: f1c5a8e3b6d2
+Revises: e4b7c2d8a9f3
+Create Date: 2026-10-18 13:27:45.906113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c5a8e3b6d2'
+down_revision = 'e4b7c2d8a9f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled by the rollup background task of the web service
+    op.create_table('test_run_rollups',
+    sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('project_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('interval', sa.String(length=8), nullable=False),
+    sa.Column('bucket', postgresql.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('sut_branch', sa.String(length=128), nullable=True),
+    sa.Column('test_branch', sa.String(length=128), nullable=True),
+    sa.Column('variant_hash', sa.String(length=32), nullable=False),
+    sa.Column('variant', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('test_runs', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('passed', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('skipped', sa.Integer(), nullable=False),
+    sa.Column('xpassed', sa.Integer(), nullable=False),
+    sa.Column('xfailed', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id')
+    )
+    op.create_index('ix_test_run_rollups_project_id_interval_bucket', 'test_run_rollups',
+                    ['project_id', 'interval', 'bucket'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_test_run_rollups_project_id_interval_bucket', table_name='test_run_rollups')
+    op.drop_table('test_run_rollups')
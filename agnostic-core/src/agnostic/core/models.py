@@ -2,7 +2,8 @@ import datetime
 import uuid
 from decimal import Decimal
 
-from sqlalchemy import Column, String, DateTime, Boolean, Text, ForeignKey, Integer, UniqueConstraint, CheckConstraint
+from sqlalchemy import Column, String, DateTime, Boolean, Text, ForeignKey, Integer, UniqueConstraint, CheckConstraint, \
+    BigInteger, Computed, Index, Interval, Sequence, func
 from sqlalchemy.dialects.postgresql import UUID, DOUBLE_PRECISION, BYTEA, JSONB
 from sqlalchemy.ext.declarative import as_declarative
 from sqlalchemy.orm import mapped_column, Mapped
@@ -27,6 +28,22 @@ class Base:
     )
 
 
+class TimePartitioned:
+    """Table partitioned by month of `timestamp`, partitions are created ahead by a background task
+
+    Unique constraints of a partitioned table have to include the partition key, so ids are only unique
+    together with the timestamp.
+    """
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text('gen_random_uuid()'),
+        nullable=False
+    )
+    timestamp: Mapped[datetime.datetime] = mapped_column(DateTime, primary_key=True, nullable=False)
+
+
 class Project(Base):
     __tablename__ = 'projects'
 
@@ -52,6 +69,16 @@ class TestRun(Base):
     test_version: Mapped[str | None] = mapped_column(String(128))
     test_branch: Mapped[str | None] = mapped_column(String(128))
     properties: Mapped[dict | None] = mapped_column(JSONB)
+    # Result counters and the total duration of finished tests, maintained by triggers on `tests`
+    tests_passed: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    tests_failed: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    tests_skipped: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    tests_xpassed: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    tests_xfailed: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    tests_unknown: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    tests_duration: Mapped[datetime.timedelta] = mapped_column(
+        Interval, nullable=False, server_default=text("'0'::interval")
+    )
 
 
 class TestRunVariant(Base):
@@ -68,6 +95,51 @@ class TestRunVariant(Base):
     value: Mapped[str] = Column(String(128), nullable=False)
 
 
+class TestRunRollup(Base):
+    """Result counters of test runs grouped by start date bucket, branches and variant"""
+    __tablename__ = 'test_run_rollups'
+    __table_args__ = (
+        Index('ix_test_run_rollups_project_id_interval_bucket', 'project_id', 'interval', 'bucket'),
+    )
+
+    project_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey('projects.id', ondelete='CASCADE'),
+        nullable=False
+    )
+    # Unit of date_trunc the bucket is truncated to: day, week or month
+    interval: Mapped[str] = mapped_column(String(8), nullable=False)
+    bucket: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
+    sut_branch: Mapped[str | None] = mapped_column(String(128))
+    test_branch: Mapped[str | None] = mapped_column(String(128))
+    variant_hash: Mapped[str] = mapped_column(String(32), nullable=False)
+    variant: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    test_runs: Mapped[int] = mapped_column(Integer, nullable=False)
+    total: Mapped[int] = mapped_column(Integer, nullable=False)
+    passed: Mapped[int] = mapped_column(Integer, nullable=False)
+    failed: Mapped[int] = mapped_column(Integer, nullable=False)
+    skipped: Mapped[int] = mapped_column(Integer, nullable=False)
+    xpassed: Mapped[int] = mapped_column(Integer, nullable=False)
+    xfailed: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class StaleTestRunRollup(Base):
+    """Rolled up bucket to be recomputed, e.g. because one of its test runs finished"""
+    __tablename__ = 'stale_test_run_rollups'
+    __table_args__ = (
+        Index('ix_stale_test_run_rollups_project_id_interval_bucket', 'project_id', 'interval', 'bucket',
+              unique=True),
+    )
+
+    project_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey('projects.id', ondelete='CASCADE'),
+        nullable=False
+    )
+    interval: Mapped[str] = mapped_column(String(8), nullable=False)
+    bucket: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
+
+
 class Test(Base):
     __tablename__ = 'tests'
     __table_args__ = (
@@ -87,6 +159,8 @@ class Test(Base):
     finish: Mapped[datetime.datetime | None] = mapped_column(DateTime)
     path: Mapped[str] = mapped_column(String(512), nullable=False)
     name: Mapped[str] = mapped_column(String(256), nullable=False)
+    # Searched with LIKE '%term%', a pg_trgm GIN index is created by the migration when the extension is available
+    full_name: Mapped[str] = mapped_column(Text, Computed("path || '/' || name", persisted=True))
     result: Mapped[str | None] = mapped_column(String(8))
     reason: Mapped[str | None] = mapped_column(Text)
     error_message: Mapped[str | None] = mapped_column(Text)
@@ -95,12 +169,15 @@ class Test(Base):
 
 class Log(Base):
     __tablename__ = 'logs'
+    __table_args__ = (
+        Index('ix_logs_test_run_id_test_id', 'test_run_id', 'test_id'),
+        Index('ix_logs_test_id_start', 'test_id', 'start')
+    )
 
     test_run_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey('test_runs.id', ondelete='CASCADE'),
-        nullable=False,
-        index=True
+        nullable=False
     )
     test_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
     name: Mapped[str] = mapped_column(String(256), nullable=False)
@@ -109,14 +186,42 @@ class Log(Base):
     body: Mapped[str] = mapped_column(Text)
 
 
+log_chunks_seq = Sequence('log_chunks_seq_seq')
+
+
+class LogChunk(Base):
+    __tablename__ = 'log_chunks'
+    __table_args__ = (Index('ix_log_chunks_log_id_seq', 'log_id', 'seq', unique=True), )
+
+    log_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey('logs.id', ondelete='CASCADE'),
+        nullable=False
+    )
+    seq: Mapped[int] = mapped_column(
+        BigInteger,
+        log_chunks_seq,
+        server_default=log_chunks_seq.next_value(),
+        nullable=False
+    )
+    timestamp: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, server_default=func.now())
+    # Length in characters and size in bytes of the UTF-8 encoded text
+    length: Mapped[int] = mapped_column(Integer, nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+
+
 class Metric(Base):
     __tablename__ = 'metrics'
+    __table_args__ = (
+        Index('ix_metrics_test_run_id_test_id', 'test_run_id', 'test_id'),
+        Index('ix_metrics_test_id_timestamp', 'test_id', 'timestamp')
+    )
 
     test_run_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey('test_runs.id', ondelete='CASCADE'),
-        nullable=False,
-        index=True
+        nullable=False
     )
     test_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
     timestamp: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
@@ -125,64 +230,90 @@ class Metric(Base):
     description: Mapped[str | None] = mapped_column(Text)
 
 
-class Request(Base):
+class Request(TimePartitioned, Base):
     __tablename__ = 'requests'
+    __table_args__ = (
+        Index('ix_requests_test_run_id_test_id', 'test_run_id', 'test_id'),
+        Index('ix_requests_test_id_timestamp', 'test_id', 'timestamp'),
+        {'postgresql_partition_by': 'RANGE (timestamp)'}
+    )
 
     test_run_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey('test_runs.id', ondelete='CASCADE'),
-        nullable=False,
-        index=True
+        nullable=False
     )
     test_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
     request_type: Mapped[str] = mapped_column(String(128), nullable=False)
-    timestamp: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
     contents: Mapped[dict] = mapped_column(JSONB, nullable=False)
 
 
-class Progress(Base):
+progress_seq = Sequence('progress_seq_seq')
+
+
+class Progress(TimePartitioned, Base):
     __tablename__ = 'progress'
+    __table_args__ = (
+        Index('ix_progress_test_run_id_seq', 'test_run_id', 'seq'),
+        Index('ix_progress_test_run_id_test_id', 'test_run_id', 'test_id'),
+        Index('ix_progress_test_id_timestamp', 'test_id', 'timestamp'),
+        {'postgresql_partition_by': 'RANGE (timestamp)'}
+    )
+    # Fetch seq on insert, it is the cursor of the live progress feed
+    __mapper_args__ = {'eager_defaults': True}
 
     test_run_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey('test_runs.id', ondelete='CASCADE'),
-        nullable=False,
-        index=True
+        nullable=False
     )
     test_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
-    timestamp: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
     level: Mapped[str] = mapped_column(String(10), nullable=False)
     message: Mapped[str] = mapped_column(Text, nullable=False)
     details: Mapped[str | None] = mapped_column(Text)
+    # Records from before the feed was introduced have none
+    seq: Mapped[int | None] = mapped_column(
+        BigInteger,
+        progress_seq,
+        server_default=progress_seq.next_value()
+    )
 
 
 class Attachment(Base):
     __tablename__ = 'attachments'
+    __table_args__ = (
+        Index('ix_attachments_test_run_id_test_id', 'test_run_id', 'test_id'),
+        Index('ix_attachments_test_id_timestamp', 'test_id', 'timestamp')
+    )
 
     test_run_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey('test_runs.id', ondelete='CASCADE'),
-        nullable=False,
-        index=True
+        nullable=False
     )
     test_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
     timestamp: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
     name: Mapped[str] = mapped_column(String(512), nullable=False)
     mime_type: Mapped[str] = mapped_column(String(128), nullable=False)
     size: Mapped[int] = mapped_column(Integer, nullable=False)
-    content: Mapped[bytes] = mapped_column(BYTEA, nullable=False)
+    sha256: Mapped[str | None] = mapped_column(String(64), index=True)
+    # Only set when content is kept in the database instead of the attachment storage
+    content: Mapped[bytes | None] = mapped_column(BYTEA)
 
 
-class MetricOverTime(Base):
+class MetricOverTime(TimePartitioned, Base):
     __tablename__ = 'metrics_over_time'
+    __table_args__ = (
+        Index('ix_metrics_over_time_test_run_id_test_id', 'test_run_id', 'test_id'),
+        Index('ix_metrics_over_time_test_id_timestamp', 'test_id', 'timestamp'),
+        {'postgresql_partition_by': 'RANGE (timestamp)'}
+    )
 
     test_run_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey('test_runs.id', ondelete='CASCADE'),
-        nullable=False,
-        index=True
+        nullable=False
     )
     test_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
     name: Mapped[str] = mapped_column(String(128), nullable=False)
-    timestamp: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
     values: Mapped[dict] = mapped_column(JSONB, nullable=False)
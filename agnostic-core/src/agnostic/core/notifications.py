@@ -0,0 +1,107 @@
+import asyncio
+import contextlib
+import json
+import logging
+from typing import AsyncIterator
+from uuid import UUID
+
+import asyncpg
+from pydantic_core import to_jsonable_python
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agnostic.core import config
+
+log = logging.getLogger(__name__)
+
+LOGS = 'agnostic_logs'
+TEST_RUNS = 'agnostic_test_runs'
+# NOTIFY payloads are limited to 8000 bytes, larger data has to be read from the database
+MAX_PAYLOAD_SIZE = 7000
+
+
+async def notify(session: AsyncSession, channel: str, key: UUID, payload: dict):
+    """Queues a notification about `key`, it is delivered when the session transaction commits"""
+    await session.execute(
+        select(func.pg_notify(channel, json.dumps({'key': str(key), **payload}, default=to_jsonable_python)))
+    )
+
+
+async def lock_feed(session: AsyncSession, channel: str, keys):
+    """Holds other writers to feeds of `keys` off until the session transaction ends
+
+    Feeds are followed by sequence numbers taken on insert. Rows inserted under this lock are committed
+    in the order of their sequence numbers, so a follower never moves past a row not committed yet.
+    """
+    for key in sorted({str(key) for key in keys}):
+        await session.execute(select(func.pg_advisory_xact_lock(func.hashtext(f'{channel} {key}'))))
+
+
+class Listener:
+    """Shares a single LISTEN connection between all subscribers of the process"""
+
+    def __init__(self):
+        self.connection: asyncpg.Connection | None = None
+        self.subscribers: dict[tuple[str, str], set[asyncio.Queue]] = {}
+        self.lock = asyncio.Lock()
+
+    async def connect(self) -> asyncpg.Connection:
+        if not self.connection or self.connection.is_closed():
+            self.connection = await asyncpg.connect(
+                user=config.options.db_username,
+                password=config.options.db_password,
+                host=config.options.db_host,
+                port=config.options.db_port,
+                database=config.options.db_database
+            )
+            self.connection.add_termination_listener(self.terminated)
+            for channel in {channel for channel, _ in self.subscribers}:
+                await self.connection.add_listener(channel, self.dispatch)
+        return self.connection
+
+    def dispatch(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str):
+        payload = json.loads(payload)
+        for queue in self.subscribers.get((channel, payload['key']), ()):
+            queue.put_nowait(payload)
+
+    def terminated(self, connection: asyncpg.Connection):
+        log.warning('Notification listener connection was lost')
+        self.connection = None
+        self.disconnect()
+
+    def disconnect(self):
+        # Subscribers can not know what they missed, end their streams so clients reconnect and resume
+        for queues in self.subscribers.values():
+            for queue in queues:
+                queue.put_nowait(None)
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, channel: str, key: UUID) -> AsyncIterator[asyncio.Queue]:
+        """Yields a queue receiving notification payloads about `key`, None is put when the connection is lost"""
+        queue = asyncio.Queue()
+        async with self.lock:
+            connection = await self.connect()
+            if channel not in {c for c, _ in self.subscribers}:
+                await connection.add_listener(channel, self.dispatch)
+            self.subscribers.setdefault((channel, str(key)), set()).add(queue)
+        try:
+            yield queue
+        finally:
+            async with self.lock:
+                queues = self.subscribers[(channel, str(key))]
+                queues.discard(queue)
+                if not queues:
+                    del self.subscribers[(channel, str(key))]
+                listened = self.connection and not self.connection.is_closed()
+                if listened and channel not in {c for c, _ in self.subscribers}:
+                    await self.connection.remove_listener(channel, self.dispatch)
+
+    async def close(self):
+        if self.connection:
+            self.connection.remove_termination_listener(self.terminated)
+            await self.connection.close()
+            self.connection = None
+        self.disconnect()
+
+
+listener = Listener()
@@ -1,5 +1,7 @@
 from .attachments import *
 from .base import *
+from .batch import *
+from .events import *
 from .logs import *
 from .lookups import *
 from .metrics import *
@@ -15,7 +15,8 @@ class Attachment(Base):
     name: constr(strip_whitespace=True, max_length=512)
     mime_type: constr(strip_whitespace=True, max_length=128)
     size: int | None = None
-    content: bytes
+    sha256: str | None = None
+    content: bytes | None = None
 
 
 class AttachmentCreate(Attachment):
@@ -23,4 +24,5 @@ class AttachmentCreate(Attachment):
     name: constr(strip_whitespace=True, max_length=512)
     mime_type: constr(strip_whitespace=True, max_length=128)
     size: int | None = None
-    content: bytes
+    sha256: str | None = None
+    content: bytes | None = None
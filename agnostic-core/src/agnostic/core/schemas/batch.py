@@ -0,0 +1,18 @@
+__all__ = ['BatchItemResult', 'BatchResult']
+import uuid
+
+from .base import Base
+from .lookups import BatchItemStatus
+
+
+class BatchItemResult(Base):
+    index: int
+    id: uuid.UUID | None = None
+    status: BatchItemStatus
+    error: str | None = None
+
+
+class BatchResult(Base):
+    accepted: int
+    rejected: int
+    items: list[BatchItemResult]
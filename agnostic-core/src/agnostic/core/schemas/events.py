@@ -0,0 +1,18 @@
+__all__ = ['Event', 'EventsResult']
+from typing import Any
+
+from .base import Base
+from .batch import BatchItemResult
+from .lookups import EventType
+
+
+class Event(Base):
+    type: EventType
+    data: dict[str, Any]
+
+
+class EventsResult(Base):
+    accepted: int
+    rejected: int
+    # Only rejected events are listed, index is a line number within the stream
+    errors: list[BatchItemResult]
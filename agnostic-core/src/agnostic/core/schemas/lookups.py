@@ -1,4 +1,4 @@
-__all__ = ['TestResult', 'Level', 'RequestType']
+__all__ = ['TestResult', 'Level', 'RequestType', 'BatchItemStatus', 'EventType']
 from enum import StrEnum
 
 
@@ -22,3 +22,19 @@ class RequestType(StrEnum):
     GRPC = 'grpc'
     SQL = 'sql'
     NATS = 'nats'
+
+
+class BatchItemStatus(StrEnum):
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DUPLICATE = 'duplicate'
+    NOT_FOUND = 'not_found'
+    INVALID = 'invalid'
+
+
+class EventType(StrEnum):
+    TEST = 'test'
+    PROGRESS = 'progress'
+    METRIC = 'metric'
+    METRIC_OT = 'metric_ot'
+    REQUEST = 'request'
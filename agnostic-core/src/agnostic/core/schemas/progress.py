@@ -1,4 +1,4 @@
-__all__ = ['Progress', 'ProgressCreate']
+__all__ = ['Progress', 'ProgressCreate', 'ProgressRecord']
 import uuid
 import datetime
 from .base import Base
@@ -19,4 +19,7 @@ class ProgressCreate(Progress):
     id: uuid.UUID | None = None
     message: str
     level: Level
-    
\ No newline at end of file
+
+
+class ProgressRecord(Progress):
+    seq: int
@@ -0,0 +1,92 @@
+import abc
+import asyncio
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import AsyncIterable, NamedTuple
+
+from agnostic.core import config
+
+
+class StoredContent(NamedTuple):
+    sha256: str
+    size: int
+    # Only set when the content has to be kept in the database
+    content: bytes | None = None
+
+
+class Storage(abc.ABC):
+    """Attachment content backend, content is addressed by its sha256 hex digest"""
+
+    @abc.abstractmethod
+    async def save(self, chunks: AsyncIterable[bytes]) -> StoredContent:
+        ...
+
+    def path(self, sha256: str) -> Path | None:
+        """Local file with the content, if the backend has one"""
+        return None
+
+    async def delete(self, sha256: str):
+        pass
+
+
+class DatabaseStorage(Storage):
+    """Keeps content in the attachments table"""
+
+    async def save(self, chunks: AsyncIterable[bytes]) -> StoredContent:
+        digest, content = hashlib.sha256(), bytearray()
+        async for chunk in chunks:
+            digest.update(chunk)
+            content.extend(chunk)
+        return StoredContent(digest.hexdigest(), len(content), bytes(content))
+
+
+class LocalStorage(Storage):
+    """Keeps content in a directory, identical content is stored once"""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def path(self, sha256: str) -> Path | None:
+        path = self.root / sha256[:2] / sha256[2:4] / sha256
+        return path if path.is_file() else None
+
+    async def save(self, chunks: AsyncIterable[bytes]) -> StoredContent:
+        self.root.mkdir(parents=True, exist_ok=True)
+        digest, size = hashlib.sha256(), 0
+        # Content is written to a temporary file first, its name is known only when all of it is hashed
+        fd, temp = tempfile.mkstemp(dir=self.root, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                async for chunk in chunks:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    await asyncio.to_thread(file.write, chunk)
+            sha256 = digest.hexdigest()
+            target = self.root / sha256[:2] / sha256[2:4] / sha256
+            if target.is_file():
+                os.unlink(temp)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(temp, target)
+        except BaseException:
+            if os.path.exists(temp):
+                os.unlink(temp)
+            raise
+        return StoredContent(sha256, size)
+
+    async def delete(self, sha256: str):
+        if path := self.path(sha256):
+            await asyncio.to_thread(path.unlink, True)
+
+
+def get_storage() -> Storage:
+    match config.options.attachment_storage:
+        case 'database':
+            return DatabaseStorage()
+        case _:
+            return LocalStorage(config.options.attachment_path)
+
+
+storage = get_storage()
@@ -0,0 +1,41 @@
+"""Tests run against the database configured by AGNOSTIC_DB_* variables, migrated to the latest revision"""
+import asyncio
+import datetime
+import uuid
+
+import pytest
+
+from agnostic.core import models
+from agnostic.core.session import async_session, engine
+
+
+@pytest.fixture
+def run():
+    """Runs `test(session, test_run_id)` with a test run of a project of its own that is removed afterwards"""
+    def run(test, start: datetime.datetime | None = None, finish: datetime.datetime | None = None):
+        async def main():
+            try:
+                async with engine.connect():
+                    pass
+            except (OSError, ConnectionError) as e:
+                pytest.skip(f'Database is not available: {e}')
+
+            project_id, test_run_id = uuid.uuid4(), uuid.uuid4()
+            try:
+                async with async_session() as session:
+                    session.add(models.Project(id=project_id, name=f'Test {project_id}'))
+                    session.add(models.TestRun(id=test_run_id, project_id=project_id,
+                                               start=start or datetime.datetime.utcnow(), finish=finish))
+                    await session.commit()
+                    try:
+                        await test(session, test_run_id)
+                    finally:
+                        await session.rollback()
+                        await session.delete(await session.get(models.Project, project_id))
+                        await session.commit()
+            finally:
+                await engine.dispose()
+
+        asyncio.run(main())
+
+    return run
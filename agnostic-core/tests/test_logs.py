@@ -0,0 +1,70 @@
+import datetime
+import re
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agnostic.core import schemas
+from agnostic.core.dal import Logs
+from agnostic.core.session import engine
+
+
+def test_iter_body_reads_body_in_windows(run):
+    head = 'héllo wörld\n' * 200_000
+    chunks = ['чанк ' * 300, 'ascii\n' * 50]
+    window = 64 * 1024
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    async def test(session: AsyncSession, test_run_id: uuid.UUID):
+        logs = Logs(session)
+        log_id = await logs.create(schemas.LogCreate(test_run_id=test_run_id, name='log', body=head))
+        for chunk in chunks:
+            await logs.append_body(log_id, chunk)
+        data = (head + ''.join(chunks)).encode('utf-8')
+
+        event.listen(engine.sync_engine, 'before_cursor_execute', record)
+        try:
+            for start, end in ((0, None), (1_000_001, 2_000_000), (len(data) - 100, len(data))):
+                pieces = [piece async for piece in logs.iter_body(log_id, start, end, window)]
+                assert b''.join(pieces) == data[start:end]
+                assert max(len(piece) for piece in pieces) <= window
+        finally:
+            event.remove(engine.sync_engine, 'before_cursor_execute', record)
+
+    run(test)
+
+    # The body is only ever selected a window at a time, or measured
+    reads = [m for statement in statements for m in re.finditer(r'(\w*)\(?logs\.body\b', statement)]
+    assert reads
+    assert {m.group(1).lower() for m in reads} <= {'substring', 'octet_length', 'char_length'}
+
+
+def test_resume_from_compacted_chunks(run):
+    chunks = ['first\n', 'second\n', 'third\n', 'fourth\n']
+
+    async def test(session: AsyncSession, test_run_id: uuid.UUID):
+        logs = Logs(session)
+        log_id = await logs.create(schemas.LogCreate(test_run_id=test_run_id, name='log', body='head\n'))
+        for chunk in chunks:
+            await logs.append_body(log_id, chunk)
+        seqs = [seq for seq, _ in await logs.get_chunks(log_id, 0)]
+        await logs.update(schemas.Log(id=log_id, finish=datetime.datetime.utcnow()), exclude_unset=True)
+
+        while await logs.compact(chunk_size=1024):
+            pass
+        assert len(await logs.get_chunks(log_id, 0)) == 1
+
+        # Followers resuming from the middle of a merged group get what was appended after it, maybe more
+        for i, seq in enumerate(seqs):
+            resumed = ''.join(text for _, text in await logs.get_chunks(log_id, seq))
+            assert resumed.endswith(''.join(chunks[i + 1:]))
+            # Reads up to a sequence number contain nothing appended after it
+            body = await logs.get_body(log_id, seq=seq)
+            assert not any(chunk in body for chunk in chunks[i + 1:])
+        assert await logs.get_body(log_id) == 'head\n' + ''.join(chunks)
+
+    run(test)
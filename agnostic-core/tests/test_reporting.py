@@ -0,0 +1,31 @@
+import datetime
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agnostic.core import models
+from agnostic.core.dal import Reporting
+
+RESULTS = ['passed', 'failed', 'skipped', 'xpassed', 'xfailed', 'unknown']
+
+
+def test_progress_outside_test_run_time(run):
+    start = datetime.datetime(2024, 1, 31, 23)
+    finish = start + datetime.timedelta(hours=1)
+    # Late reporters, a reporter clock behind the test run one and one stamping records long after it finished
+    timestamps = [start - datetime.timedelta(hours=12), finish + datetime.timedelta(days=1),
+                  finish + datetime.timedelta(days=60)]
+
+    async def test(session: AsyncSession, test_run_id: uuid.UUID):
+        for timestamp in timestamps:
+            session.add(models.Progress(id=uuid.uuid4(), test_run_id=test_run_id, timestamp=timestamp, level='INFO',
+                                        message=f'{timestamp}'))
+        await session.commit()
+
+        progress = await Reporting(session).get_test_run_progress(
+            uuid.uuid4(), test_run_id, RESULTS, None, 'asc', 'timestamp', 1, 10
+        )
+        assert [record.timestamp.replace(tzinfo=None) for record in progress.data] == timestamps
+        assert progress.count == len(timestamps)
+
+    run(test, start, finish)
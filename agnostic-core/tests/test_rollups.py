@@ -0,0 +1,54 @@
+import datetime
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agnostic.core import models, schemas
+from agnostic.core.dal import Rollups, TestRuns
+
+
+def test_finish_marks_rolled_up_buckets_stale(run):
+    start = datetime.datetime(2024, 3, 5, 12)
+    bucket = datetime.datetime(2024, 3, 5)
+
+    async def test(session: AsyncSession, test_run_id: uuid.UUID):
+        project_id = (await session.get(models.TestRun, test_run_id)).project_id
+        rollups = Rollups(session)
+        await rollups.refresh('day', [(project_id, bucket)])
+        await session.commit()
+
+        async def passed():
+            return (
+                await session.execute(
+                    select(models.TestRunRollup.passed)
+                    .where(models.TestRunRollup.project_id == project_id, models.TestRunRollup.interval == 'day')
+                )
+            ).scalar()
+
+        assert await passed() == 0
+
+        session.add(models.Test(test_run_id=test_run_id, start=start, path='suite', name='test', result='passed'))
+        await session.commit()
+        await TestRuns(session).update(schemas.TestRun(id=test_run_id, finish=start), exclude_unset=True)
+
+        # Finishing a test run only marks its buckets, recomputing them is left to the background task
+        stale = (
+            await session.execute(
+                select(models.StaleTestRunRollup.interval, models.StaleTestRunRollup.bucket)
+                .where(models.StaleTestRunRollup.project_id == project_id)
+            )
+        ).all()
+        assert ('day', bucket) in [(interval, value.replace(tzinfo=None)) for interval, value in stale]
+        assert await passed() == 0
+
+        await rollups.refresh_closed()
+        assert await passed() == 1
+        assert not (
+            await session.execute(
+                select(models.StaleTestRunRollup.id)
+                .where(models.StaleTestRunRollup.project_id == project_id)
+            )
+        ).all()
+
+    run(test, start)
@@ -1,7 +1,10 @@
+import functools
+
 import pytest
 from _pytest.config.argparsing import Parser
 from ._version import __revision__, __version__
-from agnostic.pytest.agnostic.client import get_client, Client, RedisContext, LocalContext, HTTPClient
+from agnostic.pytest.agnostic.client import get_client, Client, RedisContext, LocalContext, HTTPClient, \
+    LocalHTTPClient, BatchingHTTPClient, SpoolHTTPClient, Overflow
 
 # Use 2 instances of the client for a case when client was hooked with async HTTP client
 _agnostic: Client | None = None
@@ -38,12 +41,35 @@ def pytest_addoption(parser: Parser):
                     default=0, help='Redis instance DB for shared context')
     group.addoption('--agnostic_http_client', dest='agnostic_http_client',
                     default=None, help='Agnostic HTTP client type. Cannot be set from CLI')
+    group.addoption('--agnostic_async', dest='agnostic_async', action='store_true',
+                    default=False, help='Send data to Agnostic from a background thread in batches')
+    group.addoption('--agnostic_queue_size', dest='agnostic_queue_size', type=int,
+                    default=10000, help='Max number of requests waiting to be sent in async mode')
+    group.addoption('--agnostic_batch_size', dest='agnostic_batch_size', type=int,
+                    default=100, help='Max number of requests sent in one batch in async mode')
+    group.addoption('--agnostic_flush_interval', dest='agnostic_flush_interval', type=float,
+                    default=1.0, help='Max number of seconds to collect a batch in async mode')
+    group.addoption('--agnostic_overflow', dest='agnostic_overflow', choices=[o.value for o in Overflow],
+                    default=Overflow.BLOCK.value, help='What to do when the send queue is full in async mode')
+    group.addoption('--agnostic_spill_path', dest='agnostic_spill_path',
+                    default=None, help='File to spill requests to when the send queue is full, temporary if omitted')
+    group.addoption('--agnostic_spool', dest='agnostic_spool',
+                    default=None, help='File to write requests to instead of sending them, see agnostic-replay')
+    group.addoption('--agnostic_retries', dest='agnostic_retries', type=int,
+                    default=3, help='Number of times a request failing to reach the server is sent again')
+    group.addoption('--agnostic_retry_backoff', dest='agnostic_retry_backoff', type=float,
+                    default=0.5, help='Max seconds to wait before the first retry, doubled with every next one')
+    group.addoption('--agnostic_heartbeat_interval', dest='agnostic_heartbeat_interval', type=float,
+                    default=20.0, help='Seconds between test run heartbeats sent from a background thread, 0 disables')
 
 
 @pytest.hookimpl(tryfirst=True)
 def pytest_sessionstart(session):
     options = session.config.option
-    if not options.agnostic_offline:
+    if options.agnostic_spool:
+        if not options.agnostic_project_id:
+            raise RuntimeError('Agnostic Project ID must be provided')
+    elif not options.agnostic_offline:
         if not options.agnostic_url or not options.agnostic_project_id:
             raise RuntimeError('Agnostic URL and Project ID must be provided')
 
@@ -61,8 +87,28 @@ def pytest_sessionstart(session):
     ctx.test_run_id = options.agnostic_test_run_id
     ctx.offline = options.agnostic_offline
 
+    http_client = functools.partial(
+        LocalHTTPClient,
+        retries=options.agnostic_retries,
+        backoff=options.agnostic_retry_backoff
+    )
+    if options.agnostic_async:
+        http_client = functools.partial(
+            BatchingHTTPClient,
+            queue_size=options.agnostic_queue_size,
+            batch_size=options.agnostic_batch_size,
+            flush_interval=options.agnostic_flush_interval,
+            overflow=options.agnostic_overflow,
+            spill_path=options.agnostic_spill_path,
+            retries=options.agnostic_retries,
+            backoff=options.agnostic_retry_backoff
+        )
+
+    if options.agnostic_spool:
+        http_client = functools.partial(SpoolHTTPClient, path=options.agnostic_spool)
+
     global _agnostic
-    _agnostic = get_client(ctx)
+    _agnostic = get_client(ctx, http_client)
 
     variants = options.agnostic_variant
     if variants:
@@ -80,6 +126,8 @@ def pytest_sessionstart(session):
         variant=variants,
         properties=properties
     )
+    if options.agnostic_heartbeat_interval and not options.agnostic_offline and not options.agnostic_spool:
+        _agnostic.start_heartbeat(options.agnostic_heartbeat_interval)
     global _agnostic_hooked
     if options.agnostic_http_client:
         _agnostic_hooked = get_client(ctx, options.agnostic_http_client)
@@ -91,7 +139,11 @@ def pytest_sessionstart(session):
 @pytest.hookimpl(trylast=True)
 def pytest_sessionfinish(session):
     _agnostic.info(f'Agnostic Report finished test run {_agnostic.ctx.test_run_id}')
+    _agnostic.stop_heartbeat()
     _agnostic.finish_test_run()
+    _agnostic.http.close()
+    if _agnostic_hooked is not _agnostic:
+        _agnostic_hooked.http.close()
 
 
 @pytest.fixture(scope='session')
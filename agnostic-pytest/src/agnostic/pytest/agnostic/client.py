@@ -1,9 +1,22 @@
 import abc
+import base64
+import contextlib
 import datetime
+import functools
+import json
+import logging
 import mimetypes
 import os
+import queue
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
 import uuid
 from decimal import Decimal
+from enum import StrEnum
 from typing import Any, IO
 from uuid import UUID, uuid4
 
@@ -12,6 +25,8 @@ import requests
 
 from . import schemas
 
+logger = logging.getLogger(__name__)
+
 
 class Context:
 
@@ -177,13 +192,36 @@ class HTTPClient:
     def patch(self, path: str, data: str | dict = '{}'):
         ...
 
+    def flush(self):
+        ...
+
+    def close(self):
+        ...
+
+
+# Responses of a server which is restarting, overloaded or behind a proxy which cannot reach it
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# Appends are not idempotent, one sent again after a lost response would be appended twice
+NOT_RETRIED_PATHS = re.compile(r'.*/logs/[^/]+/body')
+
 
 class LocalHTTPClient(HTTPClient):
+    """HTTP client sending requests right away
 
-    def __init__(self, ctx: Context):
+    Write requests failing with a connection error or a `RETRY_STATUSES` response are sent again up to
+    `retries` times, waiting a random time of up to `backoff` seconds doubled with every attempt and capped
+    by `max_backoff`. Records are created with ids generated by the client and the server skips existing
+    ones, so a request sent again after its response was lost does not create a duplicate.
+    """
+
+    def __init__(self, ctx: Context, retries: int = 3, backoff: float = 0.5, max_backoff: float = 10.0):
         super(LocalHTTPClient, self).__init__(ctx)
         self.headers = {'Content-Type': 'application/json'}
         self.session = requests.Session()
+        self.retries = max(retries, 0)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
 
     def get(self, path: str):
         if not self.ctx.offline:
@@ -191,20 +229,505 @@ class LocalHTTPClient(HTTPClient):
 
     def post(self, path: str, data: str | dict = '{}'):
         if not self.ctx.offline:
-            result = self.session.post(f'{self.base_url}{path}', data=data, headers=self.headers)
-            return result
+            return self._request('post', path, data=data, headers=self.headers)
 
     def post_files(self, path: str, files: dict):
         if not self.ctx.offline:
-            return self.session.post(f'{self.base_url}{path}', files=files)
+            # Files are read once, a retry sends the same content again
+            files = {
+                field: (name, content if isinstance(content, (bytes, str)) else content.read(), mime_type)
+                for field, (name, content, mime_type) in files.items()
+            }
+            return self._request('post', path, files=files)
 
     def put(self, path: str, data: str | dict = '{}'):
         if not self.ctx.offline:
-            return self.session.put(f'{self.base_url}{path}', data=data, headers=self.headers)
+            return self._request('put', path, data=data, headers=self.headers)
 
     def patch(self, path: str, data: str | dict = '{}'):
         if not self.ctx.offline:
-            return self.session.patch(f'{self.base_url}{path}', data=data, headers=self.headers)
+            return self._request('patch', path, data=data, headers=self.headers)
+
+    def close(self):
+        self.session.close()
+
+    def get_delay(self, attempt: int, result: requests.Response | None = None) -> float:
+        """Seconds to wait before sending a request again, jittered so that clients do not retry in sync"""
+        delay = random.uniform(0, min(self.backoff * 2 ** attempt, self.max_backoff))
+        retry_after = result.headers.get('Retry-After', '') if result is not None else ''
+        if retry_after.isdigit():
+            delay = max(delay, min(int(retry_after), self.max_backoff))
+        return delay
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        retries = 0 if NOT_RETRIED_PATHS.fullmatch(path) else self.retries
+        attempt = 0
+        while True:
+            try:
+                result = self.session.request(method, f'{self.base_url}{path}', **kwargs)
+            except requests.ConnectionError as e:
+                if attempt >= retries:
+                    raise
+                logger.debug('Agnostic failed to send %s %s, retrying: %s', method.upper(), path, e)
+                result = None
+            else:
+                if result.status_code not in RETRY_STATUSES or attempt >= retries:
+                    return result
+                logger.debug('Agnostic got %s for %s %s, retrying', result.status_code, method.upper(), path)
+            time.sleep(self.get_delay(attempt, result))
+            attempt += 1
+
+
+class Overflow(StrEnum):
+    BLOCK = 'block'
+    DROP_OLDEST = 'drop-oldest'
+    SPILL = 'spill'
+
+
+# Write requests which can be combined into a single request to the events stream endpoint
+EVENT_PATHS = tuple(
+    (event_type, re.compile(rf'/test-runs/(?P<test_run_id>[^/]+){path}'))
+    for event_type, path in (
+        ('test', r'/tests(?:/(?P<id>[^/]+)/finish)?'),
+        ('progress', r'(?:/tests/(?P<test_id>[^/]+))?/progress'),
+        ('metric', r'(?:/tests/(?P<test_id>[^/]+))?/metrics'),
+        ('metric_ot', r'(?:/tests/(?P<test_id>[^/]+))?/metrics-ot'),
+        ('request', r'(?:/tests/(?P<test_id>[^/]+))?/requests'),
+    )
+)
+
+
+def as_event(item: dict) -> tuple[str, dict] | None:
+    if item['method'] != 'post':
+        return None
+    for event_type, path in EVENT_PATHS:
+        match = path.fullmatch(item['path'])
+        if match:
+            data = json.loads(item['data'])
+            data.update({key: value for key, value in match.groupdict().items() if value})
+            return data.pop('test_run_id'), {'type': event_type, 'data': data}
+    return None
+
+
+def as_log_append(item: dict) -> tuple[str, list[str]] | None:
+    if item['method'] == 'patch' and NOT_RETRIED_PATHS.fullmatch(item['path']):
+        return item['path'], [json.loads(item['data'])['value']]
+    return None
+
+
+PROPERTIES_PATH = re.compile(r'(?P<test_run_path>/test-runs/[^/]+)/(?:property|(?P<many>properties))')
+
+
+def as_properties(item: dict) -> tuple[str, list[dict]] | None:
+    if item['method'] != 'post':
+        return None
+    match = PROPERTIES_PATH.fullmatch(item['path'])
+    if match:
+        data = json.loads(item['data'])
+        return f'{match["test_run_path"]}/properties', data if match['many'] else [data]
+    return None
+
+
+# Fields the server sets to the time it receives a request when they are missing, a spool is sent much later
+SPOOL_TIMESTAMPS = tuple(
+    (re.compile(path), field) for path, field in (
+        (r'/test-runs', 'start'),
+        (r'/test-runs/[^/]+/finish', 'finish'),
+    )
+)
+
+
+def encode_files(files: dict) -> dict:
+    """Files of a request in a JSON serializable form"""
+    encoded = {}
+    for field, (name, content, mime_type) in files.items():
+        if not isinstance(content, bytes):
+            content = content.read()
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        encoded[field] = [name, base64.b64encode(content).decode('ascii'), mime_type]
+    return encoded
+
+
+def decode_files(files: dict) -> dict:
+    return {
+        field: (name, base64.b64decode(content), mime_type)
+        for field, (name, content, mime_type) in files.items()
+    }
+
+
+FILE_CHUNK_SIZE = 1024 * 1024
+
+
+def copy_files(files: dict, directory: str) -> dict:
+    """Files of a request copied chunk by chunk into `directory`, so that only their paths wait in a queue"""
+    copied = {}
+    try:
+        for field, (name, content, mime_type) in files.items():
+            fd, path = tempfile.mkstemp(dir=directory)
+            copied[field] = [name, path, mime_type]
+            with os.fdopen(fd, 'wb') as file:
+                if isinstance(content, (bytes, str)):
+                    content = [content]
+                else:
+                    content = iter(functools.partial(content.read, FILE_CHUNK_SIZE), content.read(0))
+                for chunk in content:
+                    file.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+    except BaseException:
+        remove_files(copied)
+        raise
+    return copied
+
+
+def remove_files(files: dict):
+    for name, path, mime_type in files.values():
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class SpillFile:
+    """Append-only file used as an overflow FIFO for queued requests"""
+
+    def __init__(self, path: str | None = None):
+        self.file = open(path, 'w+b') if path else tempfile.TemporaryFile()
+        self.lock = threading.Lock()
+        self.read_offset = 0
+        self.write_offset = 0
+        self.count = 0
+
+    def put(self, item: dict):
+        line = json.dumps(item).encode('utf-8') + b'\n'
+        with self.lock:
+            self.file.seek(self.write_offset)
+            self.file.write(line)
+            self.write_offset += len(line)
+            self.count += 1
+
+    def get_many(self, size: int) -> list[dict]:
+        items = []
+        with self.lock:
+            if not self.count:
+                return items
+            self.file.flush()
+            self.file.seek(self.read_offset)
+            while len(items) < size and self.read_offset < self.write_offset:
+                line = self.file.readline()
+                self.read_offset += len(line)
+                items.append(json.loads(line))
+            self.count -= len(items)
+            if not self.count:
+                # Everything is replayed, start over to keep the file small
+                self.file.seek(0)
+                self.file.truncate()
+                self.read_offset = self.write_offset = 0
+        return items
+
+    def close(self):
+        self.file.close()
+
+
+class BatchingHTTPClient(LocalHTTPClient):
+    """HTTP client sending write requests from a background thread
+
+    Requests are put into a bounded queue and a worker thread sends them in batches of up to `batch_size`
+    requests or whatever was collected within `flush_interval` seconds. Reads flush the queue first, so
+    requests reach the server in the same order they were issued. When the queue is full, `overflow`
+    decides whether the caller blocks, the oldest queued request is dropped or requests are spilled
+    to a file until the worker catches up.
+    """
+
+    def __init__(self, ctx: Context, queue_size: int = 10000, batch_size: int = 100,
+                 flush_interval: float = 1.0, overflow: Overflow | str = Overflow.BLOCK,
+                 spill_path: str | None = None, **kwargs):
+        super(BatchingHTTPClient, self).__init__(ctx, **kwargs)
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self.overflow = Overflow(overflow)
+        self.dropped = 0
+        # Monotonic time events were last accepted by the server, which takes them as a test run heartbeat
+        self.events_sent = 0.0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._spill = SpillFile(spill_path) if self.overflow == Overflow.SPILL else None
+        # Attachments wait for the worker here, the queue and the spill file only hold their paths
+        self._files_dir = tempfile.mkdtemp(prefix='agnostic-')
+        self._enqueue_lock = threading.Lock()
+        self._pending = 0
+        self._pending_changed = threading.Condition()
+        self._flushing = threading.Event()
+        self._closed = threading.Event()
+        self._worker = threading.Thread(target=self._run, name='agnostic-sender', daemon=True)
+        self._worker.start()
+
+    def get(self, path: str):
+        self.flush()
+        return super(BatchingHTTPClient, self).get(path)
+
+    def post(self, path: str, data: str | dict = '{}'):
+        self._enqueue({'method': 'post', 'path': path, 'data': data})
+
+    def post_files(self, path: str, files: dict):
+        files = copy_files(files, self._files_dir)
+        try:
+            self._enqueue({'method': 'post_files', 'path': path, 'files': files})
+        except BaseException:
+            remove_files(files)
+            raise
+
+    def put(self, path: str, data: str | dict = '{}'):
+        self._enqueue({'method': 'put', 'path': path, 'data': data})
+
+    def patch(self, path: str, data: str | dict = '{}'):
+        self._enqueue({'method': 'patch', 'path': path, 'data': data})
+
+    def flush(self):
+        self._flushing.set()
+        try:
+            with self._pending_changed:
+                self._pending_changed.wait_for(lambda: not self._pending or not self._worker.is_alive())
+        finally:
+            self._flushing.clear()
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self.flush()
+        self._closed.set()
+        self._worker.join()
+        if self._spill:
+            self._spill.close()
+        shutil.rmtree(self._files_dir, ignore_errors=True)
+        if self.dropped:
+            logger.warning('Agnostic dropped %s requests due to a full send queue', self.dropped)
+
+    def _enqueue(self, item: dict):
+        if self._closed.is_set():
+            raise RuntimeError('HTTP client is closed')
+        with self._pending_changed:
+            self._pending += 1
+        with self._enqueue_lock:
+            if self._spill:
+                # Once spilling started everything goes to the file until it is drained to preserve the order
+                if self._spill.count:
+                    self._spill.put(item)
+                    return
+                try:
+                    self._queue.put_nowait(item)
+                except queue.Full:
+                    self._spill.put(item)
+            elif self.overflow == Overflow.DROP_OLDEST:
+                while True:
+                    try:
+                        self._queue.put_nowait(item)
+                        return
+                    except queue.Full:
+                        try:
+                            dropped = self._queue.get_nowait()
+                            if dropped['method'] == 'post_files':
+                                remove_files(dropped['files'])
+                            self.dropped += 1
+                            self._done()
+                        except queue.Empty:
+                            pass
+            else:
+                self._queue.put(item)
+
+    def _done(self, count: int = 1):
+        with self._pending_changed:
+            self._pending -= count
+            self._pending_changed.notify_all()
+
+    def _next_batch(self) -> list[dict]:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if self._flushing.is_set() or self._closed.is_set():
+                timeout = 0
+            try:
+                if timeout > 0:
+                    batch.append(self._queue.get(timeout=min(timeout, 0.1)))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                if timeout <= 0:
+                    break
+        if not batch and self._spill:
+            batch = self._spill.get_many(self.batch_size)
+        return batch
+
+    def _send(self, item: dict):
+        method = item['method']
+        if method == 'post_files':
+            try:
+                with contextlib.ExitStack() as stack:
+                    files = {
+                        field: (name, stack.enter_context(open(path, 'rb')), mime_type)
+                        for field, (name, path, mime_type) in item['files'].items()
+                    }
+                    return super(BatchingHTTPClient, self).post_files(item['path'], files)
+            finally:
+                remove_files(item['files'])
+        return getattr(super(BatchingHTTPClient, self), method)(item['path'], item['data'])
+
+    def _send_events(self, test_run_id: str, events: list[dict]):
+        if self.ctx.offline:
+            return
+        result = self._request(
+            'post',
+            f'/test-runs/{test_run_id}/events',
+            data='\n'.join(json.dumps(event) for event in events),
+            headers={'Content-Type': 'application/x-ndjson'}
+        )
+        result.raise_for_status()
+        self.events_sent = time.monotonic()
+        for error in result.json()['errors']:
+            logger.warning('Agnostic rejected %s event: %s', events[error['index']]['type'], error['error'])
+
+    def _send_batch(self, batch: list[dict]):
+        # Consecutive events of the same test run go in one request, and so do consecutive appends to the same log
+        # and properties of the same test run. The rest is sent as is to keep the order.
+        groups = []
+        for item in batch:
+            kind, key, values = None, None, item
+            for combined_kind, combine in (('events', as_event), ('append', as_log_append),
+                                           ('properties', as_properties)):
+                if combined := combine(item):
+                    kind, (key, values) = combined_kind, combined
+                    break
+            if kind == 'events':
+                values = [values]
+            if kind and groups and groups[-1][:2] == [kind, key]:
+                groups[-1][2].extend(values)
+                groups[-1][3] += 1
+            else:
+                groups.append([kind, key, values, 1])
+
+        for kind, key, values, count in groups:
+            try:
+                if kind == 'events':
+                    self._send_events(key, values)
+                elif kind == 'append':
+                    self._send({'method': 'patch', 'path': key, 'data': json.dumps({'value': ''.join(values)})})
+                elif kind == 'properties':
+                    self._send({'method': 'post', 'path': key, 'data': json.dumps(values)})
+                else:
+                    self._send(values)
+            except Exception as e:  # noqa
+                logger.warning('Agnostic failed to send data: %s', e)
+            finally:
+                self._done(count)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._send_batch(batch)
+            elif self._closed.is_set():
+                return
+
+
+class SpoolHTTPClient(HTTPClient):
+    """HTTP client appending write requests to a spool file instead of sending them
+
+    The spool is newline-delimited JSON, one request per line, and is uploaded later with `agnostic-replay`.
+    Lines are appended with a single write each, so several processes may share a spool. They are synced
+    to disk at most every `sync_interval` seconds and when the client is closed.
+    """
+
+    def __init__(self, ctx: Context, path: str, sync_interval: float = 1.0):
+        super(SpoolHTTPClient, self).__init__(ctx)
+        self.path = path
+        self.sync_interval = sync_interval
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._lock = threading.Lock()
+        self._synced = time.monotonic()
+
+    def get(self, path: str):
+        # Nothing is read back from a spool, the caller behaves as if the server was not reachable
+        return None
+
+    def post(self, path: str, data: str | dict = '{}'):
+        self._append({'method': 'post', 'path': path, 'data': data})
+
+    def post_files(self, path: str, files: dict):
+        self._append({'method': 'post_files', 'path': path, 'files': encode_files(files)})
+
+    def put(self, path: str, data: str | dict = '{}'):
+        self._append({'method': 'put', 'path': path, 'data': data})
+
+    def patch(self, path: str, data: str | dict = '{}'):
+        self._append({'method': 'patch', 'path': path, 'data': data})
+
+    def flush(self):
+        with self._lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+                self._synced = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+                os.close(self._fd)
+                self._fd = None
+
+    def _append(self, item: dict):
+        if item['method'] == 'post' and isinstance(item['data'], str):
+            data = json.loads(item['data'])
+            # Events get an id if they have none, so replaying a spool twice does not duplicate them
+            if as_event(item) and not data.get('id'):
+                data['id'] = str(uuid4())
+            for path, field in SPOOL_TIMESTAMPS:
+                if path.fullmatch(item['path']) and not data.get(field):
+                    data[field] = datetime.datetime.utcnow().isoformat()
+            item['data'] = json.dumps(data)
+        item['project_id'] = str(self.ctx.project_id)
+        line = json.dumps(item).encode('utf-8') + b'\n'
+        with self._lock:
+            if self._fd is None:
+                raise RuntimeError('HTTP client is closed')
+            os.write(self._fd, line)
+            if time.monotonic() - self._synced >= self.sync_interval:
+                os.fsync(self._fd)
+                self._synced = time.monotonic()
+
+
+class Heartbeat:
+    """Sends test run heartbeats from a daemon thread with its own HTTP session
+
+    Heartbeats are skipped while the batching HTTP client of `client` sends events, the server
+    takes those as heartbeats.
+    """
+
+    def __init__(self, client: 'Client', interval: float):
+        self.client = client
+        self.interval = interval
+        # A heartbeat which failed is not worth waiting for, the next one replaces it
+        self.sender = Client(client.ctx, functools.partial(LocalHTTPClient, retries=0))
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='agnostic-heartbeat', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self.sender.http.close()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            if not self.client.is_test_run_active:
+                continue
+            events_sent = getattr(self.client.http, 'events_sent', 0.0)
+            if time.monotonic() - events_sent < self.interval:
+                continue
+            try:
+                self.sender.test_run_heartbeat()
+            except Exception as e:  # noqa
+                logger.warning('Agnostic failed to send heartbeat: %s', e)
 
 
 class Client:
@@ -219,6 +742,18 @@ class Client:
     def __init__(self, ctx: Context, http_client: type = LocalHTTPClient):
         self.ctx = ctx
         self.http = http_client(self.ctx)
+        self.heartbeat: Heartbeat | None = None
+
+    def start_heartbeat(self, interval: float):
+        """Sends heartbeats of the active test run every `interval` seconds until `stop_heartbeat`"""
+        if not self.heartbeat:
+            self.heartbeat = Heartbeat(self, interval)
+            self.heartbeat.start()
+
+    def stop_heartbeat(self):
+        if self.heartbeat:
+            self.heartbeat.stop()
+            self.heartbeat = None
 
     def set_log_marker(self, name: str):
         self.ctx.log_marker = name
@@ -256,7 +791,7 @@ class Client:
             self.ctx.test_run_id = uuid4()
         else:
             test_run = self.http.get(f'{self.test_run_path}')
-            if test_run.ok:
+            if test_run is not None and test_run.ok:
                 return self.ctx.test_run_id
         data = schemas.TestRun(
             id=self.ctx.test_run_id,
@@ -287,12 +822,17 @@ class Client:
         )
         self.http.post(f'{self.test_run_path}/property', data.model_dump_json(exclude_unset=True))
 
+    def set_test_run_properties(self, properties: dict[str, str | float | dict]):
+        data = ','.join(schemas.KeyValue(key=key, value=value).model_dump_json() for key, value in properties.items())
+        self.http.post(f'{self.test_run_path}/properties', f'[{data}]')
+
     def start_test(self, name: str, path: str, description: str = None):
         self.ctx.test_id = uuid4()
         self.ctx.test_start = datetime.datetime.utcnow()
         data = schemas.Test(
             id=self.ctx.test_id,
             test_run_id=self.ctx.test_run_id,
+            start=self.ctx.test_start,
             **locals()
         )
         self.http.post(f'{self.test_run_path}/tests', data.model_dump_json(exclude_unset=True))
@@ -306,6 +846,7 @@ class Client:
         data = schemas.Test(
             id=test_id,
             test_run_id=self.ctx.test_run_id,
+            finish=self.ctx.test_finish,
             **locals()
         )
         self.http.post(f'{self.get_test_path(test_id)}/finish', data.model_dump_json(exclude_unset=True))
@@ -313,7 +854,9 @@ class Client:
     def add_test_metric(self, name: str, value: Decimal | float, description: str = None, test_id: UUID | None = None):
         test_id = test_id or self.ctx.test_id
         data = schemas.MetricCreate(
+            id=uuid4(),
             test_run_id=self.ctx.test_run_id,
+            timestamp=datetime.datetime.utcnow(),
             name=name,
             value=value,
             description=description
@@ -322,8 +865,10 @@ class Client:
 
     def add_test_run_metric(self, name: str, value: Decimal | float, description: str = None):
         data = schemas.MetricCreate(
+            id=uuid4(),
             test_id=self.ctx.test_id,
             test_run_id=self.ctx.test_run_id,
+            timestamp=datetime.datetime.utcnow(),
             name=name,
             value=value,
             description=description
@@ -374,6 +919,7 @@ class Client:
     ):
         test_id = test_id or self.ctx.test_id
         data = schemas.RequestCreate(
+            id=uuid4(),
             test_run_id=self.ctx.test_run_id,
             test_id=test_id,
             timestamp=timestamp if timestamp else datetime.datetime.utcnow(),
@@ -394,7 +940,9 @@ class Client:
 
     def add_metric_over_time(self, name: str, values: dict, test_id: UUID | None = None):
         data = schemas.MetricOverTimeCreate(
+            id=uuid4(),
             test_run_id=self.ctx.test_run_id,
+            timestamp=datetime.datetime.utcnow(),
             test_id=test_id or self.ctx.test_id,
             name=name,
             values=values
@@ -406,6 +954,7 @@ class Client:
         data = schemas.Progress(
             id=uuid.uuid4(),
             test_run_id=self.ctx.test_run_id,
+            timestamp=datetime.datetime.utcnow(),
             test_id=test_id or self.ctx.test_id,
             level=level,
             message=message,
@@ -436,7 +985,9 @@ class Client:
                 raise RuntimeError('Name and MIME type have to be specified for a file buffer')
             content = attachment
 
-        self.http.post_files(f'{base_url}/attachments', files={'attachment': (name, content, mime_type)})
+        # Identified by the client, so that an attachment sent again is not stored twice
+        self.http.post_files(f'{base_url}/attachments?id={uuid4()}&timestamp={datetime.datetime.utcnow().isoformat()}',
+                             files={'attachment': (name, content, mime_type)})
 
     def add_test_run_attachment(self, attachment: str | IO,
                                 name: str | None = None, mime_type: str | None = None):
@@ -28,7 +28,12 @@ class StringValue(BaseModel):
 
 class Paginator(Base):
     data: list[Base]
-    count: int
-    pages: int
+    # Not set when the count was not requested
+    count: int | None = None
+    pages: int | None = None
+    # Count and pages come from the query plan estimate rather than an exact count
+    count_estimated: bool | None = None
     page: int
     page_size: int
+    # Cursor of the page following this one, None on the last page
+    next_cursor: str | None = None
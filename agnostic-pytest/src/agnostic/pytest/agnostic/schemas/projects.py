@@ -1,13 +1,31 @@
-__all__ = ['Project', 'ProjectUpdate', 'ProjectCreate']
+__all__ = ['Project', 'ProjectUpdate', 'ProjectCreate', 'ProjectConfig', 'RetentionPolicy']
 import uuid
 
+from pydantic import ConfigDict, Field
+
 from .base import Base
 
 
+class RetentionPolicy(Base):
+    # Test runs are purged once any limit is exceeded, runs kept forever never are
+    # Days since the start of a test run
+    days: int | None = Field(None, ge=1)
+    # Latest test runs kept per SUT branch
+    runs_per_branch: int | None = Field(None, ge=1)
+    # Bytes of attachments and logs of all test runs, the oldest runs are purged first
+    max_size: int | None = Field(None, ge=1)
+
+
+class ProjectConfig(Base):
+    model_config = ConfigDict(extra='allow')
+
+    retention: RetentionPolicy | None = None
+
+
 class ProjectUpdate(Base):
     id: uuid.UUID | None = None
     name: str | None = None
-    config: dict | None = None
+    config: ProjectConfig | None = None
 
 
 class ProjectCreate(ProjectUpdate):
@@ -28,6 +28,12 @@ class TestRunsStatistics(Base):
     execution_time: datetime.timedelta | None = None
     tests_executed: int | None = None
     tests_failed: int | None = None
+    tests_passed: int | None = None
+    tests_skipped: int | None = None
+    tests_xpassed: int | None = None
+    tests_xfailed: int | None = None
+    tests_unknown: int | None = None
+    tests_duration: datetime.timedelta | None = None
     properties: dict | None = None
 
 
@@ -0,0 +1,190 @@
+"""Uploads spool files written with --agnostic_spool to Agnostic Report
+
+    agnostic-replay --agnostic_url http://<agnostic_url>/api/v1 agnostic.spool
+
+Test runs, tests, logs and attachments are sent in the order they were spooled, the rest of the events
+go through the events endpoint in batches sent concurrently, and test runs are finished last. Records
+which already exist are skipped by the server, so a spool may be replayed again after a failure.
+"""
+import argparse
+import json
+import logging
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+import requests
+
+from agnostic.pytest.agnostic.client import as_event, decode_files
+
+logger = logging.getLogger(__name__)
+
+FINISH_PATH = re.compile(r'/test-runs/[^/]+/finish')
+HEARTBEAT_PATH = re.compile(r'/test-runs/[^/]+/heartbeat')
+LOG_BODY_PATH = re.compile(r'(?P<logs>/test-runs/[^/]+(?:/tests/[^/]+)?/logs)/(?P<id>[^/]+)/body')
+
+
+def fold_log_bodies(items: list[dict]) -> list[dict]:
+    """Appends to logs created in the same spool are sent as part of their body
+
+    Appending is not idempotent, while a log with its whole body is only created once however many times
+    the spool is replayed.
+    """
+    logs, folded = {}, []
+    for item in items:
+        match = LOG_BODY_PATH.fullmatch(item['path']) if item['method'] == 'patch' else None
+        if match and (item['project_id'], match['id']) in logs:
+            log = logs[item['project_id'], match['id']]
+            data = json.loads(log['data'])
+            data['body'] = (data.get('body') or '') + json.loads(item['data'])['value']
+            log['data'] = json.dumps(data)
+            continue
+        if item['method'] == 'post' and item['path'].endswith('/logs'):
+            log = dict(item)
+            logs[item['project_id'], json.loads(item['data'])['id']] = log
+            item = log
+        folded.append(item)
+    return folded
+
+
+class Replay:
+
+    def __init__(self, url: str, batch_size: int = 1000, concurrency: int = 8):
+        self.url = url.rstrip('/')
+        self.batch_size = max(batch_size, 1)
+        self.concurrency = max(concurrency, 1)
+        self.sent = 0
+        self.failed = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _count(self, sent: int = 0, failed: int = 0):
+        with self._lock:
+            self.sent += sent
+            self.failed += failed
+
+    def send(self, item: dict):
+        url = f'{self.url}/projects/{item["project_id"]}{item["path"]}'
+        try:
+            if item['method'] == 'post_files':
+                result = self.session.post(url, files=decode_files(item['files']))
+            else:
+                result = self.session.request(item['method'], url, data=item['data'],
+                                              headers={'Content-Type': 'application/json'})
+        except requests.RequestException as e:
+            logger.warning('Failed to replay %s %s: %s', item['method'].upper(), item['path'], e)
+            self._count(failed=1)
+            return
+        # Conflicts are records sent by an earlier replay
+        if result.ok or result.status_code == requests.codes.conflict:
+            self._count(sent=1)
+        else:
+            logger.warning('Failed to replay %s %s: %s %s', item['method'].upper(), item['path'],
+                           result.status_code, result.text)
+            self._count(failed=1)
+
+    def send_events(self, project_id: str, test_run_id: str, events: list[dict]):
+        try:
+            result = self.session.post(
+                f'{self.url}/projects/{project_id}/test-runs/{test_run_id}/events',
+                data='\n'.join(json.dumps(event) for event in events),
+                headers={'Content-Type': 'application/x-ndjson'}
+            )
+            result.raise_for_status()
+        except requests.RequestException as e:
+            logger.warning('Failed to replay %s events of test run %s: %s', len(events), test_run_id, e)
+            self._count(failed=len(events))
+            return
+        errors = [error for error in result.json()['errors'] if error['status'] != 'duplicate']
+        for error in errors:
+            logger.warning('Rejected %s event: %s', events[error['index']]['type'], error['error'])
+        self._count(sent=len(events) - len(errors), failed=len(errors))
+
+    def batches(self, items: list[tuple[str, str, dict]]) -> Iterator[tuple[str, str, list[dict]]]:
+        """Consecutive events of the same test run in batches of up to `batch_size`"""
+        key, batch = None, []
+        for project_id, test_run_id, event in items:
+            if batch and (key != (project_id, test_run_id) or len(batch) >= self.batch_size):
+                yield *key, batch
+                batch = []
+            key = project_id, test_run_id
+            batch.append(event)
+        if batch:
+            yield *key, batch
+
+    def replay(self, items: list[dict]):
+        ordered, events, finishes = [], [], []
+        for item in fold_log_bodies(items):
+            event = as_event(item)
+            if event and event[1]['type'] != 'test':
+                events.append((item['project_id'], *event))
+            elif event:
+                ordered.append((item['project_id'], *event))
+            elif item['method'] == 'post' and FINISH_PATH.fullmatch(item['path']):
+                finishes.append(item)
+            elif item['method'] == 'post' and HEARTBEAT_PATH.fullmatch(item['path']):
+                # A replayed test run is not alive, whatever its heartbeats say
+                continue
+            else:
+                ordered.append(item)
+
+        # Tests have to exist before their finish and test runs before anything else of theirs
+        test_events = []
+        for item in ordered:
+            if isinstance(item, tuple):
+                test_events.append(item)
+                continue
+            for batch in self.batches(test_events):
+                self.send_events(*batch)
+            test_events = []
+            self.send(item)
+        for batch in self.batches(test_events):
+            self.send_events(*batch)
+
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            for future in [executor.submit(self.send_events, *batch) for batch in self.batches(events)]:
+                future.result()
+
+        for item in finishes:
+            self.send(item)
+
+
+def read_spool(path: str) -> list[dict]:
+    items = []
+    with open(path, 'rb') as file:
+        for number, line in enumerate(file, 1):
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                # The last line is cut short when the process writing the spool was killed
+                logger.warning('Skipped invalid line %s of %s', number, path)
+    return items
+
+
+def main(args: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--agnostic_url', required=True, help='Agnostic URL')
+    parser.add_argument('--batch_size', type=int, default=1000, help='Max number of events sent in one request')
+    parser.add_argument('--concurrency', type=int, default=8, help='Number of event requests sent at once')
+    parser.add_argument('spool', nargs='+', help='Spool files')
+    options = parser.parse_args(args)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+
+    replay = Replay(options.agnostic_url, options.batch_size, options.concurrency)
+    for path in options.spool:
+        replay.replay(read_spool(path))
+        logger.info('Replayed %s', path)
+    logger.info('Sent %s records, %s failed', replay.sent, replay.failed)
+    return 1 if replay.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -35,6 +35,6 @@ setup(
         f'agnostic-core @ file://{os.path.join(os.path.dirname(__file__), "..", "agnostic-core")}',
         'fastapi>=0.101.0,<0.200.0',
         'uvicorn[standard]>=0.20.0,<1.0',
-        'python-multipart>=0.0.5,<1.0'
+        'python-multipart>=0.0.13,<1.0'
     ]
 )
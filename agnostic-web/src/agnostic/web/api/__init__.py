@@ -7,8 +7,10 @@ from starlette import concurrency
 
 from agnostic.core import config
 from agnostic.core.migrations import upgrade
+from agnostic.core.notifications import listener
 from .routers import projects, test_runs, tests, logs, metrics, \
-    progress, requests, metrics_ot, attachments, reporting, system
+    progress, requests, metrics_ot, attachments, reporting, system, events
+from . import tasks
 from .utils import SPA, simplify_operation_ids
 
 base_dir = Path(__file__).parent
@@ -33,6 +35,7 @@ api.include_router(metrics_ot.router)
 api.include_router(progress.router)
 api.include_router(requests.router)
 api.include_router(attachments.router)
+api.include_router(events.router)
 api.include_router(reporting.router)
 api.include_router(system.router)
 
@@ -52,3 +55,10 @@ async def startup():
     log.info('Migrating Agnostic database')
     await concurrency.run_in_threadpool(upgrade.run)
     log.info('Agnostic database migration finished')
+    tasks.start()
+
+
+@app.on_event('shutdown')
+async def shutdown():
+    await tasks.stop()
+    await listener.close()
@@ -1,30 +1,129 @@
 import datetime
-import io
+from pathlib import Path
 from uuid import UUID
 
-from fastapi import Depends, APIRouter, HTTPException, Response, status, UploadFile, File
-from fastapi.responses import StreamingResponse
+import anyio
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
 
-from agnostic.core import schemas, dal
+from agnostic.core import config, schemas, dal
+from agnostic.core.storage import storage
+from ..utils.ranges import parse_range
+from ..utils.uploads import UPLOAD_BODY, MultipartUpload
 
 router = APIRouter(tags=['Attachments'])
 
+READ_SIZE = 64 * 1024
+CACHE_MAX_AGE = 365 * 24 * 60 * 60
 
-@router.post('/projects/{project_id}/test-runs/{test_run_id}/attachments', status_code=status.HTTP_201_CREATED)
-async def create_test_run_attachment(project_id: UUID, test_run_id: UUID, response: Response,
-                                     attachment: UploadFile = File(...),
+
+async def get_upload_limit(attachments: dal.Attachments, test_run_id: UUID) -> int | None:
+    limits = []
+    if config.options.attachment_max_size is not None:
+        limits.append(config.options.attachment_max_size)
+    if config.options.attachment_max_run_size is not None:
+        used = await attachments.get_total_size(test_run_id)
+        limits.append(max(config.options.attachment_max_run_size - used, 0))
+    return min(limits) if limits else None
+
+
+async def create_attachment(attachments: dal.Attachments, record: schemas.AttachmentCreate) -> UUID:
+    try:
+        return await attachments.create(record)
+    except dal.DALException:
+        await attachments.session.rollback()
+        # Content is shared between attachments, only remove it if nothing else references it
+        await attachments.delete_content(record.sha256)
+        raise
+
+
+async def read_file(path: Path, start: int, end: int):
+    async with await anyio.open_file(path, 'rb') as file:
+        await file.seek(start)
+        while start < end:
+            chunk = await file.read(min(READ_SIZE, end - start))
+            if not chunk:
+                return
+            start += len(chunk)
+            yield chunk
+
+
+def is_not_modified(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return '*' in tags or etag in tags
+
+
+def attachment_response(attachment: schemas.Attachment, request: Request) -> Response:
+    path = None
+    if attachment.content is None:
+        path = storage.path(attachment.sha256) if attachment.sha256 else None
+        if not path:
+            raise HTTPException(
+                status.HTTP_404_NOT_FOUND,
+                f'Attachment {attachment.id} content does not exist'
+            )
+
+    headers = {
+        'Content-Disposition': f'attachment;filename={attachment.name}',
+        'Accept-Ranges': 'bytes'
+    }
+    etag = f'"{attachment.sha256}"' if attachment.sha256 else None
+    if etag:
+        # Content never changes under the same hash
+        headers['ETag'] = etag
+        headers['Cache-Control'] = f'max-age={CACHE_MAX_AGE}, immutable'
+        if is_not_modified(request.headers.get('if-none-match'), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    byte_range = None
+    if_range = request.headers.get('if-range')
+    if not if_range or if_range == etag:
+        byte_range = parse_range(request.headers.get('range'), attachment.size)
+
+    if not byte_range:
+        if path:
+            return FileResponse(path, media_type=attachment.mime_type, headers=headers)
+        return Response(attachment.content, media_type=attachment.mime_type, headers=headers)
+
+    start, end = byte_range
+    headers['Content-Range'] = f'bytes {start}-{end - 1}/{attachment.size}'
+    if path:
+        headers['Content-Length'] = f'{end - start}'
+        return StreamingResponse(
+            read_file(path, start, end),
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type=attachment.mime_type,
+            headers=headers
+        )
+    return Response(
+        attachment.content[start:end],
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=attachment.mime_type,
+        headers=headers
+    )
+
+
+@router.post('/projects/{project_id}/test-runs/{test_run_id}/attachments', status_code=status.HTTP_201_CREATED,
+             openapi_extra=UPLOAD_BODY)
+async def create_test_run_attachment(project_id: UUID, test_run_id: UUID, request: Request, response: Response,
+                                     id: UUID | None = Query(None), timestamp: datetime.datetime | None = Query(None),
                                      attachments: dal.Attachments = Depends(dal.get_attachments)):
-    content = await attachment.read()
+    attachment = MultipartUpload(request, limit=await get_upload_limit(attachments, test_run_id))
+    stored = await storage.save(attachment.read())
     record = schemas.AttachmentCreate(
+        id=id,
         test_run_id=test_run_id,
-        timestamp=datetime.datetime.utcnow(),
+        timestamp=timestamp or datetime.datetime.utcnow(),
         name=attachment.filename,
         mime_type=attachment.content_type,
-        size=len(content),
-        content=content
+        size=stored.size,
+        sha256=stored.sha256,
+        content=stored.content
     )
     try:
-        attachment_id = await attachments.create(record)
+        attachment_id = await create_attachment(attachments, record)
         response.headers.append(
             'Location',
             f'/projects/{project_id}/test-runs/{test_run_id}/attachments/{attachment_id}'
@@ -39,25 +138,35 @@ async def create_test_run_attachment(project_id: UUID, test_run_id: UUID, respon
             status.HTTP_404_NOT_FOUND,
             str(e)
         )
+    except dal.UnavailableError as e:
+        raise HTTPException(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            str(e),
+            headers={'Retry-After': '1'}
+        )
 
 
 @router.post('/projects/{project_id}/test-runs/{test_run_id}/tests/{test_id}/attachments',
-             status_code=status.HTTP_201_CREATED)
+             status_code=status.HTTP_201_CREATED, openapi_extra=UPLOAD_BODY)
 async def create_test_attachment(project_id: UUID, test_run_id: UUID, test_id: UUID,
-                                 response: Response, attachment: UploadFile = File(...),
+                                 request: Request, response: Response,
+                                 id: UUID | None = Query(None), timestamp: datetime.datetime | None = Query(None),
                                  attachments: dal.Attachments = Depends(dal.get_attachments)):
-    content = await attachment.read()
+    attachment = MultipartUpload(request, limit=await get_upload_limit(attachments, test_run_id))
+    stored = await storage.save(attachment.read())
     record = schemas.AttachmentCreate(
+        id=id,
         test_run_id=test_run_id,
         test_id=test_id,
-        timestamp=datetime.datetime.utcnow(),
+        timestamp=timestamp or datetime.datetime.utcnow(),
         name=attachment.filename,
         mime_type=attachment.content_type,
-        size=len(content),
-        content=content
+        size=stored.size,
+        sha256=stored.sha256,
+        content=stored.content
     )
     try:
-        attachment_id = await attachments.create(record)
+        attachment_id = await create_attachment(attachments, record)
         response.headers.append(
             'Location',
             f'/projects/{project_id}/test-runs/{test_run_id}/tests/{test_id}/attachments/{attachment_id}'
@@ -72,26 +181,20 @@ async def create_test_attachment(project_id: UUID, test_run_id: UUID, test_id: U
             status.HTTP_404_NOT_FOUND,
             str(e)
         )
-
-
-def stream_response(content):
-    c = io.BytesIO(content)
-    yield from c
+    except dal.UnavailableError as e:
+        raise HTTPException(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            str(e),
+            headers={'Retry-After': '1'}
+        )
 
 
 @router.get('/projects/{project_id}/test-runs/{test_run_id}/attachments/{attachment_id}')
-async def get_test_run_attachment(project_id: UUID, test_run_id: UUID, attachment_id: UUID,
+async def get_test_run_attachment(project_id: UUID, test_run_id: UUID, attachment_id: UUID, request: Request,
                                   attachments: dal.Attachments = Depends(dal.get_attachments)):
     try:
         attachment = await attachments.get(attachment_id)
-        return StreamingResponse(
-            stream_response(attachment.content),
-            media_type=attachment.mime_type,
-            headers={
-                'Content-Disposition': f'attachment;filename={attachment.name}',
-                'Content-Length': f'{attachment.size}'
-            }
-        )
+        return attachment_response(attachment, request)
     except dal.NotFoundError as e:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
@@ -101,17 +204,10 @@ async def get_test_run_attachment(project_id: UUID, test_run_id: UUID, attachmen
 
 @router.get('/projects/{project_id}/test-runs/{test_run_id}/tests/{test_id}/attachments/{attachment_id}')
 async def get_test_attachment(project_id: UUID, test_run_id: UUID, test_id: UUID, attachment_id: UUID,
-                              attachments: dal.Attachments = Depends(dal.get_attachments)):
+                              request: Request, attachments: dal.Attachments = Depends(dal.get_attachments)):
     try:
         attachment = await attachments.get(attachment_id)
-        return StreamingResponse(
-            stream_response(attachment.content),
-            media_type=attachment.mime_type,
-            headers={
-                'Content-Disposition': f'attachment;filename={attachment.name}',
-                'Content-Length': f'{attachment.size}'
-            }
-        )
+        return attachment_response(attachment, request)
     except dal.NotFoundError as e:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
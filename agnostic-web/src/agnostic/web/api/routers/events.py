@@ -0,0 +1,97 @@
+from typing import AsyncIterator
+from uuid import UUID
+
+import orjson
+from fastapi import Depends, APIRouter, HTTPException, Request, status
+from pydantic import ValidationError
+
+from agnostic.core import schemas, dal
+from ..utils.batch import format_validation_error, item_result, is_accepted
+from ..utils.heartbeats import record_heartbeat
+
+router = APIRouter(tags=['Events'])
+
+EVENT_SCHEMAS = {
+    schemas.EventType.TEST: schemas.Test,
+    schemas.EventType.PROGRESS: schemas.ProgressCreate,
+    schemas.EventType.METRIC: schemas.MetricCreate,
+    schemas.EventType.METRIC_OT: schemas.MetricOverTimeCreate,
+    schemas.EventType.REQUEST: schemas.RequestCreate,
+}
+
+# Number of events buffered before they are written to the database
+FLUSH_SIZE = 1000
+
+
+async def read_lines(request: Request) -> AsyncIterator[bytes]:
+    tail = b''
+    async for chunk in request.stream():
+        lines = chunk.split(b'\n')
+        lines[0] = tail + lines[0]
+        tail = lines.pop()
+        for line in lines:
+            yield line
+    yield tail
+
+
+@router.post('/projects/{project_id}/test-runs/{test_run_id}/events', response_model=schemas.EventsResult)
+async def ingest_events(request: Request, project_id: UUID, test_run_id: UUID,
+                        events: dal.Events = Depends(dal.get_events)):
+    """Accepts newline-delimited JSON events, e.g. {"type": "progress", "data": {"level": "INFO", "message": "..."}}"""
+    accepted, errors, batch, batch_size = 0, [], {}, 0
+
+    async def flush():
+        nonlocal accepted
+        try:
+            statuses = await events.write({
+                event_type: [record for _, record in items] for event_type, items in batch.items()
+            })
+        except dal.ForeignKeyError as e:
+            raise HTTPException(
+                status.HTTP_404_NOT_FOUND,
+                str(e)
+            )
+        except dal.InvalidArgumentsError as e:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                str(e)
+            )
+        for event_type, items in batch.items():
+            for (index, record), item_status in zip(items, statuses[event_type]):
+                if is_accepted(item_status):
+                    accepted += 1
+                else:
+                    errors.append(item_result(index, record.id, item_status))
+        batch.clear()
+
+    index = -1
+    async for line in read_lines(request):
+        index += 1
+        if not line.strip():
+            continue
+        try:
+            event = schemas.Event.model_validate(orjson.loads(line))
+            record = EVENT_SCHEMAS[event.type].model_validate(event.data)
+            record.test_run_id = test_run_id
+        except orjson.JSONDecodeError as e:
+            errors.append(item_result(index, None, schemas.BatchItemStatus.INVALID, f'Invalid JSON: {e}'))
+            continue
+        except ValidationError as e:
+            errors.append(item_result(index, None, schemas.BatchItemStatus.INVALID, format_validation_error(e)))
+            continue
+
+        batch.setdefault(event.type, []).append((index, record))
+        batch_size += 1
+        if batch_size >= FLUSH_SIZE:
+            await flush()
+            batch_size = 0
+
+    if batch:
+        await flush()
+
+    if accepted:
+        # Clients sending events skip their own heartbeats meanwhile
+        await record_heartbeat(dal.TestRuns(events.session), test_run_id)
+
+    errors.sort(key=lambda error: error.index)
+    return schemas.EventsResult(accepted=accepted, rejected=len(errors), errors=errors)
@@ -1,10 +1,13 @@
-import io
+import asyncio
 from uuid import UUID
 
-from fastapi import Depends, APIRouter, HTTPException, Response, status, Query
+from fastapi import Depends, APIRouter, Header, HTTPException, Response, status, Query
 from fastapi.responses import StreamingResponse
 
 from agnostic.core import schemas, dal
+from agnostic.core.notifications import LOGS, listener
+from ..utils import sse
+from ..utils.ranges import parse_range
 
 router = APIRouter(tags=['Logs'])
 
@@ -90,31 +93,98 @@ async def get_test_run_log(project_id: UUID, test_run_id: UUID, log_id: UUID,
         )
 
 
-def stream_response(content):
-    c = io.BytesIO(content.encode('utf-8'))
-    yield from c
-
-
 @router.get('/projects/{project_id}/test-runs/{test_run_id}/logs/{log_id}/download')
 async def download_test_run_log(project_id: UUID, test_run_id: UUID, log_id: UUID,
+                                range_header: str | None = Header(None, alias='Range'),
                                 logs: dal.Logs = Depends(dal.get_logs)):
     try:
-        log = await logs.get(log_id)
-        # TODO: Fix and re-enable context size header
-        return StreamingResponse(
-            stream_response(log.body),
-            media_type='text/plain',
-            headers={
-                'Content-Disposition': f'attachment;filename={log.name}-{log.start.isoformat(timespec="seconds")}.log',
-                # 'Content-Length': f'{len(log.body)}'
-            }
+        log = await logs.get(log_id, body=False)
+        size = await logs.get_size(log_id)
+    except dal.NotFoundError as e:
+        raise HTTPException(
+            status.HTTP_404_NOT_FOUND,
+            str(e)
         )
+
+    headers = {
+        'Content-Disposition': f'attachment;filename={log.name}-{log.start.isoformat(timespec="seconds")}.log',
+        'Accept-Ranges': 'bytes',
+        'Content-Length': f'{size}'
+    }
+    byte_range = parse_range(range_header, size)
+    if not byte_range:
+        # Chunks appended meanwhile are left out, the response is as long as announced
+        return StreamingResponse(logs.iter_body(log_id, 0, size), media_type='text/plain', headers=headers)
+
+    start, end = byte_range
+    headers['Content-Length'] = f'{end - start}'
+    headers['Content-Range'] = f'bytes {start}-{end - 1}/{size}'
+    return StreamingResponse(
+        logs.iter_body(log_id, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type='text/plain',
+        headers=headers
+    )
+
+
+async def follow_log(logs: dal.Logs, log_id: UUID, offset: int | None, last_event_id: str | None):
+    async with listener.subscribe(LOGS, log_id) as queue:
+        if last_event_id and last_event_id.isdigit():
+            seq = int(last_event_id)
+            while chunks := await logs.get_chunks(log_id, seq):
+                for seq, text in chunks:
+                    yield sse.format_event(text, seq)
+        else:
+            seq = await logs.get_last_seq(log_id)
+            if offset is not None:
+                yield sse.format_event(await logs.get_body(log_id, offset, seq=seq), seq)
+        # Do not hold a pooled connection while waiting for notifications
+        await logs.session.close()
+
+        while True:
+            try:
+                payload = await asyncio.wait_for(queue.get(), sse.HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield sse.HEARTBEAT
+                continue
+
+            if payload is None:
+                return
+            if payload['seq'] <= seq:
+                continue
+            if 'text' in payload:
+                seq = payload['seq']
+                yield sse.format_event(payload['text'], seq)
+            else:
+                while chunks := await logs.get_chunks(log_id, seq):
+                    for seq, text in chunks:
+                        yield sse.format_event(text, seq)
+                await logs.session.close()
+
+
+@router.get('/projects/{project_id}/test-runs/{test_run_id}/logs/{log_id}/follow')
+async def follow_test_run_log(
+        project_id: UUID,
+        test_run_id: UUID,
+        log_id: UUID,
+        offset: int | None = Query(None),
+        last_event_id: str | None = Header(None, alias='Last-Event-ID'),
+        logs: dal.Logs = Depends(dal.get_logs)
+):
+    try:
+        await logs.get_last_seq(log_id)
     except dal.NotFoundError as e:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
             str(e)
         )
 
+    return StreamingResponse(
+        follow_log(logs, log_id, offset, last_event_id),
+        media_type='text/event-stream',
+        headers=sse.HEADERS
+    )
+
 
 @router.get('/projects/{project_id}/test-runs/{test_run_id}/logs/{log_id}/body')
 async def get_test_run_log_body(
@@ -3,6 +3,7 @@ from uuid import UUID
 from fastapi import Depends, APIRouter, HTTPException, Response, status
 
 from agnostic.core import schemas, dal
+from ..utils.batch import ingest_batch
 
 router = APIRouter(tags=['Metrics'])
 
@@ -26,6 +27,12 @@ async def create_test_run_metric(metric: schemas.MetricCreate, project_id: UUID,
         )
 
 
+@router.post('/projects/{project_id}/test-runs/{test_run_id}/metrics:batch', response_model=schemas.BatchResult)
+async def create_test_run_metrics(items: list[dict], project_id: UUID, test_run_id: UUID,
+                                 metrics: dal.Metrics = Depends(dal.get_metrics)):
+    return await ingest_batch(items, schemas.MetricCreate, metrics.create_many, test_run_id=test_run_id)
+
+
 @router.put('/projects/{project_id}/test-runs/{test_run_id}/metrics/{metric_id}')
 async def update_test_run_metric(metric: schemas.Metric, project_id: UUID, test_run_id: UUID, metric_id: UUID,
                                  response: Response, metrics: dal.Metrics = Depends(dal.get_metrics)):
@@ -3,6 +3,7 @@ from uuid import UUID
 from fastapi import Depends, APIRouter, HTTPException, Response, status
 
 from agnostic.core import schemas, dal
+from ..utils.batch import ingest_batch
 
 router = APIRouter(tags=['Metrics Over Time'])
 
@@ -30,6 +31,12 @@ async def create_test_run_metric_over_time(
         )
 
 
+@router.post('/projects/{project_id}/test-runs/{test_run_id}/metrics-ot:batch', response_model=schemas.BatchResult)
+async def create_test_run_metrics_ot(items: list[dict], project_id: UUID, test_run_id: UUID,
+                                    metrics: dal.MetricsOverTime = Depends(dal.get_metrics_ot)):
+    return await ingest_batch(items, schemas.MetricOverTimeCreate, metrics.create_many, test_run_id=test_run_id)
+
+
 @router.put('/projects/{project_id}/test-runs/{test_run_id}/metrics-ot/{metric_id}')
 async def update_test_run_metric_over_time(
         metric: schemas.MetricOverTime | schemas.MetricOverTimeCreate,
@@ -3,6 +3,7 @@ from uuid import UUID
 from fastapi import Depends, APIRouter, HTTPException, Response, status
 
 from agnostic.core import schemas, dal
+from ..utils.batch import ingest_batch
 
 router = APIRouter(tags=['Progress'])
 
@@ -26,6 +27,12 @@ async def create_progress_record(progress: schemas.ProgressCreate, project_id: U
         )
 
 
+@router.post('/projects/{project_id}/test-runs/{test_run_id}/progress:batch', response_model=schemas.BatchResult)
+async def create_progress_records(items: list[dict], project_id: UUID, test_run_id: UUID,
+                                 progresses: dal.Progress = Depends(dal.get_progress)):
+    return await ingest_batch(items, schemas.ProgressCreate, progresses.create_many, test_run_id=test_run_id)
+
+
 @router.put('/projects/{project_id}/test-runs/{test_run_id}/progress/{record_id}')
 async def update_progress_record(progress: schemas.Progress, project_id: UUID, test_run_id: UUID, record_id: UUID,
                                  response: Response, progresses: dal.Progress = Depends(dal.get_progress)):
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from fastapi import Depends, APIRouter, Query
+from fastapi import Depends, APIRouter, HTTPException, Query, status
 
 from agnostic.core import dal
 from agnostic.core.schemas import reporting as rs
@@ -35,19 +35,28 @@ async def get_project_test_runs_report(
     variant: list[str] | None = Query(None),
     interval: str | None = Query(None),
     test_run_id: UUID | None = Query(None),
+    cursor: str | None = Query(None),
+    count: bool = Query(True),
+    estimate_count: bool = Query(False),
 ):
-    return await reporting.get_test_runs(
-        project_id,
-        order_by,
-        order,
-        page,
-        page_size,
-        sut_branch,
-        test_branch,
-        variant,
-        interval,
-        test_run_id,
-    )
+    try:
+        return await reporting.get_test_runs(
+            project_id,
+            order_by,
+            order,
+            page,
+            page_size,
+            sut_branch,
+            test_branch,
+            variant,
+            interval,
+            test_run_id,
+            cursor,
+            count,
+            estimate_count,
+        )
+    except dal.InvalidArgumentsError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
 
 
 @router.get("/projects/{project_id}/tests-over-time", response_model=rs.TestsOverTime)
@@ -127,11 +136,17 @@ async def get_test_run_tests_report(
     order: str = Query("asc", regex="^asc|desc$"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1),
+    cursor: str | None = Query(None),
+    count: bool = Query(True),
+    estimate_count: bool = Query(False),
     reporting: dal.Reporting = Depends(dal.get_reporting),
 ):
-    return await reporting.get_tests(
-        project_id, test_run_id, result, search, order, order_by, page, page_size
-    )
+    try:
+        return await reporting.get_tests(
+            project_id, test_run_id, result, search, order, order_by, page, page_size, cursor, count, estimate_count
+        )
+    except dal.InvalidArgumentsError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
 
 
 @router.get(
@@ -145,11 +160,17 @@ async def get_test_run_metrics_list_report(
     order: str = Query("asc", regex="^asc|desc$"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1),
+    cursor: str | None = Query(None),
+    count: bool = Query(True),
+    estimate_count: bool = Query(False),
     reporting: dal.Reporting = Depends(dal.get_reporting),
 ):
-    return await reporting.get_test_run_metrics_list(
-        project_id, test_run_id, order, order_by, page, page_size
-    )
+    try:
+        return await reporting.get_test_run_metrics_list(
+            project_id, test_run_id, order, order_by, page, page_size, cursor, count, estimate_count
+        )
+    except dal.InvalidArgumentsError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
 
 
 @router.get(
@@ -165,11 +186,17 @@ async def get_test_run_progress(
     order: str = Query("desc", regex="^asc|desc$"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1),
+    cursor: str | None = Query(None),
+    count: bool = Query(True),
+    estimate_count: bool = Query(False),
     reporting: dal.Reporting = Depends(dal.get_reporting),
 ):
-    return await reporting.get_test_run_progress(
-        project_id, test_run_id, result, search, order, order_by, page, page_size
-    )
+    try:
+        return await reporting.get_test_run_progress(
+            project_id, test_run_id, result, search, order, order_by, page, page_size, cursor, count, estimate_count
+        )
+    except dal.InvalidArgumentsError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
 
 
 @router.get(
@@ -183,11 +210,17 @@ async def get_test_run_metrics_list(
     order: str = Query("asc", regex="^asc|desc$"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1),
+    cursor: str | None = Query(None),
+    count: bool = Query(True),
+    estimate_count: bool = Query(False),
     reporting: dal.Reporting = Depends(dal.get_reporting),
 ):
-    return await reporting.get_test_run_logs(
-        project_id, test_run_id, order, order_by, page, page_size
-    )
+    try:
+        return await reporting.get_test_run_logs(
+            project_id, test_run_id, order, order_by, page, page_size, cursor, count, estimate_count
+        )
+    except dal.InvalidArgumentsError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
 
 
 @router.get(
@@ -3,10 +3,17 @@ from uuid import UUID
 from fastapi import Depends, APIRouter, HTTPException, Response, status
 
 from agnostic.core import schemas, dal
+from ..utils.batch import ingest_batch
 
 router = APIRouter(tags=['Requests'])
 
 
+@router.post('/projects/{project_id}/test-runs/{test_run_id}/requests:batch', response_model=schemas.BatchResult)
+async def create_requests(items: list[dict], project_id: UUID, test_run_id: UUID,
+                         requests: dal.Requests = Depends(dal.get_requests)):
+    return await ingest_batch(items, schemas.RequestCreate, requests.create_many, test_run_id=test_run_id)
+
+
 @router.post('/projects/{project_id}/test-runs/{test_run_id}/tests/{test_id}/requests',
              status_code=status.HTTP_201_CREATED)
 async def create_request(request: schemas.RequestCreate, project_id: UUID, test_run_id: UUID, test_id: UUID,
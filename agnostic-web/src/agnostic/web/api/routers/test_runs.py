@@ -1,9 +1,16 @@
+import asyncio
 import datetime
+import json
 from uuid import UUID
 
-from fastapi import Depends, APIRouter, HTTPException, Response, status
+from fastapi import Depends, APIRouter, Header, HTTPException, Response, status, Query
+from fastapi.responses import StreamingResponse
 
 from agnostic.core import schemas, dal
+from agnostic.core.heartbeats import heartbeats
+from agnostic.core.notifications import TEST_RUNS, listener
+from ..utils import sse
+from ..utils.heartbeats import record_heartbeat
 
 router = APIRouter(tags=['Test Runs'])
 
@@ -79,11 +86,11 @@ async def start_test_run(project_id: UUID, test_run_id: UUID,
 @router.post('/projects/{project_id}/test-runs/{test_run_id}/finish')
 async def finish_test_run(project_id: UUID, test_run_id: UUID,
                           test_run: schemas.TestRun, test_runs:dal. TestRuns = Depends(dal.get_test_runs)):
+    finished = schemas.TestRun(id=test_run_id, finish=test_run.finish or datetime.datetime.utcnow())
+    if heartbeat := heartbeats.finish(test_run_id):
+        finished.heartbeat = heartbeat
     try:
-        await test_runs.update(
-            schemas.TestRun(id=test_run_id, finish=test_run.finish or datetime.datetime.utcnow()),
-            exclude_unset=True
-        )
+        await test_runs.update(finished, exclude_unset=True)
     except dal.NotFoundError as e:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
@@ -95,10 +102,7 @@ async def finish_test_run(project_id: UUID, test_run_id: UUID,
 async def update_test_run_heartbeat(project_id: UUID, test_run_id: UUID,
                                     test_run: schemas.TestRun, test_runs: dal.TestRuns = Depends(dal.get_test_runs)):
     try:
-        await test_runs.update(
-            schemas.TestRun(id=test_run_id, heartbeat=test_run.heartbeat or datetime.datetime.utcnow()),
-            exclude_unset=True
-        )
+        await record_heartbeat(test_runs, test_run_id, test_run.heartbeat)
     except dal.NotFoundError as e:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
@@ -110,11 +114,7 @@ async def update_test_run_heartbeat(project_id: UUID, test_run_id: UUID,
 async def add_test_run_property(project_id: UUID, test_run_id: UUID,
                                 prop: schemas.KeyValue, test_runs: dal.TestRuns = Depends(dal.get_test_runs)):
     try:
-        test_run = await test_runs.get(test_run_id)
-        if not test_run.properties:
-            test_run.properties = {}
-        test_run.properties.update({prop.key: prop.value})
-        await test_runs.update(test_run)
+        await test_runs.set_properties(test_run_id, {prop.key: prop.value})
     except dal.NotFoundError as e:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
@@ -122,6 +122,83 @@ async def add_test_run_property(project_id: UUID, test_run_id: UUID,
         )
 
 
+@router.post('/projects/{project_id}/test-runs/{test_run_id}/properties')
+async def add_test_run_properties(project_id: UUID, test_run_id: UUID,
+                                  props: list[schemas.KeyValue], test_runs: dal.TestRuns = Depends(dal.get_test_runs)):
+    try:
+        await test_runs.set_properties(test_run_id, {prop.key: prop.value for prop in props})
+    except dal.NotFoundError as e:
+        raise HTTPException(
+            status.HTTP_404_NOT_FOUND,
+            str(e)
+        )
+
+
+async def follow_test_run(progresses: dal.Progress, test_run_id: UUID, cursor: int | None):
+    async with listener.subscribe(TEST_RUNS, test_run_id) as queue:
+        seq = cursor if cursor is not None else await progresses.get_last_seq(test_run_id)
+        while records := await progresses.get_after(test_run_id, seq):
+            for record in records:
+                seq = record.seq
+                yield sse.format_event(record.model_dump_json(), seq, 'progress')
+        # Do not hold a pooled connection while waiting for notifications
+        await progresses.session.close()
+
+        while True:
+            try:
+                payload = await asyncio.wait_for(queue.get(), sse.HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield sse.HEARTBEAT
+                continue
+
+            if payload is None:
+                return
+            # Payloads are shared between subscribers, do not modify them
+            event = payload['type']
+            data = {key: value for key, value in payload.items() if key not in ('key', 'type')}
+            if event != 'progress':
+                yield sse.format_event(json.dumps(data, separators=(',', ':')), event=event)
+            elif 'message' in data:
+                if data['seq'] > seq:
+                    seq = data['seq']
+                    yield sse.format_event(schemas.ProgressRecord.model_validate(data).model_dump_json(), seq, event)
+            else:
+                while records := await progresses.get_after(test_run_id, seq):
+                    for record in records:
+                        seq = record.seq
+                        yield sse.format_event(record.model_dump_json(), seq, event)
+                await progresses.session.close()
+
+
+@router.get('/projects/{project_id}/test-runs/{test_run_id}/feed')
+async def get_test_run_feed(
+        project_id: UUID,
+        test_run_id: UUID,
+        cursor: int | None = Query(None),
+        last_event_id: str | None = Header(None, alias='Last-Event-ID'),
+        test_runs: dal.TestRuns = Depends(dal.get_test_runs),
+        progresses: dal.Progress = Depends(dal.get_progress)
+):
+    try:
+        await test_runs.get(test_run_id)
+    except dal.NotFoundError as e:
+        raise HTTPException(
+            status.HTTP_404_NOT_FOUND,
+            str(e)
+        )
+    finally:
+        await test_runs.session.close()
+
+    if last_event_id and last_event_id.isdigit():
+        cursor = int(last_event_id)
+
+    return StreamingResponse(
+        follow_test_run(progresses, test_run_id, cursor),
+        media_type='text/event-stream',
+        headers=sse.HEADERS
+    )
+
+
 @router.get('/projects/{project_id}/test-runs/{test_run_id}', response_model=schemas.TestRun)
 async def get_test_run(project_id: UUID, test_run_id: UUID,
                        test_runs: dal.TestRuns = Depends(dal.get_test_runs)):
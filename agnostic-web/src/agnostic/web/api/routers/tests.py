@@ -4,6 +4,7 @@ from uuid import UUID
 from fastapi import Depends, APIRouter, HTTPException, Response, status
 
 from agnostic.core import schemas, dal
+from ..utils.batch import ingest_batch
 
 router = APIRouter(tags=['Tests'])
 
@@ -27,6 +28,12 @@ async def create_test(test: schemas.Test, project_id: UUID, test_run_id: UUID,
         )
 
 
+@router.post('/projects/{project_id}/test-runs/{test_run_id}/tests:batch', response_model=schemas.BatchResult)
+async def upsert_tests(items: list[dict], project_id: UUID, test_run_id: UUID,
+                      tests: dal.Tests = Depends(dal.get_tests)):
+    return await ingest_batch(items, schemas.Test, tests.upsert_many, test_run_id=test_run_id)
+
+
 @router.put('/projects/{project_id}/test-runs/{test_run_id}/tests/{test_id}')
 async def update_test(test: schemas.Test, project_id: UUID, test_run_id: UUID, test_id: UUID,
                       response: Response, tests: dal.Tests = Depends(dal.get_tests)):
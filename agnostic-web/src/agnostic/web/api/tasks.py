@@ -0,0 +1,82 @@
+import asyncio
+import datetime
+import logging
+from typing import Awaitable, Callable
+
+from agnostic.core import config
+from agnostic.core.dal import Logs, Partitions, Retention, Rollups
+from agnostic.core.heartbeats import heartbeats
+from agnostic.core.session import async_session
+
+log = logging.getLogger(__name__)
+
+running: list[asyncio.Task] = []
+
+
+async def periodic(name: str, interval: int, job: Callable[[], Awaitable]):
+    while True:
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa
+            log.exception(f'Background task "{name}" failed')
+        await asyncio.sleep(interval)
+
+
+async def compact_logs():
+    async with async_session() as session:
+        logs = Logs(session)
+        while await logs.compact(config.options.log_chunk_size):
+            pass
+
+
+async def rollup_test_runs():
+    async with async_session() as session:
+        # Test runs alive since the previous rollup may have reported results to buckets rolled up meanwhile
+        await Rollups(session).refresh_closed(datetime.timedelta(seconds=2 * config.options.rollup_interval))
+
+
+async def create_partitions():
+    async with async_session() as session:
+        created = await Partitions(session).create_ahead(config.options.partition_months_ahead)
+        if created:
+            log.info(f'Created partitions {", ".join(created)}')
+
+
+async def purge_test_runs():
+    async with async_session() as session:
+        purged = await Retention(session).purge(config.options.retention_batch_size)
+        if purged.test_runs:
+            reclaimed = ', '.join(f'{table} {rows} rows/{purged.bytes[table]} bytes'
+                                  for table, rows in purged.rows.items() if rows)
+            log.info(f'Purged {purged.test_runs} test runs, reclaimed {reclaimed}')
+
+
+async def flush_heartbeats():
+    async with async_session() as session:
+        await heartbeats.flush(session)
+
+
+def start():
+    jobs = {
+        'compact-logs': (config.options.log_compaction_interval, compact_logs),
+        'rollup-test-runs': (config.options.rollup_interval, rollup_test_runs),
+        'create-partitions': (config.options.partition_interval, create_partitions),
+        'purge-test-runs': (config.options.retention_interval, purge_test_runs),
+        'flush-heartbeats': (config.options.heartbeat_flush_interval, flush_heartbeats),
+    }
+    for name, (interval, job) in jobs.items():
+        if interval:
+            running.append(asyncio.create_task(periodic(name, interval, job)))
+
+
+async def stop():
+    for task in running:
+        task.cancel()
+    await asyncio.gather(*running, return_exceptions=True)
+    running.clear()
+    try:
+        await flush_heartbeats()
+    except Exception:  # noqa
+        log.exception('Failed to write heartbeats')
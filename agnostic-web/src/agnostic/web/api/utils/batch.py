@@ -0,0 +1,65 @@
+from typing import Any, Awaitable, Callable
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+
+from agnostic.core import schemas, dal
+
+ERRORS = {
+    schemas.BatchItemStatus.DUPLICATE: 'Record {} already exists',
+    schemas.BatchItemStatus.NOT_FOUND: 'Record {} does not exist',
+}
+
+
+def format_validation_error(error: ValidationError) -> str:
+    return '; '.join(f'{".".join(str(loc) for loc in e["loc"])}: {e["msg"]}' for e in error.errors())
+
+
+def item_result(index: int, record_id: UUID | None, item_status: schemas.BatchItemStatus,
+                error: str | None = None) -> schemas.BatchItemResult:
+    if not error and item_status in ERRORS:
+        error = ERRORS[item_status].format(record_id)
+    return schemas.BatchItemResult(index=index, id=record_id, status=item_status, error=error)
+
+
+def is_accepted(item_status: schemas.BatchItemStatus) -> bool:
+    return item_status in (schemas.BatchItemStatus.CREATED, schemas.BatchItemStatus.UPDATED)
+
+
+async def ingest_batch(
+        items: list[dict[str, Any]],
+        schema: type[schemas.Base],
+        create_many: Callable[[list], Awaitable[list[schemas.BatchItemStatus]]],
+        **fields
+) -> schemas.BatchResult:
+    results, records, indexes = [None] * len(items), [], []
+    for index, item in enumerate(items):
+        try:
+            record = schema.model_validate(item)
+            for key, value in fields.items():
+                setattr(record, key, value)
+        except ValidationError as e:
+            results[index] = item_result(index, None, schemas.BatchItemStatus.INVALID, format_validation_error(e))
+            continue
+        records.append(record)
+        indexes.append(index)
+
+    try:
+        statuses = await create_many(records) if records else []
+    except dal.ForeignKeyError as e:
+        raise HTTPException(
+            status.HTTP_404_NOT_FOUND,
+            str(e)
+        )
+    except dal.InvalidArgumentsError as e:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            str(e)
+        )
+
+    for index, record, item_status in zip(indexes, records, statuses):
+        results[index] = item_result(index, record.id, item_status)
+
+    accepted = sum(is_accepted(result.status) for result in results)
+    return schemas.BatchResult(accepted=accepted, rejected=len(results) - accepted, items=results)
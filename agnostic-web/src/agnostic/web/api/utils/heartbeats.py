@@ -0,0 +1,15 @@
+import datetime
+from uuid import UUID
+
+from agnostic.core import config, schemas, dal
+from agnostic.core.heartbeats import heartbeats
+
+
+async def record_heartbeat(test_runs: dal.TestRuns, test_run_id: UUID, heartbeat: datetime.datetime | None = None):
+    """Caches the heartbeat of a test run, the first one is written through to tell whether the test run exists"""
+    heartbeat = heartbeat or datetime.datetime.utcnow()
+    if config.options.heartbeat_flush_interval and heartbeats.beat(test_run_id, heartbeat):
+        return
+    await test_runs.update(schemas.TestRun(id=test_run_id, heartbeat=heartbeat), exclude_unset=True)
+    if config.options.heartbeat_flush_interval:
+        heartbeats.written(test_run_id, heartbeat)
@@ -0,0 +1,37 @@
+import re
+
+from fastapi import HTTPException, status
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Parses a single byte range of the Range header into a (start, end) pair, end is exclusive
+
+    Returns None when the whole content has to be served: no header, a multipart range or an unknown unit.
+    """
+    if not header:
+        return None
+
+    match = RANGE.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last) + 1, size) if last else size
+    elif last:
+        start = max(size - int(last), 0)
+        end = size
+    else:
+        return None
+
+    if start >= size or start >= end:
+        raise HTTPException(
+            status.HTTP_416_RANGE_NOT_SATISFIABLE,
+            f'Range {header} is not satisfiable',
+            headers={'Content-Range': f'bytes */{size}'}
+        )
+
+    return start, end
@@ -0,0 +1,19 @@
+# Seconds without events after which a comment is sent to keep proxies from closing the stream
+HEARTBEAT_INTERVAL = 15
+
+HEARTBEAT = ': heartbeat\n\n'
+
+HEADERS = {
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no'
+}
+
+
+def format_event(data: str, event_id: int | str | None = None, event: str | None = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines.extend(f'data: {line}' for line in data.split('\n'))
+    return '\n'.join(lines) + '\n\n'
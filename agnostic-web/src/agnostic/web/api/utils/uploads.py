@@ -0,0 +1,115 @@
+from typing import AsyncIterator
+
+from fastapi import HTTPException, Request, status
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# Allowance for multipart boundaries and part headers when checking Content-Length against the limit
+OVERHEAD = 64 * 1024
+
+UPLOAD_BODY = {
+    'requestBody': {
+        'required': True,
+        'content': {
+            'multipart/form-data': {
+                'schema': {
+                    'type': 'object',
+                    'properties': {'attachment': {'type': 'string', 'format': 'binary'}},
+                    'required': ['attachment']
+                }
+            }
+        }
+    }
+}
+
+
+def too_large(limit: int) -> HTTPException:
+    return HTTPException(
+        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        f'Attachment exceeds the size limit of {limit} bytes'
+    )
+
+
+class MultipartUpload:
+    """Streams a file field of a multipart/form-data request without buffering it
+
+    `filename` and `content_type` are known once the first chunk is yielded.
+    """
+
+    def __init__(self, request: Request, field: str = 'attachment', limit: int | None = None):
+        self.request = request
+        self.field = field
+        self.limit = limit
+        self.filename: str | None = None
+        self.content_type: str | None = None
+        self.size = 0
+
+        self.chunks: list[bytes] = []
+        self.header_field = b''
+        self.header_value = b''
+        self.headers: dict[bytes, bytes] = {}
+        self.current = False
+        self.found = False
+
+    def on_part_begin(self):
+        self.headers = {}
+        self.current = False
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self.header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self.header_value += data[start:end]
+
+    def on_header_end(self):
+        self.headers[self.header_field.lower()] = self.header_value
+        self.header_field, self.header_value = b'', b''
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self.headers.get(b'content-disposition'))
+        if options.get(b'name', b'').decode() == self.field and b'filename' in options and not self.found:
+            self.current = self.found = True
+            self.filename = options[b'filename'].decode()
+            self.content_type = self.headers.get(b'content-type', b'application/octet-stream').decode()
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self.current:
+            self.size += end - start
+            if self.limit is not None and self.size > self.limit:
+                raise too_large(self.limit)
+            self.chunks.append(data[start:end])
+
+    def on_part_end(self):
+        self.current = False
+
+    def check_length(self):
+        length = self.request.headers.get('content-length')
+        if self.limit is not None and length and length.isdigit() and int(length) > self.limit + OVERHEAD:
+            raise too_large(self.limit)
+
+    async def read(self) -> AsyncIterator[bytes]:
+        content_type, options = parse_options_header(self.request.headers.get('content-type'))
+        if content_type != b'multipart/form-data' or b'boundary' not in options:
+            raise HTTPException(
+                status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                'Attachment has to be uploaded as multipart/form-data'
+            )
+        self.check_length()
+
+        parser = MultipartParser(options[b'boundary'], {
+            name: getattr(self, name) for name in (
+                'on_part_begin', 'on_header_field', 'on_header_value', 'on_header_end',
+                'on_headers_finished', 'on_part_data', 'on_part_end'
+            )
+        })
+        async for data in self.request.stream():
+            parser.write(data)
+            for chunk in self.chunks:
+                yield chunk
+            self.chunks.clear()
+        parser.finalize()
+
+        if not self.found:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                f'File field "{self.field}" is missing'
+            )
@@ -0,0 +1,125 @@
+"""Test details latency benchmark
+
+Seeds a database with test runs whose tests have logs, metrics, requests, attachments, progress and
+metrics over time, then measures `Reporting.get_test_details` latency for random tests.
+
+    export AGNOSTIC_DB_DATABASE=agnostic_bench
+    python test_details.py migrate [revision]
+    python test_details.py seed --runs 100 --tests 500
+    python test_details.py run --samples 200
+"""
+import argparse
+import asyncio
+import datetime
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+base_folder = Path(__file__).parent
+sys.path.insert(0, str(base_folder.parent.parent / 'agnostic-core' / 'src'))
+
+from alembic import command
+from sqlalchemy import select, text
+
+from agnostic.core import models
+from agnostic.core.dal import Reporting
+from agnostic.core.dal.bulk import copy_many
+from agnostic.core.migrations import upgrade
+from agnostic.core.session import async_session
+
+
+def migrate(revision: str):
+    command.upgrade(upgrade.alembic_config, revision)
+
+
+async def seed(runs: int, tests: int):
+    now = datetime.datetime.utcnow()
+    async with async_session() as session:
+        project_id = uuid.uuid4()
+        session.add(models.Project(id=project_id, name=f'Benchmark {project_id}'))
+        await session.commit()
+
+        for run in range(runs):
+            test_run_id = uuid.uuid4()
+            await copy_many(session, models.TestRun, [dict(id=test_run_id, project_id=project_id, start=now)])
+            test_ids = [uuid.uuid4() for _ in range(tests)]
+            await copy_many(session, models.Test, [
+                dict(id=test_id, test_run_id=test_run_id, start=now, finish=now, path=f'suite/module_{i % 20}',
+                     name=f'test_{i}', result=random.choice(('passed', 'failed', 'skipped')))
+                for i, test_id in enumerate(test_ids)
+            ])
+            common = [dict(test_run_id=test_run_id, test_id=test_id) for test_id in test_ids for _ in range(2)]
+            await copy_many(session, models.Log, [
+                dict(id=uuid.uuid4(), **c, name='log', start=now, body='line\n' * 20) for c in common
+            ])
+            await copy_many(session, models.Metric, [
+                dict(id=uuid.uuid4(), **c, timestamp=now, name='metric', value=random.random(), description='Value {}')
+                for c in common
+            ])
+            await copy_many(session, models.Request, [
+                dict(id=uuid.uuid4(), **c, timestamp=now, request_type='http', contents={'url': '/'}) for c in common
+            ])
+            await copy_many(session, models.Attachment, [
+                dict(id=uuid.uuid4(), **c, timestamp=now, name='a.txt', mime_type='text/plain', size=1,
+                     sha256='0' * 64) for c in common
+            ])
+            await copy_many(session, models.Progress, [
+                dict(id=uuid.uuid4(), **c, timestamp=now, level='INFO', message='message') for c in common
+            ])
+            await copy_many(session, models.MetricOverTime, [
+                dict(id=uuid.uuid4(), **c, timestamp=now, name='cpu', values={'cpu': 1}) for c in common
+            ])
+            await session.commit()
+            print(f'Seeded test run {run + 1}/{runs}', end='\r')
+
+        await session.execute(text('ANALYZE'))
+        await session.commit()
+    print()
+
+
+async def run(samples: int):
+    async with async_session() as session:
+        tests = (
+            await session.execute(
+                select(models.Test.id, models.Test.test_run_id, models.TestRun.project_id)
+                .join(models.TestRun, models.TestRun.id == models.Test.test_run_id)
+                .order_by(text('random()'))
+                .limit(samples)
+            )
+        ).all()
+        reporting = Reporting(session)
+        timings = []
+        for test_id, test_run_id, project_id in tests:
+            started = time.perf_counter()
+            await reporting.get_test_details(project_id, test_run_id, test_id)
+            timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    print(f'get_test_details over {len(timings)} tests: '
+          f'mean {statistics.mean(timings):.2f}ms, '
+          f'p50 {timings[len(timings) // 2]:.2f}ms, '
+          f'p95 {timings[int(len(timings) * 0.95)]:.2f}ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    migrate_parser = commands.add_parser('migrate')
+    migrate_parser.add_argument('revision', nargs='?', default='head')
+    seed_parser = commands.add_parser('seed')
+    seed_parser.add_argument('--runs', type=int, default=100)
+    seed_parser.add_argument('--tests', type=int, default=500)
+    run_parser = commands.add_parser('run')
+    run_parser.add_argument('--samples', type=int, default=200)
+    args = parser.parse_args()
+
+    match args.command:
+        case 'migrate':
+            migrate(args.revision)
+        case 'seed':
+            asyncio.run(seed(args.runs, args.tests))
+        case 'run':
+            asyncio.run(run(args.samples))
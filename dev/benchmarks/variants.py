@@ -0,0 +1,118 @@
+"""Project reporting latency benchmark with many variant keys
+
+Seeds a project whose test runs all have the same number of variant keys, then measures the latency
+of the project level reporting queries with and without a variant filter.
+
+    export AGNOSTIC_DB_DATABASE=agnostic_bench
+    python variants.py seed --runs 2000 --tests 100 --keys 10
+    python variants.py run <project id> --samples 20
+"""
+import argparse
+import asyncio
+import datetime
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+base_folder = Path(__file__).parent
+sys.path.insert(0, str(base_folder.parent.parent / 'agnostic-core' / 'src'))
+
+from sqlalchemy import text
+
+from agnostic.core import models
+from agnostic.core.dal import Reporting
+from agnostic.core.dal.bulk import copy_many
+from agnostic.core.schemas.reporting.metrics import MetricRequest
+from agnostic.core.session import async_session
+
+VALUES = ('a', 'b', 'c')
+
+
+async def seed(runs: int, tests: int, keys: int):
+    now = datetime.datetime.utcnow()
+    async with async_session() as session:
+        project_id = uuid.uuid4()
+        session.add(models.Project(id=project_id, name=f'Variants {project_id}'))
+        await session.commit()
+
+        for run in range(runs):
+            test_run_id = uuid.uuid4()
+            start = now - datetime.timedelta(minutes=run * 10)
+            await copy_many(session, models.TestRun, [dict(
+                id=test_run_id, project_id=project_id, start=start, finish=start, heartbeat=start,
+                sut_branch=random.choice(('master', 'develop')), test_branch='master'
+            )])
+            await copy_many(session, models.TestRunVariant, [
+                dict(id=uuid.uuid4(), test_run_id=test_run_id, name=f'key_{key}', value=random.choice(VALUES))
+                for key in range(keys)
+            ])
+            test_ids = [uuid.uuid4() for _ in range(tests)]
+            await copy_many(session, models.Test, [
+                dict(id=test_id, test_run_id=test_run_id, start=start, finish=start, path=f'suite/module_{i % 20}',
+                     name=f'test_{i}', result=random.choice(('passed', 'passed', 'failed', 'skipped')))
+                for i, test_id in enumerate(test_ids)
+            ])
+            await copy_many(session, models.Metric, [
+                dict(id=uuid.uuid4(), test_run_id=test_run_id, test_id=test_id, timestamp=start, name='duration',
+                     value=random.random())
+                for test_id in test_ids
+            ])
+            await session.commit()
+            print(f'Seeded test run {run + 1}/{runs}', end='\r')
+
+        await session.execute(text('ANALYZE'))
+        await session.commit()
+    print()
+    print(f'Project {project_id}')
+
+
+async def run(project_id: uuid.UUID, samples: int):
+    metrics = [MetricRequest(table='metrics', func='avg', name='duration', title='duration'),
+               MetricRequest(table='metrics_over_time', func='max', name='cpu', field='cpu', title='cpu')]
+    queries = {
+        'test runs': lambda reporting, **kw: reporting.get_test_runs(project_id, 'start', 'desc', 1, 25, **kw),
+        'tests over time': lambda reporting, **kw: reporting.get_tests_over_time(project_id, **kw),
+        'top failed tests': lambda reporting, **kw: reporting.get_top_failed_test(project_id, **kw),
+        'project metrics': lambda reporting, **kw: reporting.get_project_metrics(project_id, metrics=metrics, **kw),
+    }
+    filters = {
+        'no filter': {},
+        'variant filter': {'variant': ['key_0 -eq a', 'key_1 -eq b']},
+    }
+
+    async with async_session() as session:
+        reporting = Reporting(session)
+        for name, query in queries.items():
+            for filter_name, kwargs in filters.items():
+                await query(reporting, interval='month', **kwargs)
+                timings = []
+                for _ in range(samples):
+                    started = time.perf_counter()
+                    await query(reporting, interval='month', **kwargs)
+                    timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                print(f'{name}, {filter_name}: '
+                      f'mean {statistics.mean(timings):.2f}ms, '
+                      f'p95 {timings[int(len(timings) * 0.95)]:.2f}ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    seed_parser = commands.add_parser('seed')
+    seed_parser.add_argument('--runs', type=int, default=2000)
+    seed_parser.add_argument('--tests', type=int, default=100)
+    seed_parser.add_argument('--keys', type=int, default=10)
+    run_parser = commands.add_parser('run')
+    run_parser.add_argument('project_id', type=uuid.UUID)
+    run_parser.add_argument('--samples', type=int, default=20)
+    args = parser.parse_args()
+
+    match args.command:
+        case 'seed':
+            asyncio.run(seed(args.runs, args.tests, args.keys))
+        case 'run':
+            asyncio.run(run(args.project_id, args.samples))
@@ -19,6 +19,7 @@ from sqlalchemy.orm import sessionmaker
 base_folder = Path(__file__).parent
 sys.path.insert(0, str(base_folder.parent.parent))
 
+from agnostic.core.dal.bulk import copy_many
 from agnostic.core.models import Project, TestRun, Test, TestRunVariant, Log, Progress, \
     Metric, MetricOverTime, Attachment, Request
 
@@ -261,17 +262,17 @@ def create_progress(tests: [Test]):
             if i % 3 == 0:
                 test_id = t.id
             progress.append(
-                Progress(
+                dict(
                     id=uuid.uuid4(),
                     test_run_id=t.test_run_id,
                     test_id=test_id,
-                    timestamp=datetime.datetime.utcnow(),
+                    timestamp=t.start + datetime.timedelta(milliseconds=random.randint(0, 1000)),
                     level=random.choice(('DEBUG', 'INFO', 'WARNING', 'ERROR')),
                     message=lorem.sentence(),
                     details=lorem.paragraph()
                 )
             )
-        session.add_all(progress)
+        await copy_many(session, Progress, progress)
         await session.commit()
     return _create_progress
 
@@ -298,14 +299,14 @@ def create_test_run_metrics(test_runs: [TestRun]):
                 }
             ):
                 metrics.append(
-                    Metric(
+                    dict(
                         id=uuid.uuid4(),
                         test_run_id=tr.id,
                         timestamp=tr.start + datetime.timedelta(seconds=random.randint(5, 50)),
                         **m
                     )
                 )
-        session.add_all(metrics)
+        await copy_many(session, Metric, metrics)
         await session.commit()
     return _create_test_run_metrics
 
@@ -328,7 +329,7 @@ def create_test_metrics(tests: [Test]):
                     },
                 ):
                     metrics.append(
-                        Metric(
+                        dict(
                             id=uuid.uuid4(),
                             test_run_id=t.test_run_id,
                             test_id=t.id,
@@ -336,7 +337,7 @@ def create_test_metrics(tests: [Test]):
                             **m
                         )
                     )
-        session.add_all(metrics)
+        await copy_many(session, Metric, metrics)
         await session.commit()
 
     return _create_test_metrics
@@ -357,7 +358,7 @@ def create_metrics_ot(tests: [Test]):
         for t in tests:
             for i in range(5):
                 metrics.append(
-                    MetricOverTime(
+                    dict(
                         id=uuid.uuid4(),
                         test_run_id=t.test_run_id,
                         test_id=t.id,
@@ -371,7 +372,7 @@ def create_metrics_ot(tests: [Test]):
                     )
                 )
                 metrics.append(
-                    MetricOverTime(
+                    dict(
                         id=uuid.uuid4(),
                         test_run_id=t.test_run_id,
                         test_id=t.id,
@@ -383,7 +384,7 @@ def create_metrics_ot(tests: [Test]):
                         }
                     )
                 )
-        session.add_all(metrics)
+        await copy_many(session, MetricOverTime, metrics)
         await session.commit()
     return _create_metrics_ot
 
@@ -434,7 +435,7 @@ def create_requests(tests: [Test]):
         for i, t in enumerate(tests):
             if i % 3 == 0:
                 requests.append(
-                    Request(
+                    dict(
                         id=uuid.uuid4(),
                         test_run_id=t.test_run_id,
                         test_id=t.id,
@@ -451,7 +452,7 @@ def create_requests(tests: [Test]):
                     )
                 )
                 requests.append(
-                    Request(
+                    dict(
                         id=uuid.uuid4(),
                         test_run_id=t.test_run_id,
                         test_id=t.id,
@@ -468,7 +469,7 @@ def create_requests(tests: [Test]):
                     )
                 )
                 requests.append(
-                    Request(
+                    dict(
                         id=uuid.uuid4(),
                         test_run_id=t.test_run_id,
                         test_id=t.id,
@@ -483,7 +484,7 @@ def create_requests(tests: [Test]):
                     )
                 )
                 requests.append(
-                    Request(
+                    dict(
                         id=uuid.uuid4(),
                         test_run_id=t.test_run_id,
                         test_id=t.id,
@@ -498,7 +499,7 @@ def create_requests(tests: [Test]):
                     )
                 )
                 requests.append(
-                    Request(
+                    dict(
                         id=uuid.uuid4(),
                         test_run_id=t.test_run_id,
                         test_id=t.id,
@@ -512,7 +513,7 @@ def create_requests(tests: [Test]):
                     )
                 )
 
-        session.add_all(requests)
+        await copy_many(session, Request, requests)
         await session.commit()
 
     return _create_requests